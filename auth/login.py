@@ -1,19 +1,37 @@
-from kiteconnect import KiteConnect
+import os
+import sys
 import webbrowser
 
+# Allow running as `python auth/login.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kiteconnect import KiteConnect
+
 from config.settings import API_KEY, API_SECRET
 
 
-kite = KiteConnect(api_key=API_KEY)
+def interactive_login():
+    """Open the Kite login page and return the request token pasted by the user."""
+
+    kite = KiteConnect(api_key=API_KEY)
+
+    print("Opening login...")
+    webbrowser.open(kite.login_url())
+
+    return input("Paste request token: ").strip()
+
+
+if __name__ == "__main__":
 
-print("Opening login...")
-webbrowser.open(kite.login_url())
+    from auth.session import SessionManager
 
-token = input("Paste request token: ")
+    session = SessionManager(
+        API_KEY, API_SECRET,
+        refresh=interactive_login,
+        client=KiteConnect(api_key=API_KEY),
+    )
 
-data = kite.generate_session(token, API_SECRET)
+    token = session.refresh()
 
-if isinstance(data, dict):
-    print("ACCESS TOKEN:", data.get("access_token"))
-else:
-    print("Session data:", data)
+    print("ACCESS TOKEN:", token)
+    print(f"Stored in {session.path}; running bots pick it up automatically.")
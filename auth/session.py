@@ -0,0 +1,252 @@
+"""
+Access token lifecycle.
+
+SessionManager keeps the Kite access token in a private file shared by
+every process on the box, refreshes it through a pluggable callback
+before it expires and re-reads the file when another process has
+refreshed it, so a single login serves all workers.
+
+All expiry arithmetic is done in IST, where Kite's daily cut-off is
+defined, so the manager behaves the same on a host running in UTC. A
+seed token from the settings carries no issue time, so it is checked
+with a profile() call before it is trusted.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from typing import Callable, Optional, Union
+from zoneinfo import ZoneInfo
+
+from kiteconnect.exceptions import TokenException
+from loguru import logger
+
+from utils.clock import get_clock
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+
+SESSION_PATH = "cache/session.json"
+
+IST = ZoneInfo("Asia/Kolkata")
+
+# Kite access tokens are invalidated every day at 06:00 IST
+EXPIRY_TIME = time(6, 0, tzinfo=IST)
+
+
+class SessionError(Exception):
+    """Raised when no valid session can be obtained."""
+
+
+class SessionExpired(SessionError):
+    """Raised when the token expired and there is no way to refresh it."""
+
+
+def to_ist(moment: datetime) -> datetime:
+    """Convert a datetime to IST; naive values are taken as host local time."""
+    return moment.astimezone(IST)
+
+
+def next_expiry(login_time: datetime) -> datetime:
+    """Return the first daily expiry after login_time, in IST."""
+
+    login_time = to_ist(login_time)
+    expiry = datetime.combine(login_time.date(), EXPIRY_TIME)
+    if expiry <= login_time:
+        expiry += timedelta(days=1)
+    return expiry
+
+
+class SessionManager:
+    """
+    Args:
+        api_key: Kite API key
+        api_secret: Kite API secret
+        refresh: Callback returning either a request token (exchanged via
+            generate_session) or a session dict with an "access_token"
+        client: Kite client used to exchange request tokens and to apply
+            the access token to
+        path: Shared session file
+        margin: Refresh this long before expiry
+        seed_token: Token to use when no session file exists yet; it is
+            verified against the client before first use
+    """
+
+    def __init__(self, api_key: str, api_secret: str,
+                 refresh: Optional[Callable[[], Union[str, dict]]] = None,
+                 client=None, path: str = SESSION_PATH,
+                 margin: timedelta = timedelta(minutes=30),
+                 seed_token: Optional[str] = None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.refresh_callback = refresh
+        self.client = client
+        self.path = path
+        self.margin = margin
+        self.session = None
+        self._mtime = None
+
+        if not self._reload() and seed_token:
+            now = get_clock().now()
+            self.session = {
+                "access_token": seed_token,
+                "login_time": now.isoformat(),
+                "expires_at": next_expiry(now).isoformat(),
+                "verified": False,
+            }
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.session["access_token"] if self.session else None
+
+    def expires_at(self) -> Optional[datetime]:
+        return to_ist(datetime.fromisoformat(self.session["expires_at"])) if self.session else None
+
+    def is_valid(self) -> bool:
+        expiry = self.expires_at()
+        return expiry is not None and to_ist(get_clock().now()) + self.margin < expiry
+
+    def _reload(self) -> bool:
+        """Re-read the session file if it changed on disk."""
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+
+        if mtime == self._mtime:
+            return self.session is not None
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.session = json.load(f)
+            self._mtime = mtime
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable session file: {e}")
+            return False
+
+    def _store(self, session: dict):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.chmod(tmp_path, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(session, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self.session = session
+        self._mtime = os.stat(self.path).st_mtime
+
+    @contextmanager
+    def _lock(self):
+        if fcntl is None:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def refresh(self) -> str:
+        """
+        Obtain a new access token through the refresh callback.
+
+        Only one process refreshes at a time; the others wait on the lock
+        and then pick up the token it stored.
+
+        Raises:
+            SessionExpired: If there is no callback to refresh with
+            SessionError: If the refresh fails
+        """
+
+        stale_token = self.access_token
+
+        with self._lock():
+            if self._reload() and self.access_token != stale_token and self.is_valid():
+                logger.info("Picked up session refreshed by another process")
+                return self.access_token
+
+            if self.refresh_callback is None:
+                raise SessionExpired("Access token expired and no refresh callback is configured")
+
+            try:
+                result = self.refresh_callback()
+
+                if isinstance(result, dict):
+                    data = result
+                else:
+                    data = self.client.generate_session(result, api_secret=self.api_secret)
+
+                now = get_clock().now()
+                self._store({
+                    "access_token": data["access_token"],
+                    "user_id": data.get("user_id"),
+                    "login_time": now.isoformat(),
+                    "expires_at": next_expiry(now).isoformat(),
+                })
+
+            except SessionError:
+                raise
+            except Exception as e:
+                raise SessionError(f"Session refresh failed: {e}") from e
+
+        logger.success(f"Session refreshed, valid until {self.session['expires_at']}")
+        return self.access_token
+
+    def invalidate(self):
+        """Mark the current token as unusable, e.g. after a TokenException."""
+
+        if self.session:
+            self.session = dict(self.session, expires_at=to_ist(get_clock().now()).isoformat())
+
+    def _verify(self, client):
+        """Check a seed token with a profile() call; a rejected one is refreshed."""
+
+        try:
+            client.profile()
+        except TokenException as e:
+            logger.warning(f"Seed access token rejected: {e}")
+            self.invalidate()
+            self.refresh()
+            client.set_access_token(self.access_token)
+            return
+
+        self.session = dict(self.session, verified=True)
+
+    def ensure_valid(self, client=None) -> str:
+        """
+        Make sure a valid token is applied to the client.
+
+        Cheap when nothing changed: one stat() of the session file.
+
+        Returns:
+            str: The access token in use
+        """
+
+        client = client or self.client
+
+        self._reload()
+
+        if not self.is_valid():
+            self.refresh()
+
+        if client is not None:
+            client.set_access_token(self.access_token)
+
+            if self.session.get("verified") is False:
+                self._verify(client)
+
+        return self.access_token
@@ -0,0 +1,211 @@
+"""
+Typed, hot-reloadable trading configuration.
+
+The trading parameters in config/settings.py are read into an immutable
+Config. ConfigWatcher polls the file's mtime and size (one stat call, so
+it is cheap to do every cycle) and, when the file changes, re-reads it,
+validates the new values and swaps the active Config as a whole. A
+reload never executes the file: only the RELOADABLE assignments are
+parsed, and their values must be plain literals. Loops
+call poll() between cycles, so a cycle always sees one consistent
+Config. An invalid edit is logged and the previous Config stays active.
+
+Credentials are not part of Config: the session manager owns the token,
+and a new API key still needs a restart.
+"""
+
+import ast
+import os
+from typing import NamedTuple, Optional
+
+from loguru import logger
+
+
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.py")
+
+RELOADABLE = ("SYMBOL", "SYMBOLS", "CAPITAL", "RISK_PER_TRADE", "MODE")
+MODES = ("PAPER", "LIVE")
+MAX_RISK_PER_TRADE = 0.05
+
+
+class ConfigError(Exception):
+    pass
+
+
+class Config(NamedTuple):
+    symbol: str          # the single-symbol loop in main.py
+    symbols: tuple       # the sharded runner's universe (defaults to (symbol,))
+    capital: float
+    risk_per_trade: float
+    mode: str
+
+    @classmethod
+    def from_namespace(cls, values: dict) -> "Config":
+        """Build and validate a Config from settings-style names (SYMBOL, SYMBOLS, ...)."""
+
+        try:
+            symbol = values["SYMBOL"]
+            config = cls(
+                symbol=symbol,
+                symbols=tuple(values.get("SYMBOLS") or [symbol]),
+                capital=float(values["CAPITAL"]),
+                risk_per_trade=float(values["RISK_PER_TRADE"]),
+                mode=str(values["MODE"]),
+            )
+        except KeyError as e:
+            raise ConfigError(f"Missing setting {e}")
+        except (TypeError, ValueError) as e:
+            raise ConfigError(f"Bad setting value: {e}")
+
+        config.validate()
+        return config
+
+    def validate(self):
+        if any(not isinstance(s, str) or not s or s != s.strip() for s in (self.symbol,) + self.symbols):
+            raise ConfigError(f"Bad symbol in {self.symbols}")
+        if len(set(self.symbols)) != len(self.symbols):
+            raise ConfigError(f"Duplicate symbols in {self.symbols}")
+        if self.capital <= 0:
+            raise ConfigError(f"CAPITAL must be positive, got {self.capital}")
+        if not 0 < self.risk_per_trade <= MAX_RISK_PER_TRADE:
+            raise ConfigError(f"RISK_PER_TRADE must be in (0, {MAX_RISK_PER_TRADE}], got {self.risk_per_trade}")
+        if self.mode not in MODES:
+            raise ConfigError(f"MODE must be one of {MODES}, got {self.mode!r}")
+
+
+def read_settings(path: str = SETTINGS_PATH, names: tuple = RELOADABLE) -> dict:
+    """
+    Parse top-level `NAME = literal` assignments from a settings file.
+
+    The file is parsed, not executed, so nothing else in it runs.
+
+    Returns:
+        dict: The values of the assignments to `names` found in the file
+    """
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError) as e:
+        raise ConfigError(f"Cannot read {path}: {e}")
+
+    values = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if not isinstance(target, ast.Name) or target.id not in names:
+            continue
+        try:
+            values[target.id] = ast.literal_eval(node.value)
+        except (TypeError, ValueError):
+            raise ConfigError(f"{target.id} must be a literal value")
+
+    return values
+
+
+def load_config(path: str = SETTINGS_PATH) -> Config:
+    """Read and validate the settings file without touching the imported module."""
+
+    return Config.from_namespace(read_settings(path))
+
+
+_config = None
+
+
+def get_config() -> Config:
+    """The active Config (loaded from config.settings on first use)."""
+
+    global _config
+
+    if _config is None:
+        from config import settings
+        _config = Config.from_namespace(vars(settings))
+
+    return _config
+
+
+def set_config(config: Config) -> Config:
+    """Make a Config active. Returns the previous one."""
+
+    global _config
+    previous, _config = _config, config
+    return previous
+
+
+class ConfigWatcher:
+    """
+    Args:
+        path: Settings file to watch
+        frozen: Config fields that cannot change without a restart; edits
+            to them are rejected
+        on_change: Callbacks called as fn(old, new) after a swap
+    """
+
+    def __init__(self, path: str = SETTINGS_PATH, frozen: tuple = ("mode",),
+                 on_change: Optional[list] = None):
+        self.path = path
+        self.frozen = frozen
+        self.on_change = list(on_change or [])
+        self.current = get_config()
+        self.reloads = 0
+        self.rejected = 0
+        self._stamp = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self) -> Optional[Config]:
+        """
+        Swap in the file's Config if it changed and is valid.
+
+        Returns:
+            Config: The new Config, or None if nothing was swapped
+        """
+
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+
+        try:
+            config = load_config(self.path)
+            for field in self.frozen:
+                if getattr(config, field) != getattr(self.current, field):
+                    raise ConfigError(f"{field} cannot change while running")
+        except Exception as e:
+            self.rejected += 1
+            logger.error(f"Ignoring settings change: {e}")
+            return None
+
+        if config == self.current:
+            return None
+
+        old, self.current = self.current, config
+        set_config(config)
+        self.reloads += 1
+        logger.info(f"Settings reloaded: {_diff(old, config)}")
+
+        for callback in self.on_change:
+            callback(old, config)
+
+        return config
+
+
+def _diff(old: Config, new: Config) -> str:
+    changes = []
+    for field in Config._fields:
+        a, b = getattr(old, field), getattr(new, field)
+        if a == b:
+            continue
+        if field == "symbols":
+            added = [s for s in b if s not in a]
+            removed = [s for s in a if s not in b]
+            changes.append(f"symbols +{added} -{removed}")
+        else:
+            changes.append(f"{field} {a} -> {b}")
+    return ", ".join(changes)
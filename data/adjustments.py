@@ -0,0 +1,202 @@
+"""
+Corporate-action adjustment applied on read.
+
+Splits, bonuses and dividends are kept per symbol in a small JSON file
+next to the settings; candle data itself is never rewritten. When a
+series is read, every bar before an ex-date is scaled by the product of
+the factors of all later actions (a cumulative factor per segment
+between ex-dates), so indicators and backtests see a continuous series.
+Adding an action only changes the factor table, not stored data.
+
+File format (ratios are [from, to]):
+
+    {"RELIANCE": [
+        {"ex_date": "2024-10-28", "type": "bonus", "ratio": [1, 1]},
+        {"ex_date": "2017-09-07", "type": "split", "ratio": [1, 2]},
+        {"ex_date": "2025-08-14", "type": "dividend", "amount": 5.5}
+    ]}
+
+For a split [1, 2] one share becomes two; for a bonus [1, 1] one bonus
+share is issued per share held.
+"""
+
+import json
+import os
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+
+CORPORATE_ACTIONS_PATH = "config/corporate_actions.json"
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+def _day(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class CorporateActions:
+    """
+    Args:
+        actions: {symbol: [action dict, ...]} in the file format above
+    """
+
+    def __init__(self, actions: Optional[dict] = None):
+        self.actions = {}
+        for symbol, items in (actions or {}).items():
+            for action in items:
+                self.add(symbol, **action)
+
+    @classmethod
+    def load(cls, path: str = CORPORATE_ACTIONS_PATH) -> "CorporateActions":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def add(self, symbol: str, ex_date, type: str, ratio=None, amount: Optional[float] = None):
+        """Register an action; only this symbol's small action list is re-sorted."""
+
+        if type in ("split", "bonus"):
+            a, b = ratio
+            if a <= 0 or b <= 0:
+                raise ValueError(f"Bad {type} ratio {ratio} for {symbol}")
+        elif type == "dividend":
+            if amount is None or amount < 0:
+                raise ValueError(f"Bad dividend amount {amount} for {symbol}")
+        else:
+            raise ValueError(f"Unknown corporate action type: {type}")
+
+        items = self.actions.setdefault(symbol, [])
+        items.append({"ex_date": _day(ex_date), "type": type, "ratio": ratio, "amount": amount})
+        items.sort(key=lambda a: a["ex_date"])
+
+    def is_ex_date(self, symbol: str, day) -> bool:
+        """Whether any action of the symbol goes ex on the given day."""
+        day = _day(day)
+        return any(a["ex_date"] == day for a in self.actions.get(symbol, ()))
+
+    def to_dict(self) -> dict:
+        return {
+            symbol: [
+                {k: (v.isoformat() if k == "ex_date" else v) for k, v in a.items() if v is not None}
+                for a in items
+            ]
+            for symbol, items in self.actions.items()
+        }
+
+    def save(self, path: str = CORPORATE_ACTIONS_PATH):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _factors(self, actions: list, bounds: list, closes) -> tuple:
+        """Price and volume factor of each action, given where its ex-date falls."""
+
+        price, volume = [], []
+
+        for action, bound in zip(actions, bounds):
+            if action["type"] == "split":
+                a, b = action["ratio"]
+                f = a / b
+            elif action["type"] == "bonus":
+                a, b = action["ratio"]
+                f = b / (a + b)
+            else:
+                # Dividend: scale by (P - D) / P using the last close before the ex-date
+                prev = closes[bound - 1] if bound > 0 else None
+                f = (prev - action["amount"]) / prev if prev and prev > action["amount"] else 1.0
+
+            price.append(f)
+            volume.append(1.0 if action["type"] == "dividend" else 1.0 / f)
+
+        return np.array(price), np.array(volume)
+
+    def adjust(self, symbol: str, candles: list) -> list:
+        """
+        Adjusted view of a candle series.
+
+        The input is not modified. Bars on or after the last ex-date are
+        returned as the same objects, so a series without actions inside
+        its range costs only a couple of binary searches.
+
+        Returns:
+            list: Candles with prices (and split/bonus volumes) adjusted
+        """
+
+        actions = self.actions.get(symbol)
+        if not actions or not candles:
+            return candles
+
+        first, last = _day(candles[0]["date"]), _day(candles[-1]["date"])
+        actions = [a for a in actions if first < a["ex_date"] <= last]
+        if not actions:
+            return candles
+
+        # Index of the first bar on or after each ex-date (bisect's key=
+        # needs Python 3.10; the deploy runs 3.9)
+        days = [_day(c["date"]) for c in candles]
+        bounds = [bisect_left(days, a["ex_date"]) for a in actions]
+        closes = [c["close"] for c in candles[:bounds[-1]]]
+
+        price, volume = self._factors(actions, bounds, closes)
+
+        # Bars before ex-date i are scaled by every factor from i onwards
+        price_cum = np.cumprod(price[::-1])[::-1]
+        volume_cum = np.cumprod(volume[::-1])[::-1]
+
+        adjusted = list(candles)
+        start = 0
+        for bound, pf, vf in zip(bounds, price_cum, volume_cum):
+            for i in range(start, bound):
+                bar = dict(candles[i])
+                for field in PRICE_FIELDS:
+                    if field in bar:
+                        bar[field] = bar[field] * pf
+                if "volume" in bar:
+                    bar["volume"] = bar["volume"] * vf
+                adjusted[i] = bar
+            start = bound
+
+        return adjusted
+
+
+_cache = {"path": None, "mtime": None, "actions": CorporateActions()}
+
+
+def get_actions(path: str = CORPORATE_ACTIONS_PATH) -> CorporateActions:
+    """Actions from the file, reloaded only when the file changes."""
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return CorporateActions()
+
+    if _cache["path"] != path or _cache["mtime"] != mtime:
+        try:
+            _cache["actions"] = CorporateActions.load(path)
+        except Exception as e:
+            logger.error(f"Could not load corporate actions from {path}: {e}")
+            return _cache["actions"]
+        _cache["path"], _cache["mtime"] = path, mtime
+
+    return _cache["actions"]
+
+
+def is_ex_date(symbol: str, day, path: str = CORPORATE_ACTIONS_PATH) -> bool:
+    """Whether the symbol has a corporate action going ex on the given day."""
+
+    return get_actions(path).is_ex_date(symbol, day)
+
+
+def adjusted(symbol: str, candles: list, path: str = CORPORATE_ACTIONS_PATH) -> list:
+    """Candles adjusted for the symbol's corporate actions (unchanged if there are none)."""
+
+    return get_actions(path).adjust(symbol, candles)
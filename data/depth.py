@@ -0,0 +1,170 @@
+"""
+Order-book depth features from batched full quotes.
+
+DepthBook pulls `kite.quote` for a whole universe in as few calls as the
+API allows (QUOTE_BATCH instruments per call) and keeps the recent quotes
+in preallocated (symbols, capacity) ring buffers. Derived features are
+computed once per update for every symbol at the same time:
+
+- spread and spread_bps: best ask - best bid
+- imbalance: (bid qty - ask qty) / (bid qty + ask qty) over the 5 levels
+- microprice: best bid and ask weighted by the opposite side's quantity
+
+The quote also carries the last price, so the feed replaces the separate
+LTP request instead of adding one.
+"""
+
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+from data.market_data import instrument_key
+
+
+QUOTE_BATCH = 500     # Kite quote limit per request
+CAPACITY = 256
+
+FIELDS = (
+    "ts", "last", "bid", "ask", "bid_qty", "ask_qty", "depth_bid_qty", "depth_ask_qty",
+    "volume", "oi", "spread", "spread_bps", "imbalance", "microprice",
+)
+
+
+class DepthBook:
+    """
+    Args:
+        symbols: Universe to track
+        capacity: Quotes kept per symbol
+        exchange: Exchange prefix for quote keys
+    """
+
+    def __init__(self, symbols: list, capacity: int = CAPACITY, exchange: str = "NSE"):
+        self.symbols = list(symbols)
+        self.row = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.keys = [instrument_key(symbol, exchange) for symbol in self.symbols]
+        self.capacity = capacity
+        self.data = {name: np.full((len(self.symbols), capacity), np.nan) for name in FIELDS}
+        self.head = 0
+        self.count = 0
+
+    def set_symbols(self, symbols: list, exchange: str = "NSE"):
+        """Change the universe, keeping the history of symbols that stay."""
+
+        old_rows = self.row
+        self.symbols = list(symbols)
+        self.row = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.keys = [instrument_key(symbol, exchange) for symbol in self.symbols]
+
+        kept = [(i, old_rows[s]) for i, s in enumerate(self.symbols) if s in old_rows]
+        for name, old in self.data.items():
+            new = np.full((len(self.symbols), self.capacity), np.nan)
+            if kept:
+                rows, previous = zip(*kept)
+                new[list(rows)] = old[list(previous)]
+            self.data[name] = new
+
+    def poll(self, client, ts: Optional[float] = None) -> bool:
+        """Fetch quotes for the whole universe and record them. Returns whether any arrived."""
+
+        quotes = {}
+
+        for i in range(0, len(self.keys), QUOTE_BATCH):
+            try:
+                quotes.update(client.quote(self.keys[i:i + QUOTE_BATCH]) or {})
+            except Exception as e:
+                logger.error(f"Quote request failed: {e}")
+
+        if not quotes:
+            return False
+
+        self.update(quotes, ts)
+        return True
+
+    def update(self, quotes: dict, ts: Optional[float] = None):
+        """Record one quote snapshot ({"NSE:SYMBOL": quote}) as the next ring slot."""
+
+        n = len(self.symbols)
+        col = {name: np.full(n, np.nan) for name in FIELDS[:10]}
+
+        for i, key in enumerate(self.keys):
+            quote = quotes.get(key)
+            if not quote:
+                continue
+
+            depth = quote.get("depth") or {}
+            buy = depth.get("buy") or []
+            sell = depth.get("sell") or []
+
+            col["ts"][i] = ts if ts is not None else _timestamp(quote.get("timestamp"))
+            col["last"][i] = quote.get("last_price", np.nan)
+            col["volume"][i] = quote.get("volume", np.nan)
+            col["oi"][i] = quote.get("oi", np.nan)
+
+            if buy and buy[0].get("quantity"):
+                col["bid"][i] = buy[0]["price"]
+                col["bid_qty"][i] = buy[0]["quantity"]
+            if sell and sell[0].get("quantity"):
+                col["ask"][i] = sell[0]["price"]
+                col["ask_qty"][i] = sell[0]["quantity"]
+
+            col["depth_bid_qty"][i] = sum(level.get("quantity", 0) for level in buy)
+            col["depth_ask_qty"][i] = sum(level.get("quantity", 0) for level in sell)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spread = col["ask"] - col["bid"]
+            mid = (col["ask"] + col["bid"]) / 2
+            total = col["depth_bid_qty"] + col["depth_ask_qty"]
+            top = col["bid_qty"] + col["ask_qty"]
+
+            col["spread"] = spread
+            col["spread_bps"] = 10_000 * spread / mid
+            col["imbalance"] = np.where(total > 0, (col["depth_bid_qty"] - col["depth_ask_qty"]) / total, np.nan)
+            col["microprice"] = (col["bid"] * col["ask_qty"] + col["ask"] * col["bid_qty"]) / top
+
+        for name in FIELDS:
+            self.data[name][:, self.head] = col[name]
+
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def history(self, symbol: str, field: str, n: Optional[int] = None) -> np.ndarray:
+        """The last n values of a field for a symbol, oldest first."""
+
+        n = min(n or self.count, self.count)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+        return self.data[field][self.row[symbol], idx]
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        if self.count == 0 or symbol not in self.row:
+            return None
+        value = self.data["last"][self.row[symbol], (self.head - 1) % self.capacity]
+        return None if np.isnan(value) else float(value)
+
+    def features(self, symbol: str, window: int = 20) -> Optional[dict]:
+        """
+        Latest depth features for a symbol.
+
+        Returns:
+            dict: spread, spread_bps, imbalance, microprice, plus
+            imbalance_avg over the last `window` quotes; None if the latest
+            quote has no two-sided book
+        """
+
+        if self.count == 0 or symbol not in self.row:
+            return None
+
+        row, last = self.row[symbol], (self.head - 1) % self.capacity
+        features = {name: float(self.data[name][row, last])
+                    for name in ("spread", "spread_bps", "imbalance", "microprice")}
+
+        if any(np.isnan(value) for value in features.values()):
+            return None
+
+        recent = self.history(symbol, "imbalance", window)
+        features["imbalance_avg"] = float(np.nanmean(recent))
+        return features
+
+
+def _timestamp(value) -> float:
+    return value.timestamp() if hasattr(value, "timestamp") else np.nan
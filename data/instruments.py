@@ -0,0 +1,182 @@
+"""
+Instrument master cache.
+
+The Kite instruments dump is downloaded at most once a day and cached on
+disk as a pickled columnar table together with its lookup indexes, so a
+restart loads it in milliseconds and every symbol, token, exchange or
+segment lookup is a dictionary hit.
+"""
+
+import os
+import pickle
+import tempfile
+from datetime import date
+from typing import Optional
+
+from loguru import logger
+
+
+INSTRUMENTS_PATH = "cache/instruments.pkl"
+
+COLUMNS = (
+    "instrument_token", "exchange_token", "tradingsymbol", "name", "expiry",
+    "strike", "tick_size", "lot_size", "instrument_type", "segment", "exchange",
+)
+
+
+class InstrumentMaster:
+    """
+    Columnar instrument table with O(1) lookups.
+
+    Rows are addressed by position; the indexes map keys to row numbers.
+    """
+
+    def __init__(self, columns: dict, fetched_on: date):
+        self.columns = columns
+        self.fetched_on = fetched_on
+        self.by_symbol = {}
+        self.by_token = {}
+        self.by_exchange = {}
+        self.by_segment = {}
+
+        symbols = columns["tradingsymbol"]
+        exchanges = columns["exchange"]
+        segments = columns["segment"]
+
+        for row, token in enumerate(columns["instrument_token"]):
+            self.by_symbol[(exchanges[row], symbols[row])] = row
+            self.by_token[token] = row
+            self.by_exchange.setdefault(exchanges[row], []).append(row)
+            self.by_segment.setdefault(segments[row], []).append(row)
+
+    @classmethod
+    def from_rows(cls, rows: list, fetched_on: Optional[date] = None) -> "InstrumentMaster":
+        columns = {name: [r.get(name) for r in rows] for name in COLUMNS}
+        return cls(columns, fetched_on or date.today())
+
+    def __len__(self):
+        return len(self.columns["instrument_token"])
+
+    def row(self, index: int) -> dict:
+        return {name: self.columns[name][index] for name in COLUMNS}
+
+    def get(self, symbol: str, exchange: str = "NSE") -> Optional[dict]:
+        index = self.by_symbol.get((exchange, symbol))
+        return None if index is None else self.row(index)
+
+    def get_by_token(self, token: int) -> Optional[dict]:
+        index = self.by_token.get(token)
+        return None if index is None else self.row(index)
+
+    def token(self, symbol: str, exchange: str = "NSE") -> Optional[int]:
+        index = self.by_symbol.get((exchange, symbol))
+        return None if index is None else self.columns["instrument_token"][index]
+
+    def tick_size(self, symbol: str, exchange: str = "NSE") -> float:
+        index = self.by_symbol.get((exchange, symbol))
+        tick = None if index is None else self.columns["tick_size"][index]
+        return tick or 0.05
+
+    def lot_size(self, symbol: str, exchange: str = "NSE") -> int:
+        index = self.by_symbol.get((exchange, symbol))
+        lot = None if index is None else self.columns["lot_size"][index]
+        return lot or 1
+
+    def symbols(self, exchange: Optional[str] = None, segment: Optional[str] = None) -> list:
+        """List trading symbols, optionally restricted to an exchange and/or segment."""
+
+        rows = range(len(self))
+        if exchange is not None:
+            rows = self.by_exchange.get(exchange, [])
+        if segment is not None:
+            in_segment = set(self.by_segment.get(segment, []))
+            rows = [r for r in rows if r in in_segment]
+
+        return [self.columns["tradingsymbol"][r] for r in rows]
+
+    def round_price(self, symbol: str, price: float, exchange: str = "NSE") -> float:
+        """Round a price to the instrument's tick size."""
+
+        tick = self.tick_size(symbol, exchange)
+        return round(round(price / tick) * tick, 2)
+
+    def validate_quantity(self, symbol: str, qty: int, exchange: str = "NSE") -> int:
+        """
+        Check that a quantity is tradable for the instrument.
+
+        The quantity is never adjusted: callers book what they asked for,
+        so an order for a different size than requested must not go out.
+
+        Returns:
+            int: The quantity, unchanged
+
+        Raises:
+            ValueError: If the symbol is unknown or the quantity is not a
+                positive whole number of lots
+        """
+
+        if (exchange, symbol) not in self.by_symbol:
+            raise ValueError(f"Unknown instrument {exchange}:{symbol}")
+
+        lot = self.lot_size(symbol, exchange)
+
+        if qty < lot or qty % lot:
+            raise ValueError(f"Quantity {qty} is not a whole number of lots of {lot} for {symbol}")
+
+        return int(qty)
+
+    def save(self, path: str = INSTRUMENTS_PATH):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+
+_master = None
+
+
+def get_master() -> Optional[InstrumentMaster]:
+    """Return the loaded instrument master, if any. Never downloads."""
+    return _master
+
+
+def load_instruments(client=None, path: str = INSTRUMENTS_PATH, refresh: bool = False) -> InstrumentMaster:
+    """
+    Load the instrument master, downloading it if the cache is not from today.
+
+    Args:
+        client: Kite client used for the download (defaults to the shared one)
+        path: Cache file
+        refresh: Force a download
+
+    Returns:
+        InstrumentMaster: The loaded master, also installed for get_master()
+    """
+
+    global _master
+
+    if not refresh and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                master = pickle.load(f)
+            if master.fetched_on == date.today():
+                _master = master
+                return master
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable instrument cache: {e}")
+
+    if client is None:
+        from data import market_data
+        client = market_data.kite
+
+    rows = client.instruments()
+    master = InstrumentMaster.from_rows(rows)
+    master.save(path)
+
+    logger.info(f"Downloaded {len(master)} instruments")
+
+    _master = master
+    return master
@@ -1,19 +1,53 @@
 from kiteconnect import KiteConnect
-from config.settings import API_KEY, ACCESS_TOKEN, TOKEN
-from datetime import datetime, timedelta
+from config.settings import API_KEY, ACCESS_TOKEN, SYMBOL, TOKEN
+from datetime import timedelta
+from functools import lru_cache
+
+from data.instruments import get_master
+from utils.clock import get_clock
 
 
 kite = KiteConnect(api_key=API_KEY)
 kite.set_access_token(ACCESS_TOKEN)
 
+MAX_BARS = 3000
+
+
+def set_client(client):
+    """Swap the broker client used by every module (e.g. for replay)."""
+    global kite
+    previous, kite = kite, client
+    return previous
+
+
+def resolve_token(symbol, exchange="NSE"):
+    """
+    Look up a symbol's instrument token in the instrument master.
+
+    Only the configured SYMBOL falls back to the configured TOKEN; any
+    other symbol the master does not know (or every other symbol when no
+    master is loaded) gives None, and callers must skip it rather than
+    fetch some other instrument's candles.
+    """
+
+    master = get_master()
+    token = master.token(symbol, exchange) if master else None
+
+    if token is None and symbol == SYMBOL:
+        return TOKEN
+    return token
+
 
-def get_historical(days=30):
+def get_historical(days=30, from_dt=None, token=None, to_dt=None):
 
-    to_dt = datetime.now()
-    from_dt = to_dt - timedelta(days=days)
+    if to_dt is None:
+        to_dt = get_clock().now()
+
+    if from_dt is None:
+        from_dt = to_dt - timedelta(days=days)
 
     data = kite.historical_data(
-        TOKEN,
+        TOKEN if token is None else token,
         from_dt,
         to_dt,
         "5minute"
@@ -22,10 +56,33 @@ def get_historical(days=30):
     return data
 
 
+def merge_candles(buffer, new, max_bars=MAX_BARS):
+    """
+    Append freshly fetched candles to a buffer.
+
+    Candles in the buffer at or after the first new candle are replaced,
+    since the last bar of a previous fetch may still have been forming.
+    """
+
+    if not new:
+        return buffer[-max_bars:]
+
+    first = new[0]["date"]
+    kept = [c for c in buffer if c["date"] < first]
+
+    return (kept + list(new))[-max_bars:]
+
+
+@lru_cache(maxsize=None)
+def instrument_key(symbol, exchange="NSE"):
+    return f"{exchange}:{symbol}"
+
+
 def get_ltp(symbol):
 
-    data = kite.ltp(f"NSE:{symbol}")
+    key = instrument_key(symbol)
+    data = kite.ltp(key)
 
-    if isinstance(data, dict) and f"NSE:{symbol}" in data:
-        return data[f"NSE:{symbol}"].get("last_price")
+    if isinstance(data, dict) and key in data:
+        return data[key].get("last_price")
     return None
@@ -0,0 +1,207 @@
+"""
+Streaming data-quality checks between market_data and the strategy.
+
+DataQuality validates each incoming candle against the last accepted one,
+so the cost per bar is constant no matter how long the buffer is:
+
+- invalid bars (non-positive prices, high below low, close outside the
+  range) and out-of-order bars are dropped
+- duplicate timestamps keep the latest version of the bar
+- gaps are repaired by refetching only the missing window, never the
+  whole history; bars the broker still does not return had no trades
+- price jumps above max_move and zero-volume bars are flagged, except
+  at the first bar of a corporate-action ex-date, where raw prices jump
+  by the split, bonus or dividend factor
+
+Any unrepaired problem marks the series unhealthy until `lookback` clean
+bars have arrived, and the live loop does not trade on unhealthy data.
+"""
+
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Optional
+
+from loguru import logger
+
+
+SESSION_OPEN = time(9, 15)
+SESSION_CLOSE = time(15, 30)
+
+
+class DataQuality:
+    """
+    Args:
+        interval: Candle interval
+        refetch: Callable(from_dt, to_dt) returning the candles of a
+            missing window (None disables gap repair)
+        max_move: Close-to-close change treated as a suspect print
+        lookback: Bars the strategy looks back over; data stays unhealthy
+            until this many bars follow the last problem
+        is_ex_date: Callable(date) telling whether a day is an ex-date of
+            the instrument (see data.adjustments.is_ex_date)
+    """
+
+    def __init__(self, interval: timedelta = timedelta(minutes=5),
+                 refetch: Optional[Callable] = None, max_move: float = 0.08,
+                 lookback: int = 50, session_open: time = SESSION_OPEN,
+                 session_close: time = SESSION_CLOSE,
+                 is_ex_date: Optional[Callable[[date], bool]] = None):
+        self.interval = interval
+        self.refetch = refetch
+        self.max_move = max_move
+        self.lookback = lookback
+        self.session_open = session_open
+        self.session_close = session_close
+        self.is_ex_date = is_ex_date
+        self.counters = Counter()
+        self.last = None
+        self.prev_close = None
+        self.prev_date = None
+        self.accepted = 0
+        self.clean_from = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.accepted >= self.clean_from
+
+    def prime(self, candles: list):
+        """Continue from an existing buffer (e.g. after a warm restart)."""
+
+        if candles:
+            self.last = candles[-1]
+            self.prev_close = candles[-2]["close"] if len(candles) > 1 else None
+            self.prev_date = candles[-2]["date"] if len(candles) > 1 else None
+
+    def _taint(self, reason: str, bar: dict):
+        self.counters[reason] += 1
+        self.clean_from = self.accepted + self.lookback
+        logger.warning(f"Data quality: {reason} at {bar.get('date')}")
+
+    def _valid(self, bar: dict) -> bool:
+        try:
+            o, h, l, c = bar["open"], bar["high"], bar["low"], bar["close"]
+        except KeyError:
+            return False
+        return min(o, h, l, c) > 0 and l <= h and l <= c <= h and l <= o <= h
+
+    def _missing(self, last_date, date) -> Optional[tuple]:
+        """Window of bars missing between two bar timestamps, or None."""
+
+        if not isinstance(date, datetime):
+            return None
+
+        if last_date.date() == date.date():
+            if date - last_date > self.interval:
+                return last_date + self.interval, date - self.interval
+            return None
+
+        # New session: the previous one should end at the close and this
+        # one should start at the open
+        close = datetime.combine(last_date.date(), self.session_close, last_date.tzinfo) - self.interval
+        opened = datetime.combine(date.date(), self.session_open, date.tzinfo)
+
+        if last_date < close:
+            return last_date + self.interval, close
+        if date > opened:
+            return opened, date - self.interval
+        return None
+
+    def feed(self, bars: list, repair: bool = True) -> list:
+        """
+        Validate a batch of new bars.
+
+        Returns:
+            list: The bars to merge into the buffer, in order, including any
+            bars refetched to fill gaps
+        """
+
+        out = []
+
+        for bar in bars:
+            self.counters["bars"] += 1
+
+            if not self._valid(bar):
+                self._taint("invalid", bar)
+                continue
+
+            last = self.last
+
+            if last is not None and bar["date"] < last["date"]:
+                self._taint("out_of_order", bar)
+                continue
+
+            if last is not None and bar["date"] == last["date"]:
+                # A re-sent bar: the forming candle, or a duplicate print
+                self.counters["duplicates"] += 1
+                if out and out[-1]["date"] == bar["date"]:
+                    out.pop()
+                self.last = bar
+                out.append(bar)
+                self._check_move(bar)
+                continue
+
+            if last is not None and repair:
+                window = self._missing(last["date"], bar["date"])
+                if window is not None:
+                    out.extend(self._repair(window, bar))
+
+            self.prev_close = self.last["close"] if self.last is not None else None
+            self.prev_date = self.last["date"] if self.last is not None else None
+            self.last = bar
+            self.accepted += 1
+            out.append(bar)
+            self._check_move(bar)
+
+            if not bar.get("volume"):
+                self.counters["zero_volume"] += 1
+
+        return out
+
+    def _check_move(self, bar: dict):
+        if not self.prev_close or abs(bar["close"] / self.prev_close - 1) <= self.max_move:
+            return
+
+        if self._opens_ex_date(bar):
+            self.counters["corporate_actions"] += 1
+            logger.info(f"Data quality: {bar['close'] / self.prev_close - 1:+.1%} move "
+                        f"at {bar['date']} is on an ex-date, not flagged")
+            return
+
+        self._taint("outliers", bar)
+
+    def _opens_ex_date(self, bar: dict) -> bool:
+        """Whether the bar is the first of a day on which a corporate action took effect."""
+
+        if self.is_ex_date is None or not isinstance(bar["date"], datetime):
+            return False
+
+        day = bar["date"].date()
+        if isinstance(self.prev_date, datetime) and self.prev_date.date() == day:
+            return False
+
+        return self.is_ex_date(day)
+
+    def _repair(self, window: tuple, next_bar: dict) -> list:
+        start, end = window
+        expected = int((end - start) / self.interval) + 1
+
+        self.counters["gaps"] += 1
+        self.counters["missing_bars"] += expected
+
+        if self.refetch is None:
+            self._taint("unrepaired_gaps", next_bar)
+            return []
+
+        try:
+            fetched = [b for b in self.refetch(start, end) or [] if start <= b["date"] <= end]
+        except Exception as e:
+            logger.error(f"Gap refetch failed: {e}")
+            self._taint("unrepaired_gaps", next_bar)
+            return []
+
+        # Whatever the broker still does not return had no trades
+        repaired = self.feed(fetched, repair=False)
+        self.counters["repaired_bars"] += len(repaired)
+        self.counters["empty_bars"] += expected - len(repaired)
+
+        return repaired
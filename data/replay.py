@@ -0,0 +1,219 @@
+"""
+Record and replay broker sessions.
+
+RecordingKite wraps a live Kite client and appends every recorded call
+(see RECORDED_METHODS) with its result to a newline-JSON
+file. ReplayKite serves those results back in order, so a recorded
+trading day can be driven through main.run on a VirtualClock without a
+network connection.
+"""
+
+import copy
+import json
+import os
+from collections import defaultdict, deque
+from datetime import date, datetime
+from typing import Optional
+
+from loguru import logger
+
+from utils.clock import get_clock
+
+
+RECORDED_METHODS = ("historical_data", "ltp", "quote", "place_order", "cancel_order")
+
+
+class ReplayError(Exception):
+    """Raised when a replayed session diverges from its recording."""
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _rebuild_error(name, message):
+    try:
+        from kiteconnect import exceptions
+        cls = getattr(exceptions, name, None)
+    except ImportError:
+        cls = None
+
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        return cls(message)
+    return ReplayError(f"{name}: {message}")
+
+
+class RecordingKite:
+    """Proxy around a Kite client that records broker calls to a file."""
+
+    def __init__(self, client, path: str):
+        self.client = client
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _record(self, method, args, kwargs):
+        entry = {
+            "method": method,
+            "t": get_clock().now(),
+            "args": list(args),
+            "kwargs": kwargs,
+        }
+
+        try:
+            result = getattr(self.client, method)(*args, **kwargs)
+            entry["result"] = result
+            return result
+        except Exception as e:
+            entry["error"] = {"type": type(e).__name__, "message": str(e)}
+            raise
+        finally:
+            self._file.write(json.dumps(_encode(entry)) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __getattr__(self, name):
+        if name in RECORDED_METHODS:
+            return lambda *args, **kwargs: self._record(name, args, kwargs)
+
+        # Anything not recorded goes straight to the real client
+        return getattr(self.client, name)
+
+
+class ReplayKite:
+    """
+    Stand-in Kite client that answers from a recorded session.
+
+    Each method serves its recorded calls in order. Orders are checked
+    against the recording when strict is set, so a change in strategy or
+    risk behaviour shows up as a ReplayError instead of silently passing.
+    """
+
+    def __init__(self, path: str, strict: bool = True):
+        self.path = path
+        self.strict = strict
+        self.calls = defaultdict(deque)
+        self.orders = []
+        self.start = None
+
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = _decode(json.loads(line))
+                if self.start is None:
+                    self.start = entry["t"]
+                self.calls[entry["method"]].append(entry)
+
+    def remaining(self, method: str) -> int:
+        return len(self.calls[method])
+
+    def _replay(self, method, args, kwargs):
+        if not self.calls[method]:
+            raise ReplayError(f"Recording has no more {method} calls")
+
+        entry = self.calls[method].popleft()
+
+        if "error" in entry:
+            raise _rebuild_error(entry["error"]["type"], entry["error"]["message"])
+
+        return copy.deepcopy(entry.get("result"))
+
+    def __getattr__(self, name):
+        if name in RECORDED_METHODS:
+            return lambda *args, **kwargs: self._replay(name, args, kwargs)
+        raise AttributeError(name)
+
+    def place_order(self, *args, **kwargs):
+        expected = self.calls["place_order"][0] if self.calls["place_order"] else None
+
+        if self.strict and expected is not None and expected["kwargs"] != kwargs:
+            raise ReplayError(
+                f"Order diverged from recording: expected {expected['kwargs']}, got {kwargs}"
+            )
+
+        self.orders.append(kwargs)
+        return self._replay("place_order", args, kwargs)
+
+    def set_access_token(self, access_token):
+        pass
+
+
+class ReplaySession:
+    """Session stand-in for replays: recorded calls never need a token."""
+
+    def ensure_valid(self, client=None):
+        return None
+
+    def invalidate(self):
+        pass
+
+
+def start_recording(path: str) -> RecordingKite:
+    """Wrap the active broker client so that its calls are recorded."""
+    from data import market_data
+
+    recorder = RecordingKite(market_data.kite, path)
+    market_data.set_client(recorder)
+    logger.info(f"Recording broker session to {path}")
+
+    return recorder
+
+
+def replay_session(path: str, speed: Optional[float] = 1000, strict: bool = True,
+                   events_path: Optional[str] = None):
+    """
+    Drive main.run through a recorded session on a virtual clock.
+
+    Args:
+        path: Recording written by RecordingKite
+        speed: Time acceleration (None runs as fast as possible)
+        strict: Fail when placed orders differ from the recording
+        events_path: Event log for the replayed run (None writes none, so
+            a replay never appends to the live loop's log)
+
+    Returns:
+        tuple: (ReplayKite, VirtualClock, PositionBook) after the replay
+    """
+
+    import main
+    from data import market_data
+    from utils.clock import VirtualClock, set_clock
+
+    client = ReplayKite(path, strict=strict)
+    clock = VirtualClock(client.start, speed=speed)
+    cycles = client.remaining("historical_data")
+
+    previous_client = market_data.set_client(client)
+    previous_clock = set_clock(clock)
+
+    try:
+        book = main.run(max_cycles=cycles, snapshot_path=None, session=ReplaySession(), background=False,
+                        events_path=events_path)
+    finally:
+        market_data.set_client(previous_client)
+        set_clock(previous_clock)
+
+    return client, clock, book
@@ -0,0 +1,105 @@
+"""
+Crash-safe snapshots of the live loop state.
+
+A snapshot holds the candle buffer, the position book and the scheduler
+state so that a restarted worker can resume from disk and only fetch the
+candles it missed instead of re-downloading the whole history.
+"""
+
+import os
+import pickle
+import tempfile
+import time
+from typing import Optional
+
+from loguru import logger
+
+
+SNAPSHOT_PATH = "snapshots/bot_state.pkl"
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(state: dict, path: str = SNAPSHOT_PATH) -> bool:
+    """
+    Atomically write a state snapshot to disk.
+
+    The payload is written to a temporary file in the same directory,
+    fsynced and then renamed over the previous snapshot, so a crash at any
+    point leaves either the old or the new snapshot intact.
+
+    Args:
+        state: Picklable state dictionary
+        path: Destination file
+
+    Returns:
+        bool: Whether the snapshot was written
+    """
+
+    directory = os.path.dirname(path) or "."
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "state": state,
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(tmp_path, path)
+
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to save snapshot: {e}")
+        return False
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH, max_age: Optional[float] = None) -> Optional[dict]:
+    """
+    Load the last state snapshot.
+
+    Args:
+        path: Snapshot file
+        max_age: Ignore snapshots older than this many seconds (optional)
+
+    Returns:
+        dict: The saved state, or None if there is no usable snapshot
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+
+        if payload.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"Ignoring snapshot with version {payload.get('version')}")
+            return None
+
+        age = time.time() - payload["saved_at"]
+
+        if max_age is not None and age > max_age:
+            logger.warning(f"Ignoring stale snapshot ({age:.0f}s old)")
+            return None
+
+        logger.info(f"Restored snapshot from {path} ({age:.0f}s old)")
+        return payload["state"]
+
+    except Exception as e:
+        logger.error(f"Failed to load snapshot: {e}")
+        return None
@@ -0,0 +1,408 @@
+"""
+Compressed on-disk tick archive.
+
+Ticks are stored in one file per trading day. Each file is a sequence of
+blocks, one symbol per block, followed by a block index:
+
+    block  := header | symbol | column 0 | column 1 | ...
+    header := "TKB1", symbol length, tick count, first ts, last ts,
+              byte length of every column
+    footer := index JSON | index offset (8 bytes) | "TKIX"
+
+Every column is an integer series (timestamps in ms, prices in paise,
+quantities) encoded as the first value followed by deltas, zig-zag mapped
+to unsigned and written as LEB128 varints. Consecutive ticks differ by a
+few paise and milliseconds, so most values take one or two bytes instead
+of eight. Encoding and decoding are vectorised with NumPy, and a reader
+only seeks to the blocks whose time range overlaps the query.
+
+If a writer dies before writing the index, readers fall back to scanning
+the block headers.
+"""
+
+import json
+import os
+import struct
+from datetime import date, datetime
+from typing import Iterator, Optional
+
+import numpy as np
+from loguru import logger
+
+
+ARCHIVE_DIR = "ticks"
+PRICE_SCALE = 100   # prices stored in paise
+BLOCK_TICKS = 65536
+
+FIELDS = ("ts", "price", "qty", "volume", "bid", "ask")
+PRICE_FIELDS = ("price", "bid", "ask")
+
+BLOCK_MAGIC = b"TKB1"
+INDEX_MAGIC = b"TKIX"
+HEADER = struct.Struct("<4sHIqq" + "I" * len(FIELDS))
+FOOTER = struct.Struct("<Q4s")
+
+
+# Encoding
+
+def encode_column(values: np.ndarray) -> bytes:
+    """Delta + zig-zag + varint encode an int64 series."""
+
+    values = np.asarray(values, dtype=np.int64)
+    if values.size == 0:
+        return b""
+
+    deltas = np.diff(values, prepend=np.int64(0))
+    zz = ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+
+    # Bytes needed per value: ceil(bit length / 7), at least one
+    nbytes = np.ones(zz.size, dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += zz >= np.uint64(1 << (7 * k))
+
+    ends = np.cumsum(nbytes)
+    starts = ends - nbytes
+    out = np.empty(ends[-1], dtype=np.uint8)
+
+    for k in range(int(nbytes.max())):
+        mask = nbytes > k
+        byte = (zz[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (nbytes[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + k] = (byte | more).astype(np.uint8)
+
+    return out.tobytes()
+
+
+def decode_column(raw: bytes, count: int) -> np.ndarray:
+    """Inverse of encode_column."""
+
+    if count == 0:
+        return np.empty(0, dtype=np.int64)
+
+    data = np.frombuffer(raw, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    if ends.size != count:
+        raise ValueError(f"Corrupt column: expected {count} values, found {ends.size}")
+
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts + 1
+
+    zz = np.zeros(count, dtype=np.uint64)
+    for k in range(int(lengths.max())):
+        mask = lengths > k
+        zz[mask] |= (data[starts[mask] + k].astype(np.uint64) & np.uint64(0x7F)) << np.uint64(7 * k)
+
+    deltas = (zz >> np.uint64(1)).astype(np.int64) ^ -(zz & np.uint64(1)).astype(np.int64)
+    return np.cumsum(deltas)
+
+
+def to_ms(ts) -> int:
+    if isinstance(ts, datetime):
+        return int(ts.timestamp() * 1000)
+    return int(ts)
+
+
+# Writing
+
+class TickArchiveWriter:
+    """
+    Append ticks to the archive.
+
+    Ticks are buffered per symbol and written as a block every
+    `block_ticks` ticks, on a day change and on close().
+
+    Args:
+        root: Archive directory
+        block_ticks: Ticks per block
+    """
+
+    def __init__(self, root: str = ARCHIVE_DIR, block_ticks: int = BLOCK_TICKS):
+        self.root = root
+        self.block_ticks = block_ticks
+        self.buffers = {}
+        self.day = None
+        self.file = None
+        self.index = []
+        os.makedirs(root, exist_ok=True)
+
+    def _open(self, day: date):
+        self._close_file()
+
+        path = day_path(self.root, day)
+        self.index = []
+
+        if os.path.exists(path):
+            # Reopen an earlier file: drop its index, it is rewritten on close
+            self.index = read_index(path)
+            offset = _index_offset(path)
+            self.file = open(path, "r+b")
+            self.file.truncate(offset if offset is not None else os.path.getsize(path))
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(path, "wb")
+
+        self.day = day
+
+    def append(self, symbol: str, ts, price: float, qty: int = 0, volume: int = 0,
+               bid: Optional[float] = None, ask: Optional[float] = None):
+        """Buffer one tick."""
+
+        ms = to_ms(ts)
+        day = datetime.fromtimestamp(ms / 1000).date()
+
+        if day != self.day:
+            self.flush()
+            self._open(day)
+
+        buffer = self.buffers.setdefault(symbol, {name: [] for name in FIELDS})
+        buffer["ts"].append(ms)
+        buffer["price"].append(round(price * PRICE_SCALE))
+        buffer["qty"].append(int(qty))
+        buffer["volume"].append(int(volume))
+        buffer["bid"].append(round((bid if bid is not None else price) * PRICE_SCALE))
+        buffer["ask"].append(round((ask if ask is not None else price) * PRICE_SCALE))
+
+        if len(buffer["ts"]) >= self.block_ticks:
+            self._write_block(symbol)
+
+    def append_kite(self, symbol: str, tick: dict):
+        """Buffer a KiteTicker tick (quote or full mode)."""
+
+        depth = tick.get("depth") or {}
+        buy, sell = depth.get("buy") or [{}], depth.get("sell") or [{}]
+
+        self.append(
+            symbol,
+            tick.get("exchange_timestamp") or tick.get("last_trade_time") or datetime.now(),
+            tick["last_price"],
+            tick.get("last_traded_quantity", 0),
+            tick.get("volume_traded", 0),
+            buy[0].get("price") or None,
+            sell[0].get("price") or None,
+        )
+
+    def _write_block(self, symbol: str):
+        buffer = self.buffers.pop(symbol, None)
+        if not buffer or not buffer["ts"]:
+            return
+
+        columns = [encode_column(np.array(buffer[name], dtype=np.int64)) for name in FIELDS]
+        name = symbol.encode()
+        count = len(buffer["ts"])
+        first, last = buffer["ts"][0], buffer["ts"][-1]
+
+        offset = self.file.tell()
+        self.file.write(HEADER.pack(BLOCK_MAGIC, len(name), count, first, last, *map(len, columns)))
+        self.file.write(name)
+        for column in columns:
+            self.file.write(column)
+
+        self.index.append({"symbol": symbol, "offset": offset, "count": count, "first": first, "last": last})
+
+    def flush(self):
+        """Write every buffered symbol as a block."""
+
+        for symbol in list(self.buffers):
+            self._write_block(symbol)
+
+    def _close_file(self):
+        if self.file is None:
+            return
+
+        offset = self.file.tell()
+        self.file.write(json.dumps(self.index).encode())
+        self.file.write(FOOTER.pack(offset, INDEX_MAGIC))
+        self.file.close()
+        self.file = None
+
+    def close(self):
+        self.flush()
+        self._close_file()
+
+
+# Reading
+
+def day_path(root: str, day: date) -> str:
+    return os.path.join(root, f"{day.isoformat()}.ticks")
+
+
+def _index_offset(path: str) -> Optional[int]:
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < FOOTER.size:
+            return None
+        f.seek(-FOOTER.size, os.SEEK_END)
+        offset, magic = FOOTER.unpack(f.read(FOOTER.size))
+    return offset if magic == INDEX_MAGIC else None
+
+
+def read_index(path: str) -> list:
+    """Block index of a day file (rebuilt from block headers if the footer is missing)."""
+
+    offset = _index_offset(path)
+
+    with open(path, "rb") as f:
+        if offset is not None:
+            f.seek(offset)
+            size = os.path.getsize(path) - offset - FOOTER.size
+            return json.loads(f.read(size))
+
+        logger.warning(f"No block index in {path}, scanning block headers")
+        index = []
+        while True:
+            start = f.tell()
+            raw = f.read(HEADER.size)
+            if len(raw) < HEADER.size:
+                break
+            magic, name_len, count, first, last, *lengths = HEADER.unpack(raw)
+            if magic != BLOCK_MAGIC:
+                break
+            symbol = f.read(name_len).decode()
+            f.seek(sum(lengths), os.SEEK_CUR)
+            index.append({"symbol": symbol, "offset": start, "count": count, "first": first, "last": last})
+        return index
+
+
+class TickArchive:
+    """
+    Read ticks from the archive.
+
+    Args:
+        root: Archive directory
+    """
+
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = root
+        self._indexes = {}
+
+    def days(self) -> list:
+        names = sorted(n for n in os.listdir(self.root) if n.endswith(".ticks"))
+        return [date.fromisoformat(n[:10]) for n in names]
+
+    def index(self, day: date) -> list:
+        if day not in self._indexes:
+            self._indexes[day] = read_index(day_path(self.root, day))
+        return self._indexes[day]
+
+    def symbols(self, day: date) -> list:
+        return sorted({block["symbol"] for block in self.index(day)})
+
+    def iter_blocks(self, symbol: str, start=None, end=None) -> Iterator[dict]:
+        """
+        Stream a symbol's ticks block by block.
+
+        Args:
+            start, end: Inclusive time range (datetimes or ms); None is open
+
+        Yields:
+            dict: Field name -> NumPy array; prices as floats in rupees
+        """
+
+        lo = to_ms(start) if start is not None else None
+        hi = to_ms(end) if end is not None else None
+
+        for day in self.days():
+            blocks = [
+                b for b in self.index(day)
+                if b["symbol"] == symbol
+                and (lo is None or b["last"] >= lo) and (hi is None or b["first"] <= hi)
+            ]
+            if not blocks:
+                continue
+
+            with open(day_path(self.root, day), "rb") as f:
+                for block in blocks:
+                    f.seek(block["offset"])
+                    _, name_len, count, _, _, *lengths = HEADER.unpack(f.read(HEADER.size))
+                    f.seek(name_len, os.SEEK_CUR)
+
+                    arrays = {}
+                    for name, length in zip(FIELDS, lengths):
+                        values = decode_column(f.read(length), count)
+                        arrays[name] = values / PRICE_SCALE if name in PRICE_FIELDS else values
+
+                    if lo is not None or hi is not None:
+                        ts = arrays["ts"]
+                        mask = np.ones(count, dtype=bool)
+                        if lo is not None:
+                            mask &= ts >= lo
+                        if hi is not None:
+                            mask &= ts <= hi
+                        arrays = {name: values[mask] for name, values in arrays.items()}
+
+                    yield arrays
+
+    def read(self, symbol: str, start=None, end=None) -> dict:
+        """All of a symbol's ticks in a range as one set of arrays."""
+
+        blocks = list(self.iter_blocks(symbol, start, end))
+        if not blocks:
+            return {name: np.empty(0) for name in FIELDS}
+        return {name: np.concatenate([b[name] for b in blocks]) for name in FIELDS}
+
+    def replay(self, symbols: list, start=None, end=None) -> Iterator[tuple]:
+        """
+        Ticks of several symbols merged in time order.
+
+        Yields:
+            tuple: (symbol, ts_ms, price, qty, volume, bid, ask)
+        """
+
+        data = [(s, self.read(s, start, end)) for s in symbols]
+        data = [(s, d) for s, d in data if len(d["ts"])]
+        if not data:
+            return
+
+        ts = np.concatenate([d["ts"] for _, d in data])
+        owner = np.concatenate([np.full(len(d["ts"]), i) for i, (_, d) in enumerate(data)])
+        columns = {name: np.concatenate([d[name] for _, d in data]) for name in FIELDS[1:]}
+        order = np.argsort(ts, kind="stable")
+
+        names = [s for s, _ in data]
+        rows = zip(
+            owner[order].tolist(), ts[order].tolist(),
+            *(columns[name][order].tolist() for name in FIELDS[1:]),
+        )
+        for i, *values in rows:
+            yield (names[i], *values)
+
+
+def ticks_to_candles(ticks: dict, interval: int = 300) -> list:
+    """
+    Aggregate tick arrays into OHLCV candles.
+
+    Volume is taken from the traded quantity of each tick.
+
+    Args:
+        ticks: Arrays from TickArchive.read()
+        interval: Candle length in seconds
+
+    Returns:
+        list: Candle dicts like get_historical() returns
+    """
+
+    ts, price, qty = ticks["ts"], ticks["price"], ticks["qty"]
+    if len(ts) == 0:
+        return []
+
+    bucket = ts // (interval * 1000)
+    edges = np.flatnonzero(np.diff(bucket)) + 1
+    starts = np.concatenate(([0], edges))
+    ends = np.concatenate((edges, [len(ts)]))
+
+    opens = price[starts]
+    closes = price[ends - 1]
+    highs = np.maximum.reduceat(price, starts)
+    lows = np.minimum.reduceat(price, starts)
+    volumes = np.add.reduceat(qty, starts)
+
+    return [
+        {
+            "date": datetime.fromtimestamp(int(b) * interval),
+            "open": float(o), "high": float(h), "low": float(l), "close": float(c),
+            "volume": int(v),
+        }
+        for b, o, h, l, c, v in zip(bucket[starts], opens, highs, lows, closes, volumes)
+    ]
@@ -0,0 +1,216 @@
+"""
+Parent order slicing.
+
+Large orders are split into child orders spread over a time window,
+either evenly (TWAP) or in proportion to a volume profile (VWAP). The
+children are sent on the active clock, so a replay on a VirtualClock works
+a parent order in virtual time instead of stalling on real sleeps.
+
+The live loop hands children to a SliceScheduler and moves on; they are
+sent from its wait between cycles, so working a parent order never holds
+up a cycle (or trips the watchdog's cycle timeout).
+"""
+
+import heapq
+import itertools
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+from loguru import logger
+
+from utils.clock import get_clock
+
+
+class ChildOrder(NamedTuple):
+    at: float   # seconds after the schedule starts
+    qty: int
+
+
+def _allocate(qty: int, weights: Sequence[float]) -> List[int]:
+    """Split qty into integer parts proportional to weights, summing exactly to qty."""
+
+    total = float(sum(weights))
+    if total <= 0:
+        weights = [1.0] * len(weights)
+        total = float(len(weights))
+
+    raw = [qty * w / total for w in weights]
+    parts = [int(r) for r in raw]
+
+    # Hand the rounding remainder to the largest fractional parts
+    remainder = qty - sum(parts)
+    order = sorted(range(len(raw)), key=lambda i: raw[i] - parts[i], reverse=True)
+    for i in order[:remainder]:
+        parts[i] += 1
+
+    return parts
+
+
+def twap_schedule(qty: int, duration: float, slices: int) -> List[ChildOrder]:
+    """Split qty into equal child orders evenly spaced over duration seconds."""
+
+    slices = max(1, min(slices, qty))
+    step = duration / slices
+    parts = _allocate(qty, [1.0] * slices)
+
+    return [ChildOrder(i * step, q) for i, q in enumerate(parts) if q > 0]
+
+
+def vwap_schedule(qty: int, duration: float, volume_profile: Sequence[float]) -> List[ChildOrder]:
+    """
+    Split qty in proportion to a volume profile.
+
+    Args:
+        qty: Parent quantity
+        duration: Window in seconds
+        volume_profile: Expected volume for each equal bucket of the window,
+            e.g. the average volume of the matching candles on past days
+    """
+
+    buckets = len(volume_profile)
+    if buckets == 0:
+        return twap_schedule(qty, duration, 1)
+
+    step = duration / buckets
+    parts = _allocate(qty, volume_profile)
+
+    return [ChildOrder(i * step, q) for i, q in enumerate(parts) if q > 0]
+
+
+def run_schedule(children: Sequence[ChildOrder], send: Callable[[int], Optional[str]], clock=None):
+    """
+    Send child orders at their scheduled offsets on the active clock.
+
+    Offsets are measured from the start of the schedule, so time spent in
+    a slow broker call is taken off the next wait instead of drifting.
+
+    Returns:
+        list: The result of send for every child
+    """
+
+    clock = clock or get_clock()
+    start = clock.time()
+    results = []
+
+    for child in children:
+        delay = child.at - (clock.time() - start)
+        if delay > 0:
+            clock.sleep(delay)
+
+        results.append(send(child.qty))
+        logger.info(f"Child order {len(results)}/{len(children)}: {child.qty}")
+
+    return results
+
+
+class SliceScheduler:
+    """
+    Child orders waiting for their send time on the active clock.
+
+    submit() only queues children; they go out from sleep(), which waits
+    on the clock in steps that end at each child's due time. Everything
+    runs on the caller's thread, so a virtual clock advances exactly as
+    it would without pending children.
+
+    Args:
+        clock: Clock to schedule on (defaults to the active one)
+        on_send: Optional callback invoked with the result of every send
+    """
+
+    def __init__(self, clock=None, on_send: Optional[Callable] = None):
+        self.clock = clock or get_clock()
+        self.on_send = on_send
+        self._pending = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, children: Sequence[ChildOrder], send: Callable[[int], Optional[str]]):
+        """Queue children at their offsets from now."""
+
+        start = self.clock.time()
+        for child in children:
+            heapq.heappush(self._pending, (start + child.at, next(self._seq), child.qty, send))
+
+    def run_due(self, now: Optional[float] = None) -> list:
+        """
+        Send every child whose time has come.
+
+        Returns:
+            list: The result of send for every child sent
+        """
+
+        now = self.clock.time() if now is None else now
+        results = []
+
+        while self._pending and self._pending[0][0] <= now:
+            _, _, qty, send = heapq.heappop(self._pending)
+
+            try:
+                result = send(qty)
+            except Exception as e:
+                logger.error(f"Child order of {qty} failed: {e}")
+                result = None
+
+            results.append(result)
+            logger.info(f"Child order: {qty} ({len(self._pending)} pending)")
+
+            if self.on_send is not None:
+                self.on_send(result)
+
+        return results
+
+    def sleep(self, seconds: float):
+        """Wait seconds on the clock, sending children as they fall due."""
+
+        end = self.clock.time() + seconds
+        self.run_due()
+
+        while True:
+            now = self.clock.time()
+            if now >= end:
+                break
+
+            due = self._pending[0][0] if self._pending else end
+            self.clock.sleep(min(due, end) - now)
+            self.run_due()
+
+    def cancel(self) -> int:
+        """Drop every pending child. Returns how many were dropped."""
+
+        dropped = len(self._pending)
+        self._pending = []
+        if dropped:
+            logger.warning(f"Cancelled {dropped} pending child orders")
+        return dropped
+
+
+def execute_sliced(signal, qty, duration=60, slices=5, volume_profile=None, place=None,
+                   scheduler: Optional[SliceScheduler] = None):
+    """
+    Work a parent order as TWAP (or VWAP when a volume profile is given).
+
+    Args:
+        scheduler: Queue the children here and return at once; without one
+            the children are sent before returning
+
+    Returns:
+        list: Order ids of the child orders, or the queued children when a
+            scheduler is given
+    """
+
+    if place is None:
+        from execution.orders import place_order as place
+
+    if volume_profile:
+        children = vwap_schedule(qty, duration, volume_profile)
+    else:
+        children = twap_schedule(qty, duration, slices)
+
+    logger.info(f"Slicing {signal} {qty} into {len(children)} child orders over {duration}s")
+
+    if scheduler is not None:
+        scheduler.submit(children, lambda q: place(signal, q))
+        return children
+
+    return run_schedule(children, lambda q: place(signal, q))
@@ -0,0 +1,173 @@
+"""
+Priority queue between signal generation and order placement.
+
+When many symbols signal on the same bar, orders leave in priority order
+instead of loop order, at most as fast as the broker rate limit allows:
+
+1. stops, then other risk-reducing exits (largest notional first)
+2. entries, by signal strength x expected edge, discounted by the age of
+   the signal (halved every `half_life` seconds); entries whose signal is
+   older than `max_age` are dropped rather than sent late
+
+The discount depends only on the signal timestamp, so every priority is
+fixed at push time and the queue is a plain heap. Orders pushed while a
+drain is running (a stop after a fill, say) still go out before any
+entry that is waiting. The time each order spent queued is recorded per
+kind and emitted as a `queue_wait` stats event.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, NamedTuple, Optional
+
+import numpy as np
+from loguru import logger
+
+from risk.session import ORDERS_PER_SECOND
+from utils.events import NullEventLog
+from utils.ratelimit import RateLimiter
+
+
+STOP, EXIT, ENTRY = "stop", "exit", "entry"
+KINDS = (STOP, EXIT, ENTRY)
+
+MAX_SIGNAL_AGE = 120   # seconds before an entry signal is too old to act on
+HALF_LIFE = 30         # seconds for an entry's priority to halve
+WAIT_SAMPLES = 1000    # recent queue waits kept per kind for stats()
+
+
+class QueuedOrder(NamedTuple):
+    symbol: str
+    side: str
+    qty: int
+    price: float
+    kind: str
+    strength: float
+    edge_bps: float
+    ts: float              # when the signal was generated (wall clock)
+    enqueued: float        # when it was queued (monotonic)
+    payload: Any           # caller data, e.g. the original decision
+
+
+def order_kind(side: str, position: int) -> str:
+    """EXIT if an order on `side` reduces the signed position, else ENTRY."""
+
+    if position > 0 and side == "SELL" or position < 0 and side == "BUY":
+        return EXIT
+    return ENTRY
+
+
+class OrderQueue:
+    """
+    Args:
+        limiter: RateLimiter shared with other order senders (defaults to
+            ORDERS_PER_SECOND)
+        max_age: Seconds after which an entry signal is dropped
+        half_life: Seconds for an entry's priority to halve
+        events: EventLog receiving a queue_wait stats event per order sent
+    """
+
+    def __init__(self, limiter: Optional[RateLimiter] = None, max_age: float = MAX_SIGNAL_AGE,
+                 half_life: float = HALF_LIFE, events=None):
+        self.limiter = limiter or RateLimiter(ORDERS_PER_SECOND)
+        self.max_age = max_age
+        self.half_life = half_life
+        self.events = events or NullEventLog()
+        self.waits = {kind: deque(maxlen=WAIT_SAMPLES) for kind in KINDS}
+        self.dropped = 0
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _priority(self, order: QueuedOrder) -> float:
+        if order.kind != ENTRY:
+            return -abs(order.qty * order.price)
+
+        # log(score * 2 ** -(now - ts) / half_life) without the now term,
+        # which is the same for every order at any given moment
+        score = max(order.strength, 1e-6) * max(order.edge_bps, 1e-6)
+        return -(math.log(score) + order.ts * math.log(2) / self.half_life)
+
+    def push(self, symbol: str, side: str, qty: int, price: float, kind: str = ENTRY,
+             strength: float = 1.0, edge_bps: float = 1.0, ts: Optional[float] = None,
+             payload: Any = None) -> QueuedOrder:
+        order = QueuedOrder(symbol, side, qty, price, kind, strength, edge_bps,
+                            time.time() if ts is None else ts, time.monotonic(), payload)
+
+        with self._lock:
+            heapq.heappush(self._heap, (KINDS.index(kind), self._priority(order), next(self._seq), order))
+
+        return order
+
+    def pop(self) -> Optional[QueuedOrder]:
+        """Highest-priority order still worth sending, or None when empty."""
+
+        with self._lock:
+            while self._heap:
+                order = heapq.heappop(self._heap)[-1]
+                if order.kind == ENTRY and time.time() - order.ts > self.max_age:
+                    self.dropped += 1
+                    logger.warning(f"Dropping stale {order.side} {order.symbol}: "
+                                   f"signal is {time.time() - order.ts:.0f}s old")
+                    continue
+                return order
+        return None
+
+    def drain(self, place: Callable[[QueuedOrder], Any], max_orders: Optional[int] = None) -> list:
+        """
+        Send queued orders in priority order under the rate limiter.
+
+        Args:
+            place: Callable(QueuedOrder) that sends one order
+            max_orders: Stop after this many (None: until empty)
+
+        Returns:
+            list: (QueuedOrder, place result) in the order sent
+        """
+
+        sent = []
+
+        while max_orders is None or len(sent) < max_orders:
+            order = self.pop()
+            if order is None:
+                break
+
+            self.limiter.acquire()
+            wait = time.monotonic() - order.enqueued
+            self.waits[order.kind].append(wait)
+            self.events.stats("queue_wait", {"symbol": order.symbol, "kind": order.kind, "wait": wait})
+
+            try:
+                result = place(order)
+            except Exception as e:
+                logger.error(f"Order for {order.symbol} failed: {e}")
+                result = None
+
+            sent.append((order, result))
+
+        return sent
+
+    def stats(self) -> dict:
+        """Queue wait (seconds) per kind over recent orders: count, mean, p50, p95, max."""
+
+        report = {"pending": len(self._heap), "dropped": self.dropped}
+
+        for kind, waits in self.waits.items():
+            if waits:
+                values = np.fromiter(waits, float, len(waits))
+                report[kind] = {
+                    "count": len(values),
+                    "mean": float(values.mean()),
+                    "p50": float(np.percentile(values, 50)),
+                    "p95": float(np.percentile(values, 95)),
+                    "max": float(values.max()),
+                }
+
+        return report
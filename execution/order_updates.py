@@ -0,0 +1,166 @@
+"""
+Order update handling.
+
+OrderUpdateStream consumes pushed order updates (Kite WebSocket order
+updates, HTTP postbacks, or the paper broker's fill callback) and applies
+fills to the position book as they arrive, so nothing has to poll
+order_history. Partial fills are applied incrementally.
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Optional
+
+from loguru import logger
+
+from execution.positions import PositionBook
+
+
+TERMINAL = ("COMPLETE", "REJECTED", "CANCELLED")
+
+
+class OrderUpdateStream:
+    """
+    Args:
+        book: Position book that receives fills
+        on_fill: Callbacks called as fn(update, qty, price) for every
+            newly filled quantity
+        on_reject: Callbacks called as fn(update) for rejected orders
+    """
+
+    def __init__(self, book: PositionBook, on_fill: Optional[list] = None,
+                 on_reject: Optional[list] = None):
+        self.book = book
+        self.on_fill = list(on_fill or [])
+        self.on_reject = list(on_reject or [])
+        self.filled = {}
+        self.status = {}
+        self.live = False
+        self._lock = threading.Lock()
+
+    def handle(self, update: dict):
+        """Apply one order update (Kite order update / postback payload)."""
+
+        order_id = update.get("order_id")
+        status = update.get("status")
+
+        with self._lock:
+            if self.status.get(order_id) in TERMINAL:
+                return
+
+            previous = self.filled.get(order_id, 0)
+            filled = int(update.get("filled_quantity") or 0)
+            delta = filled - previous
+
+            self.status[order_id] = status
+            self.filled[order_id] = max(previous, filled)
+
+            pnl = 0.0
+            if delta > 0:
+                price = update.get("average_price") or update.get("price") or 0.0
+                pnl = self.book.apply_fill(
+                    update["tradingsymbol"], update["transaction_type"], delta, price
+                )
+
+        if delta > 0:
+            update = dict(update, pnl=pnl)
+            for callback in list(self.on_fill):
+                callback(update, delta, price)
+
+        if status == "REJECTED":
+            logger.error(f"Order {order_id} rejected: {update.get('status_message')}")
+            for callback in self.on_reject:
+                callback(update)
+
+    def assume_filled(self, order_id, symbol, side, qty, price):
+        """
+        Record a fill for an order when no update feed is attached (e.g. replays).
+
+        Only orders the broker accepted (order_id is not None) are booked.
+        """
+
+        if order_id is None:
+            logger.warning(f"Not booking {side} {qty} {symbol}: the order was not placed")
+            return
+
+        self.handle({
+            "order_id": order_id,
+            "status": "COMPLETE",
+            "tradingsymbol": symbol,
+            "transaction_type": side,
+            "filled_quantity": qty,
+            "average_price": price,
+        })
+
+    # Sources
+
+    def attach_paper(self, paper_broker):
+        """Receive fills from a PaperBroker (the local stand-in for tests and PAPER mode)."""
+
+        paper_broker.on_fill = self.handle
+        self.live = True
+        return self
+
+    def attach_ticker(self, api_key: str, access_token: str):
+        """Subscribe to Kite WebSocket order updates in a background thread."""
+
+        from kiteconnect import KiteTicker
+
+        ticker = KiteTicker(api_key, access_token)
+        ticker.on_order_update = lambda ws, data: self.handle(data)
+        ticker.connect(threaded=True)
+        self.live = True
+        return ticker
+
+
+def verify_postback(payload: dict, api_secret: str) -> bool:
+    """Check a Kite postback checksum: SHA-256 of order_id + order_timestamp + api_secret."""
+
+    raw = f"{payload.get('order_id')}{payload.get('order_timestamp')}{api_secret}"
+    expected = hashlib.sha256(raw.encode()).hexdigest()
+    return hmac.compare_digest(expected, str(payload.get("checksum", "")))
+
+
+def serve_postbacks(stream: OrderUpdateStream, api_secret: str, host: str = "127.0.0.1",
+                    port: int = 8080) -> HTTPServer:
+    """
+    Accept Kite postbacks over HTTP and feed them to the stream.
+
+    Binds to localhost by default; expose it through the reverse proxy
+    that terminates TLS for the postback URL rather than binding publicly.
+
+    Returns:
+        HTTPServer: Running in a daemon thread; call shutdown() to stop
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length))
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+
+            if not verify_postback(payload, api_secret):
+                logger.warning(f"Rejected postback with bad checksum for {payload.get('order_id')}")
+                self.send_response(403)
+                self.end_headers()
+                return
+
+            stream.handle(payload)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="postbacks", daemon=True).start()
+    stream.live = True
+
+    return server
@@ -1,43 +1,187 @@
 from config.settings import MODE, SYMBOL
-from data.market_data import kite
+from data import market_data
+from data.instruments import get_master
+from execution.paper import PaperBroker
 from loguru import logger
 
 
-def place_order(signal, qty):
+TICK_SIZE = 0.05
 
-    if MODE == "PAPER":
+paper_broker = PaperBroker()
 
-        logger.info(f"PAPER TRADE: {signal} {qty}")
-        return
+
+def broker():
+    """Return the client orders are sent to: the paper engine or the live broker."""
+    return paper_broker if MODE == "PAPER" else market_data.kite
+
+
+def round_to_tick(price, tick=TICK_SIZE):
+    """Round a price to the nearest valid tick."""
+    return round(round(price / tick) * tick, 2)
+
+
+def opposite(side):
+    return "SELL" if side == "BUY" else "BUY"
+
+
+def place_order(signal, qty, order_type="MARKET", price=None, trigger_price=None,
+                symbol=SYMBOL, product="MIS"):
+    """
+    Place an order with the broker.
+
+    Args:
+        signal: "BUY" or "SELL"
+        qty: Quantity
+        order_type: "MARKET", "LIMIT", "SL" or "SL-M"
+        price: Limit price (LIMIT and SL orders)
+        trigger_price: Trigger price (SL and SL-M orders)
+        symbol: Trading symbol
+        product: Broker product code
+
+    Returns:
+        str: Broker order id, or None on failure
+    """
+
+    if signal not in ("BUY", "SELL"):
+        return None
+
+    master = get_master()
+    rounding = master.round_price if master else lambda _, p: round_to_tick(p)
+
+    params = {}
+
+    if price is not None:
+        params["price"] = rounding(symbol, price)
+
+    if trigger_price is not None:
+        params["trigger_price"] = rounding(symbol, trigger_price)
 
     try:
 
-        if signal == "BUY":
-
-            kite.place_order(
-                variety="regular",
-                exchange="NSE",
-                tradingsymbol=SYMBOL,
-                transaction_type="BUY",
-                quantity=qty,
-                order_type="MARKET",
-                product="MIS"
-            )
-
-        elif signal == "SELL":
-
-            kite.place_order(
-                variety="regular",
-                exchange="NSE",
-                tradingsymbol=SYMBOL,
-                transaction_type="SELL",
-                quantity=qty,
-                order_type="MARKET",
-                product="MIS"
-            )
+        if master:
+            master.validate_quantity(symbol, qty)
+
+        order_id = broker().place_order(
+            variety="regular",
+            exchange="NSE",
+            tradingsymbol=symbol,
+            transaction_type=signal,
+            quantity=qty,
+            order_type=order_type,
+            product=product,
+            **params
+        )
 
         logger.success("Order Placed")
 
+        return order_id
+
+    except Exception as e:
+
+        logger.error(e)
+
+        return None
+
+
+def cancel_order(order_id):
+    """Cancel an open order. Returns whether the cancel was sent."""
+
+    if order_id is None:
+        return False
+
+    try:
+        broker().cancel_order(variety="regular", order_id=order_id)
+        return True
     except Exception as e:
+        logger.error(e)
+        return False
+
+
+def place_limit_order(signal, qty, ltp, improvement=1, symbol=SYMBOL):
+    """
+    Place a limit order priced `improvement` ticks better than the LTP.
+
+    A BUY rests below the last price and a SELL above it, so fills come
+    with price improvement instead of paying the spread.
+    """
+
+    offset = improvement * TICK_SIZE
+    price = ltp - offset if signal == "BUY" else ltp + offset
+
+    return place_order(signal, qty, order_type="LIMIT", price=price, symbol=symbol)
+
+
+def place_stoploss(entry_side, qty, stoploss, symbol=SYMBOL):
+    """Place a broker-side SL-M order that exits a position opened with entry_side."""
+
+    return place_order(
+        opposite(entry_side), qty, order_type="SL-M", trigger_price=stoploss, symbol=symbol
+    )
+
+
+class BracketOrder:
+    """
+    Entry with a stop-loss and a target exit, one cancelling the other.
+
+    The entry is sent at market. With an order-update stream attached, the
+    SL-M stop and the LIMIT target go out once the entry has filled and
+    whichever exit fills first cancels the other; without one they are
+    placed straight after the entry and fills must be passed to on_fill.
+    """
+
+    def __init__(self, signal, qty, stoploss, target, symbol=SYMBOL):
+        self.signal = signal
+        self.qty = qty
+        self.stoploss = stoploss
+        self.target = target
+        self.symbol = symbol
+        self.entry_id = None
+        self.entry_filled = 0
+        self.stop_id = None
+        self.target_id = None
+        self.closed = False
+        self.stream = None
+
+    def submit(self, stream=None):
+        """Send the entry; the exit legs follow its fill when a live stream is given."""
+
+        self.entry_id = place_order(self.signal, self.qty, symbol=self.symbol)
+
+        if self.entry_id is None:
+            self.closed = True
+        elif stream is not None and stream.live:
+            self.stream = stream
+            stream.on_fill.append(self.on_update)
+        else:
+            self.place_exits()
+
+        return self
+
+    def place_exits(self):
+        self.stop_id = place_stoploss(self.signal, self.qty, self.stoploss, symbol=self.symbol)
+        self.target_id = place_order(
+            opposite(self.signal), self.qty, order_type="LIMIT",
+            price=self.target, symbol=self.symbol
+        )
+
+    def on_update(self, update, qty, price):
+        """Order-update stream callback: place exits on the entry fill, then act as OCO."""
+
+        if update["order_id"] == self.entry_id:
+            self.entry_filled += qty
+            if self.entry_filled >= self.qty and self.stop_id is None:
+                self.place_exits()
+        else:
+            self.on_fill(update["order_id"])
+
+    def on_fill(self, order_id):
+        """Cancel the remaining exit leg once the other one has filled."""
+
+        if self.closed or order_id not in (self.stop_id, self.target_id):
+            return
+
+        self.closed = True
+        cancel_order(self.target_id if order_id == self.stop_id else self.stop_id)
 
-        logger.error(e)
\ No newline at end of file
+        if self.stream is not None:
+            self.stream.on_fill.remove(self.on_update)
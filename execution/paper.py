@@ -0,0 +1,266 @@
+"""
+Paper-trading matching engine.
+
+PaperBroker accepts the same place_order/cancel_order/orders/positions
+calls as the Kite client and fills them locally against the LTP or tick
+stream fed to on_tick, with a configurable latency and slippage model.
+"""
+
+import itertools
+from collections import defaultdict
+from typing import Callable, Optional
+
+from loguru import logger
+
+from execution.positions import PositionBook
+from utils.clock import get_clock
+
+
+def bps_slippage(bps: float = 2.0) -> Callable[[str, float, int], float]:
+    """Slippage model that moves every fill `bps` basis points against the order."""
+
+    def model(side, price, qty):
+        adj = price * bps / 10000
+        return price + adj if side == "BUY" else price - adj
+
+    return model
+
+
+class PaperBroker:
+    """
+    Local broker simulator with its own position book.
+
+    Args:
+        latency: Seconds between accepting an order and it becoming
+            eligible to fill
+        slippage: Callable (side, price, qty) -> fill price for market and
+            stop-market fills
+        on_fill: Optional callback invoked with every filled order dict
+    """
+
+    def __init__(self, latency: float = 0.0, slippage: Optional[Callable] = None,
+                 on_fill: Optional[Callable] = None):
+        self.latency = latency
+        self.slippage = slippage or bps_slippage()
+        self.on_fill = on_fill
+        self.book = PositionBook()
+        self.last_price = {}
+        self._orders = {}
+        self._pending = defaultdict(list)
+        self._ids = itertools.count(1)
+
+    # Kite-compatible interface
+
+    def place_order(self, variety="regular", exchange="NSE", tradingsymbol=None,
+                    transaction_type=None, quantity=0, order_type="MARKET",
+                    product="MIS", price=None, trigger_price=None, **kwargs):
+
+        order_id = f"PAPER{next(self._ids)}"
+        now = get_clock().time()
+
+        order = {
+            "order_id": order_id,
+            "exchange": exchange,
+            "tradingsymbol": tradingsymbol,
+            "transaction_type": transaction_type,
+            "quantity": quantity,
+            "order_type": order_type,
+            "product": product,
+            "price": price,
+            "trigger_price": trigger_price,
+            "status": "TRIGGER PENDING" if order_type in ("SL", "SL-M") else "OPEN",
+            "filled_quantity": 0,
+            "average_price": 0.0,
+            "order_timestamp": now,
+            "eligible_at": now + self.latency,
+        }
+
+        self._orders[order_id] = order
+        self._pending[tradingsymbol].append(order)
+
+        logger.info(f"PAPER TRADE: {transaction_type} {quantity} {tradingsymbol} {order_type}")
+
+        if self.latency <= 0 and tradingsymbol in self.last_price:
+            self._match(tradingsymbol, self.last_price[tradingsymbol], now)
+
+        return order_id
+
+    def cancel_order(self, variety="regular", order_id=None, **kwargs):
+
+        order = self._orders.get(order_id)
+
+        if order is None or order["status"] not in ("OPEN", "TRIGGER PENDING"):
+            return None
+
+        order["status"] = "CANCELLED"
+        pending = self._pending[order["tradingsymbol"]]
+        if order in pending:
+            pending.remove(order)
+
+        return order_id
+
+    def orders(self):
+        return [dict(o) for o in self._orders.values()]
+
+    def order_history(self, order_id):
+        return [dict(self._orders[order_id])]
+
+    def positions(self):
+        net = [
+            {
+                "tradingsymbol": symbol,
+                "exchange": "NSE",
+                "quantity": pos["qty"],
+                "average_price": pos["avg_price"],
+                "last_price": self.last_price.get(symbol, 0.0),
+                "realised": pos["realized"],
+                "pnl": pos["realized"] + (self.last_price.get(symbol, pos["avg_price"]) - pos["avg_price"]) * pos["qty"],
+            }
+            for symbol, pos in self.book.positions.items()
+        ]
+        return {"net": net, "day": net}
+
+    def ltp(self, *instruments):
+        keys = instruments[0] if len(instruments) == 1 and isinstance(instruments[0], (list, tuple)) else instruments
+        return {
+            key: {"last_price": self.last_price[key.split(":")[-1]]}
+            for key in keys if key.split(":")[-1] in self.last_price
+        }
+
+    # Matching
+
+    def on_tick(self, symbol: str, price: float, ts: Optional[float] = None):
+        """Feed a trade price for a symbol and match its pending orders."""
+
+        self.last_price[symbol] = price
+        self._match(symbol, price, get_clock().time() if ts is None else ts)
+
+    def _match(self, symbol, price, now):
+
+        # Detach the queue: fill callbacks may place or cancel orders
+        pending = self._pending.pop(symbol, [])
+        if not pending:
+            return
+
+        still_pending = []
+
+        for order in pending:
+            fill_price = None
+
+            if order["status"] not in ("OPEN", "TRIGGER PENDING"):
+                continue
+
+            if now < order["eligible_at"]:
+                still_pending.append(order)
+                continue
+
+            side = order["transaction_type"]
+            kind = order["order_type"]
+
+            if kind == "MARKET":
+                fill_price = self.slippage(side, price, order["quantity"])
+
+            elif kind == "LIMIT":
+                crossed = price <= order["price"] if side == "BUY" else price >= order["price"]
+                if crossed:
+                    fill_price = order["price"]
+
+            elif kind in ("SL", "SL-M"):
+                triggered = price >= order["trigger_price"] if side == "BUY" else price <= order["trigger_price"]
+                if triggered and kind == "SL-M":
+                    fill_price = self.slippage(side, price, order["quantity"])
+                elif triggered:
+                    # Triggered SL orders rest as a limit at their price
+                    order["order_type"] = "LIMIT"
+                    order["status"] = "OPEN"
+
+            if fill_price is None:
+                still_pending.append(order)
+                continue
+
+            self._fill(order, fill_price)
+
+        self._pending[symbol] = still_pending + self._pending.get(symbol, [])
+
+    def _fill(self, order, price):
+
+        order["status"] = "COMPLETE"
+        order["filled_quantity"] = order["quantity"]
+        order["average_price"] = price
+
+        pnl = self.book.apply_fill(
+            order["tradingsymbol"], order["transaction_type"], order["quantity"], price
+        )
+        order["pnl"] = pnl
+
+        if self.on_fill is not None:
+            self.on_fill(dict(order))
+
+    # State
+
+    def to_dict(self) -> dict:
+        """Positions, last prices and working orders, for the live loop's snapshot."""
+
+        working = [dict(o) for o in self._orders.values() if o["status"] in ("OPEN", "TRIGGER PENDING")]
+        ids = [int(order_id[len("PAPER"):]) for order_id in self._orders]
+
+        return {
+            "positions": self.book.to_dict(),
+            "last_price": dict(self.last_price),
+            "orders": working,
+            "next_id": max(ids, default=0) + 1,
+        }
+
+    def restore(self, state: dict):
+        """Resume from to_dict() output: working orders stay live and ids keep counting."""
+
+        self.book = PositionBook.from_dict(state.get("positions"))
+        self.last_price = dict(state.get("last_price", {}))
+        self._orders = {o["order_id"]: dict(o) for o in state.get("orders", [])}
+        self._pending = defaultdict(list)
+        for order in self._orders.values():
+            self._pending[order["tradingsymbol"]].append(order)
+        self._ids = itertools.count(state.get("next_id", 1))
+
+    def total_pnl(self) -> float:
+        """Realized plus unrealized PnL across all symbols."""
+
+        return sum(p["pnl"] for p in self.positions()["net"])
+
+
+class ShadowRunner:
+    """
+    Run several strategies side by side, each against its own PaperBroker.
+
+    Every bar is pushed to all brokers so the strategies see identical
+    prices, and each keeps an independent position book and PnL.
+
+    Args:
+        strategies: Mapping of name -> callable(candles) returning a signal
+        qty: Quantity traded per signal
+        **broker_kwargs: Passed to every PaperBroker
+    """
+
+    def __init__(self, strategies: dict, qty: int = 1, **broker_kwargs):
+        self.strategies = strategies
+        self.qty = qty
+        self.brokers = {name: PaperBroker(**broker_kwargs) for name in strategies}
+
+    def on_bar(self, symbol: str, candles: list):
+        price = candles[-1]["close"]
+
+        for name, strategy in self.strategies.items():
+            broker = self.brokers[name]
+            broker.on_tick(symbol, price)
+
+            signal = strategy(candles)
+            position = broker.book.qty(symbol)
+
+            # Long-only shadows: enter when flat, exit when long
+            if signal == "BUY" and position == 0:
+                broker.place_order(tradingsymbol=symbol, transaction_type="BUY", quantity=self.qty)
+            elif signal == "SELL" and position > 0:
+                broker.place_order(tradingsymbol=symbol, transaction_type="SELL", quantity=position)
+
+    def results(self) -> dict:
+        return {name: broker.total_pnl() for name, broker in self.brokers.items()}
@@ -0,0 +1,104 @@
+import threading
+from typing import Optional
+
+
+class PositionBook:
+    """
+    Local record of net positions per symbol.
+
+    Quantities are signed: positive for long, negative for short. Each entry
+    also tracks the average entry price and the PnL realized on that symbol.
+
+    Fills (order-update thread), corrections (reconciler thread) and
+    snapshots (main loop) all go through `lock`; callers that must keep
+    related state such as stop order ids consistent with the book hold it
+    around both.
+    """
+
+    def __init__(self, positions: Optional[dict] = None):
+        self.lock = threading.RLock()
+        self.positions = {
+            symbol: dict(pos) for symbol, pos in (positions or {}).items()
+        }
+
+    def get(self, symbol: str) -> dict:
+        """Return the position for a symbol (flat if unknown)."""
+        return self.positions.get(
+            symbol, {"qty": 0, "avg_price": 0.0, "realized": 0.0}
+        )
+
+    def qty(self, symbol: str) -> int:
+        return self.get(symbol)["qty"]
+
+    def apply_fill(self, symbol: str, side: str, qty: int, price: float) -> float:
+        """
+        Apply a fill to the book.
+
+        Args:
+            symbol: Trading symbol
+            side: "BUY" or "SELL"
+            qty: Filled quantity (positive)
+            price: Fill price
+
+        Returns:
+            float: PnL realized by this fill
+        """
+
+        with self.lock:
+            return self._apply_fill(symbol, side, qty, price)
+
+    def _apply_fill(self, symbol: str, side: str, qty: int, price: float) -> float:
+        pos = dict(self.get(symbol))
+        signed = qty if side == "BUY" else -qty
+        old_qty = pos["qty"]
+        new_qty = old_qty + signed
+        realized = 0.0
+
+        if old_qty == 0 or (old_qty > 0) == (signed > 0):
+            # Opening or adding to a position
+            pos["avg_price"] = (
+                (pos["avg_price"] * abs(old_qty) + price * qty) / abs(new_qty)
+            )
+        else:
+            # Reducing, closing or flipping a position
+            closed = min(abs(old_qty), qty)
+            direction = 1 if old_qty > 0 else -1
+            realized = (price - pos["avg_price"]) * closed * direction
+
+            if new_qty == 0:
+                pos["avg_price"] = 0.0
+            elif (new_qty > 0) != (old_qty > 0):
+                pos["avg_price"] = price
+
+        pos["qty"] = new_qty
+        pos["realized"] = pos.get("realized", 0.0) + realized
+        self.positions[symbol] = pos
+
+        return realized
+
+    def set_position(self, symbol: str, qty: int, avg_price: float):
+        """Overwrite a position, keeping its realized PnL (used to correct drift)."""
+
+        with self.lock:
+            pos = dict(self.get(symbol))
+            pos["qty"] = qty
+            pos["avg_price"] = avg_price if qty != 0 else 0.0
+            self.positions[symbol] = pos
+
+    def open_positions(self) -> dict:
+        """Return only the symbols with a non-zero quantity."""
+        with self.lock:
+            return {s: dict(p) for s, p in self.positions.items() if p["qty"] != 0}
+
+    def quantities(self) -> dict:
+        """Return {symbol: qty} for the symbols with a non-zero quantity."""
+        with self.lock:
+            return {s: p["qty"] for s, p in self.positions.items() if p["qty"] != 0}
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {symbol: dict(pos) for symbol, pos in self.positions.items()}
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "PositionBook":
+        return cls(data or {})
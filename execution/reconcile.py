@@ -0,0 +1,215 @@
+"""
+Position reconciliation against the broker.
+
+The Reconciler polls the broker's positions (and orders, after order
+activity) on an adaptive schedule: every min_interval seconds after an
+order, backing off to max_interval while idle.
+
+Auto-correction overwrites the local book under its lock, and only for
+symbols with nothing in flight: within `settle` seconds of order activity,
+or while a non-stop order on the symbol is still open at the broker, the
+fill update may not have reached the book yet, and correcting first would
+make that update count the fill twice. Such mismatches are reported and
+left for a later poll. Each correction is also passed to `on_correction`
+with the same broker quantity and average price, so other position
+records (the Portfolio) are overwritten the same way as the book.
+"""
+
+import threading
+from typing import Callable, Optional
+
+from loguru import logger
+
+from execution.order_updates import TERMINAL
+from execution.positions import PositionBook
+from utils.clock import get_clock
+
+
+# Broker statuses of orders that can still fill; stops rest in TRIGGER PENDING
+SETTLED = TERMINAL + ("TRIGGER PENDING",)
+
+
+class PositionMismatch(Exception):
+    """Raised when the broker and the local book disagree."""
+
+
+class Reconciler:
+    """
+    Args:
+        client: Callable returning the broker client to query (so PAPER
+            and LIVE mode can swap clients)
+        book: Local position book
+        min_interval: Seconds between polls right after order activity
+        max_interval: Longest gap between polls when idle
+        auto_correct: Overwrite the local book with the broker view on a
+            mismatch instead of raising
+        on_mismatch: Called with the diff dict on every mismatch
+        settle: Seconds after order activity during which mismatches are
+            not auto-corrected
+        on_correction: Called as fn(symbol, qty, avg_price) with the broker
+            position of every corrected symbol (e.g. Portfolio.set_position)
+    """
+
+    def __init__(self, client: Callable, book: PositionBook, min_interval: float = 10,
+                 max_interval: float = 600, auto_correct: bool = False,
+                 on_mismatch: Optional[Callable[[dict], None]] = None, settle: float = 30,
+                 on_correction: Optional[Callable] = None):
+        self.client = client
+        self.book = book
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.auto_correct = auto_correct
+        self.on_mismatch = on_mismatch
+        self.settle = settle
+        self.on_correction = on_correction
+
+        self.interval = min_interval
+        self.next_poll = 0.0
+        self.orders_dirty = False
+        self.last_activity = None
+        self.api_calls = 0
+        self.mismatches = []
+        self.rejected = set()
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def notify_activity(self):
+        """Call after placing or cancelling orders to poll again soon."""
+
+        now = get_clock().time()
+        self.interval = self.min_interval
+        self.next_poll = min(self.next_poll, now + self.min_interval)
+        self.last_activity = now
+        self.orders_dirty = True
+        self._wake.set()
+
+    def _broker_positions(self) -> tuple:
+        self.api_calls += 1
+        net = self.client().positions().get("net", [])
+
+        positions = {}
+        for p in net:
+            positions[p["tradingsymbol"]] = positions.get(p["tradingsymbol"], 0) + p["quantity"]
+        averages = {p["tradingsymbol"]: p.get("average_price", 0.0) for p in net}
+
+        return positions, averages
+
+    def _check_orders(self):
+        self.api_calls += 1
+        for order in self.client().orders():
+            if order.get("status") == "REJECTED" and order["order_id"] not in self.rejected:
+                self.rejected.add(order["order_id"])
+                logger.error(
+                    f"Order {order['order_id']} {order.get('transaction_type')} "
+                    f"{order.get('tradingsymbol')} rejected: {order.get('status_message')}"
+                )
+
+    def _in_flight(self, symbols) -> set:
+        """Symbols whose mismatch may still be closed by a fill update on its way."""
+
+        if self.last_activity is not None and get_clock().time() - self.last_activity < self.settle:
+            return set(symbols)
+
+        self.api_calls += 1
+        return {
+            order.get("tradingsymbol") for order in self.client().orders()
+            if order.get("status") not in SETTLED
+        } & set(symbols)
+
+    def reconcile(self) -> dict:
+        """
+        Compare broker and local positions once.
+
+        Returns:
+            dict: {symbol: (broker_qty, local_qty)} for mismatched symbols
+
+        Raises:
+            PositionMismatch: On a mismatch when auto_correct is off
+        """
+
+        if self.orders_dirty:
+            self.orders_dirty = False
+            self._check_orders()
+
+        broker, averages = self._broker_positions()
+        broker = {s: q for s, q in broker.items() if q != 0}
+        local = self.book.quantities()
+
+        if broker == local:
+            return {}
+
+        diff = {
+            symbol: (broker.get(symbol, 0), local.get(symbol, 0))
+            for symbol in set(broker) | set(local)
+            if broker.get(symbol, 0) != local.get(symbol, 0)
+        }
+
+        self.mismatches.append(diff)
+        self.interval = self.min_interval
+        logger.error(f"Position mismatch (broker, local): {diff}")
+
+        if self.on_mismatch is not None:
+            self.on_mismatch(diff)
+
+        if not self.auto_correct:
+            raise PositionMismatch(diff)
+
+        deferred = self._in_flight(diff)
+        corrected = []
+
+        with self.book.lock:
+            for symbol, (broker_qty, local_qty) in diff.items():
+                # A fill that landed since the comparison is left for the next poll
+                if symbol in deferred or self.book.qty(symbol) != local_qty:
+                    continue
+                self.book.set_position(symbol, broker_qty, averages.get(symbol, 0.0))
+                corrected.append(symbol)
+
+                if self.on_correction is not None:
+                    self.on_correction(symbol, broker_qty, averages.get(symbol, 0.0))
+
+        if corrected:
+            logger.warning(f"Local book corrected to broker positions for {sorted(corrected)}")
+        if len(corrected) < len(diff):
+            logger.warning(f"Not correcting {sorted(set(diff) - set(corrected))}: orders still in flight")
+
+        return diff
+
+    def maybe_reconcile(self, now: Optional[float] = None) -> Optional[dict]:
+        """Reconcile if a poll is due, then schedule the next one."""
+
+        now = get_clock().time() if now is None else now
+        if now < self.next_poll:
+            return None
+
+        try:
+            return self.reconcile()
+        except PositionMismatch as e:
+            return e.args[0]
+        finally:
+            self.next_poll = now + self.interval
+            self.interval = min(self.interval * 2, self.max_interval)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.maybe_reconcile()
+            except Exception as e:
+                logger.error(f"Reconciliation failed: {e}")
+                self.next_poll = get_clock().time() + self.interval
+
+            self._wake.wait(max(0.0, self.next_poll - get_clock().time()))
+            self._wake.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="reconciler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -1,52 +1,454 @@
-import time
+import os
+import sys
 from loguru import logger
+from kiteconnect.exceptions import TokenException
 
-from data.market_data import get_historical, get_ltp
+from auth.session import SessionExpired, SessionManager
+from data import market_data
+from data.adjustments import adjusted, is_ex_date
+from data.depth import DepthBook
+from data.instruments import load_instruments
+from data.quality import DataQuality
+from data.market_data import get_historical, get_ltp, merge_candles, resolve_token
+from data.snapshot import SNAPSHOT_PATH, load_snapshot, save_snapshot
 from strategy.strategy import generate_signal
+from risk.portfolio import Portfolio
 from risk.risk import get_quantity
-from execution.orders import place_order
-from config.settings import SYMBOL
+from risk.session import SessionGuard
+from execution.orders import broker, cancel_order, paper_broker, place_order, place_stoploss
+from execution.order_updates import OrderUpdateStream
+from execution.reconcile import Reconciler
+from execution.algo import SliceScheduler, execute_sliced
+from execution.positions import PositionBook
+from config.loader import ConfigWatcher, get_config
+from config.settings import ACCESS_TOKEN, API_KEY, API_SECRET, MODE, SYMBOL
+from utils.clock import get_clock
+from utils.events import EventLog, NullEventLog
+from utils.watchdog import GuardedClient, Heartbeat, Watchdog
 
 
 logger.add("logs/bot.log", rotation="1 MB")
 
+EVENTS_PATH = "logs/events.jsonl"
 
-def run():
+# Replaced by run() with a real log; importing main writes nothing
+events = NullEventLog()
+
+HISTORY_DAYS = 30
+SLICE_QTY = 500   # parent orders above this are worked as TWAP child orders
+CYCLE_TIMEOUT = 120   # longest a cycle may take before the watchdog restarts the loop
+
+
+def restore_state(snapshot_path=SNAPSHOT_PATH):
+    """Restore the candle buffer, position book, scheduler, portfolio and paper broker state."""
+
+    state = {}
+
+    if snapshot_path:
+        state = load_snapshot(snapshot_path, max_age=HISTORY_DAYS * 86400) or {}
+
+    if state.get("symbol") not in (None, SYMBOL):
+        logger.warning(f"Snapshot is for {state['symbol']}, starting fresh")
+        state = {}
+
+    if MODE == "PAPER" and state.get("paper"):
+        # The paper broker holds the "broker-side" positions and stops; without
+        # it the reconciler would flatten the restored book against an empty one
+        paper_broker.restore(state["paper"])
+
+    return (
+        state.get("candles", []),
+        PositionBook.from_dict(state.get("positions")),
+        state.get("stops", {}),
+        state.get("scheduler", {"cycle": 0, "last_cycle_at": None}),
+        state.get("portfolio"),
+    )
+
+
+def refresh_candles(candles, quality=None):
+    """
+    Fetch only the candles missing from the buffer (everything on a cold start).
+
+    New candles pass through the data-quality stage, which may refetch
+    the window of a gap, before they are merged.
+    """
+
+    token = resolve_token(SYMBOL)
+
+    if not candles:
+        new = get_historical(HISTORY_DAYS, token=token)
+    else:
+        new = get_historical(from_dt=candles[-1]["date"], token=token)
+
+    if quality is not None:
+        new = quality.feed(new)
+
+    return merge_candles(candles, new)
+
+
+def start_quality(candles):
+    """Data-quality stage that repairs gaps by refetching just the missing window."""
+
+    quality = DataQuality(
+        refetch=lambda start, end: get_historical(from_dt=start, to_dt=end, token=resolve_token(SYMBOL)),
+        is_ex_date=lambda day: is_ex_date(SYMBOL, day),
+    )
+    quality.prime(candles)
+
+    return quality
+
+
+def protect_position(book, stops, price):
+    """Replace the broker-side SL-M stop so it covers the current position."""
+
+    cancel_order(stops.pop(SYMBOL, None))
+
+    qty = book.qty(SYMBOL)
+
+    if qty == 0:
+        return
+
+    side = "BUY" if qty > 0 else "SELL"
+    stoploss = price * 0.98 if qty > 0 else price * 1.02
+
+    stops[SYMBOL] = place_stoploss(side, abs(qty), stoploss)
+
+
+def start_order_updates(book, stops, session, background, portfolio=None):
+    """Apply fills to the book and portfolio as order updates arrive and keep the stop in line."""
+
+    stream = OrderUpdateStream(book)
+
+    def on_fill(update, qty, fill_price):
+
+        if portfolio is not None:
+            portfolio.fill(update["tradingsymbol"], update["transaction_type"], qty, fill_price)
+
+        events.fill(update["tradingsymbol"], update["transaction_type"], qty, fill_price, update["pnl"])
+
+        # Runs on the order-update thread; the lock keeps the stop in step
+        # with the book for the main loop's snapshot
+        with book.lock:
+            if stops.get(SYMBOL) == update["order_id"]:
+                stops.pop(SYMBOL)   # the stop itself filled
+            else:
+                protect_position(book, stops, fill_price)
+
+    stream.on_fill.append(on_fill)
+
+    if MODE == "PAPER":
+        stream.attach_paper(paper_broker)
+
+    elif background:
+        try:
+            stream.attach_ticker(API_KEY, session.ensure_valid(market_data.kite))
+        except Exception as e:
+            logger.warning(f"Order updates unavailable, assuming fills: {e}")
+
+    return stream
+
+
+def record_order(stream, order_id, symbol, side, qty, price):
+    """
+    Log a sent order and, without an update feed, assume it filled at price.
+
+    A failed placement (no order id) is logged but never booked, so the
+    book cannot show a position the broker does not have.
+    """
+
+    events.order(symbol, side, qty, order_id=order_id)
+
+    if order_id is None:
+        logger.error(f"{side} {qty} {symbol} was not placed")
+    elif not stream.live:
+        stream.assume_filled(order_id, symbol, side, qty, price)
+
+
+def send_order(stream, side, qty, price, symbol=SYMBOL):
+    """Place a market order and record it. Returns the order id (None on failure)."""
+
+    order_id = place_order(side, qty, symbol=symbol)
+    record_order(stream, order_id, symbol, side, qty, price)
+    return order_id
+
+
+def square_off(guard, now, book, stops, stream, last_price=get_ltp):
+    """
+    Cancel protective stops and flatten every open position.
+
+    Exits are ranked and, without an update feed, booked at each symbol's
+    current price from last_price(symbol); the entry price is only a last
+    resort when no price can be had.
+    """
+
+    with book.lock:
+        open_positions = book.open_positions()
+        open_stops = list(stops.values())
+        stops.clear()
+
+    positions = {s: p["qty"] for s, p in open_positions.items()}
+    prices = {}
+
+    for symbol, pos in open_positions.items():
+        try:
+            prices[symbol] = last_price(symbol)
+        except Exception as e:
+            logger.error(f"Could not get price for {symbol}: {e}")
+            prices[symbol] = None
+
+        if prices[symbol] is None:
+            logger.warning(f"No price for {symbol}, booking its exit at the entry price")
+            prices[symbol] = pos["avg_price"]
+
+    exits = guard.square_off(
+        now, positions, prices,
+        place=lambda side, qty, symbol: place_order(side, qty, symbol=symbol),
+        cancel=cancel_order,
+        open_orders=open_stops,
+    )
+
+    for symbol, side, qty, order_id in exits:
+        record_order(stream, order_id, symbol, side, qty, prices[symbol])
+
+
+def default_session():
+    """Session shared through the session file, seeded from settings.ACCESS_TOKEN."""
+
+    refresh = None
+
+    if sys.stdin is not None and sys.stdin.isatty():
+        from auth.login import interactive_login
+        refresh = interactive_login
+
+    return SessionManager(
+        API_KEY, API_SECRET,
+        refresh=refresh,
+        client=market_data.kite,
+        seed_token=ACCESS_TOKEN,
+    )
+
+
+def run(max_cycles=None, snapshot_path=SNAPSHOT_PATH, session=None, background=True,
+        events_path=EVENTS_PATH):
+    """
+    Run the trading loop.
+
+    Args:
+        max_cycles: Stop after this many cycles (runs forever if None)
+        snapshot_path: Where to persist state (None disables snapshots)
+        session: SessionManager keeping the access token fresh
+        background: Start background services such as the position
+            reconciler, broker call guards and the heartbeat (disabled for
+            deterministic replays)
+        events_path: Event log file (None disables the event log)
+
+    Returns:
+        PositionBook: The local position book once the loop stops
+    """
+
+    global events
 
     logger.info("Bot Started")
 
-    while True:
+    clock = get_clock()
+
+    if events_path:
+        events = EventLog(events_path, level=os.environ.get("EVENT_LEVEL", "INFO"))
+
+    session = session or default_session()
+
+    heartbeat = None
+
+    if background:
+        # Timeouts and per-endpoint circuit breakers around every broker call
+        previous_client = market_data.set_client(GuardedClient(market_data.kite))
+        heartbeat = Heartbeat()
+
+        if os.environ.get("HEARTBEAT_PORT"):
+            heartbeat.serve(port=int(os.environ["HEARTBEAT_PORT"]))
+
+    try:
+        load_instruments()
+    except Exception as e:
+        logger.warning(f"Instrument master unavailable, using configured TOKEN: {e}")
+
+    candles, book, stops, scheduler, portfolio_state = restore_state(snapshot_path)
+
+    if candles:
+        logger.info(f"Warm start: {len(candles)} candles, cycle {scheduler['cycle']}")
+
+    # Running equity, PnL, fees, exposure and drawdown, marked every cycle
+    portfolio = Portfolio.from_book(book, get_config().capital, state=portfolio_state)
+
+    stream = start_order_updates(book, stops, session, background, portfolio)
+
+    quality = start_quality(candles)
+
+    depth_book = DepthBook([SYMBOL])
+
+    reconciler = Reconciler(broker, book, auto_correct=True, on_correction=portfolio.set_position)
+
+    guard = SessionGuard()
+
+    # Capital and risk reload between cycles; this loop trades one symbol,
+    # so changing it (or the mode) needs a restart
+    watcher = ConfigWatcher(frozen=("mode", "symbol"))
+
+    # Child orders of sliced parents go out during the waits between cycles
+    slicer = SliceScheduler(clock, on_send=lambda order_id: reconciler.notify_activity())
+
+    if background:
+        reconciler.start()
+
+    def pause(seconds):
+        if heartbeat is not None:
+            heartbeat.beat(seconds + CYCLE_TIMEOUT, cycle=scheduler["cycle"])
+        slicer.sleep(seconds)
+
+    cycles = 0
+
+    while max_cycles is None or cycles < max_cycles:
+
+        cycles += 1
+
+        if heartbeat is not None:
+            heartbeat.beat(CYCLE_TIMEOUT, cycle=scheduler["cycle"])
 
         try:
 
-            data = get_historical()
+            watcher.poll()
+
+            session.ensure_valid(market_data.kite)
+
+            now = clock.now()
+
+            if guard.should_square_off(now):
+                slicer.cancel()
+                square_off(guard, now, book, stops, stream,
+                           last_price=lambda symbol: get_ltp(symbol) or depth_book.last_price(symbol))
+                reconciler.notify_activity()
 
-            signal = generate_signal(data)
+            candles = refresh_candles(candles, quality)
+
+            if events.enabled("stats"):
+                events.stats("data_quality", dict(quality.counters))
+
+            # One quote call gives depth features and the last price
+            polled = depth_book.poll(market_data.kite, clock.time())
+
+            if quality.healthy:
+                signal = generate_signal(adjusted(SYMBOL, candles), SYMBOL,
+                                         depth=depth_book.features(SYMBOL) if polled else None,
+                                         position=book.qty(SYMBOL))
+            else:
+                logger.warning("Holding: recent candles failed data-quality checks")
+                signal = "HOLD"
+
+            price = (depth_book.last_price(SYMBOL) if polled else None) or get_ltp(SYMBOL)
 
-            price = get_ltp(SYMBOL)
-            
             if price is None:
                 logger.warning(f"Could not get price for {SYMBOL}")
                 continue
 
-            stoploss = price * 0.98
+            if MODE == "PAPER":
+                paper_broker.on_tick(SYMBOL, price)
+
+            account = portfolio.mark({SYMBOL: price}, clock.time())
+
+            if events.enabled("stats"):
+                events.stats("portfolio", account._asdict())
+
+            stoploss = price * 1.02 if signal == "SELL" else price * 0.98
 
             qty = get_quantity(price, stoploss)
 
+            # After the entry cutoff only exits go out
+            qty = guard.allowed_qty(now, signal, qty, book.qty(SYMBOL))
+
             logger.info(f"Signal: {signal} | Price: {price} | Qty: {qty}")
 
+            events.decision(SYMBOL, signal, price, qty)
+
             if signal != "HOLD" and qty > 0:
 
-                place_order(signal, qty)
+                send = lambda side, q: send_order(stream, side, q, price)
+
+                if qty > SLICE_QTY:
+                    execute_sliced(signal, qty, place=send, scheduler=slicer)
+                else:
+                    send(signal, qty)
+
+                reconciler.notify_activity()
+
+            scheduler = {"cycle": scheduler["cycle"] + 1, "last_cycle_at": clock.time()}
+
+            if snapshot_path:
+                # Copied under the lock: fills and corrections arrive on other threads
+                with book.lock:
+                    positions, open_stops = book.to_dict(), dict(stops)
+
+                save_snapshot({
+                    "symbol": SYMBOL,
+                    "candles": candles,
+                    "positions": positions,
+                    "stops": open_stops,
+                    "scheduler": scheduler,
+                    "portfolio": portfolio.to_dict(),
+                    "paper": paper_broker.to_dict() if MODE == "PAPER" else None,
+                }, snapshot_path)
+
+            pause(guard.next_sleep(now, 300))   # 5 min, or until square-off
 
-            time.sleep(300)   # 5 min
+        except SessionExpired as e:
+
+            # Nothing can log in without a terminal; retrying every cycle would
+            # only repeat this error, so stop and let the operator log in again
+            logger.error(f"{e}; stopping the trading loop")
+
+            break
+
+        except TokenException as e:
+
+            # The next cycle's ensure_valid() refreshes the token
+            logger.error(f"Access token rejected: {e}")
+
+            session.invalidate()
+
+            pause(5)
 
         except Exception as e:
 
             logger.error(e)
 
-            time.sleep(60)
+            pause(60)
+
+    reconciler.stop()
+
+    events.close()
+    events = NullEventLog()
+
+    if background:
+        market_data.set_client(previous_client)
+
+    return book
 
 
 if __name__ == "__main__":
-    run()
+
+    if os.environ.get("KITE_RECORD"):
+        from data.replay import start_recording
+        start_recording(os.environ["KITE_RECORD"])
+
+    if "--watchdog" in sys.argv:
+        # Run the loop in a child process, restarted whenever it hangs or dies
+        Watchdog(run).run()
+
+    elif "--profile" in sys.argv:
+        # Sampled stacks are flushed to profiles/ every 10 minutes and on exit
+        from utils.profiling import sampling_profile
+
+        with sampling_profile("live", flush_every=600):
+            run()
+
+    else:
+        run()
@@ -0,0 +1,270 @@
+"""
+Portfolio accounting with mark-to-market.
+
+Portfolio keeps one row per symbol in NumPy arrays (quantity, average
+price, realized PnL, fees, last price). Fills update one row; marks
+write a batch of prices (from LTP/quote polls or the tick stream) and
+revalue every position at once. After each update a PortfolioSnapshot
+with the account totals (equity, PnL, fees, exposure, drawdown) is
+published as a single attribute swap, so risk checks and dashboards read
+`portfolio.snapshot` without locking or walking the trade history.
+
+Fill accounting follows PositionBook: signed quantities, average entry
+price, PnL realized on reductions and flips. Realized PnL is gross; fees
+are tracked separately and subtracted from equity. Fees and the equity
+peak are not in the PositionBook, so to_dict() carries them across
+restarts.
+"""
+
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+
+CAPACITY = 16
+
+
+def intraday_equity_fees(brokerage: float = 20.0, brokerage_rate: float = 0.0003) -> Callable[[str, int, float], float]:
+    """
+    Fee model for NSE intraday equity: brokerage (flat or rate, whichever
+    is lower), STT on sells, exchange and SEBI charges, stamp duty on buys
+    and GST on the service charges.
+    """
+
+    def model(side, qty, price):
+        value = qty * price
+        charges = min(brokerage, value * brokerage_rate) + value * 0.0000297 + value * 0.000001
+        stt = value * 0.00025 if side == "SELL" else 0.0
+        stamp = value * 0.00003 if side == "BUY" else 0.0
+        return charges * 1.18 + stt + stamp
+
+    return model
+
+
+class PortfolioSnapshot(NamedTuple):
+    ts: float
+    equity: float
+    realized: float
+    unrealized: float
+    fees: float
+    gross_exposure: float
+    net_exposure: float
+    drawdown: float         # from the equity peak, in rupees
+    drawdown_pct: float
+    max_drawdown: float
+    open_positions: int
+
+
+class Portfolio:
+    """
+    Args:
+        capital: Starting account value
+        symbols: Symbols to preallocate rows for (others are added on use)
+        fees: Callable (side, qty, price) -> fees charged on a fill
+    """
+
+    def __init__(self, capital: float, symbols: Optional[list] = None,
+                 fees: Optional[Callable] = None):
+        self.capital = capital
+        self.fees = fees or intraday_equity_fees()
+        self.symbols = []
+        self.row = {}
+
+        size = max(CAPACITY, len(symbols or []))
+        self.qty = np.zeros(size)
+        self.avg_price = np.zeros(size)
+        self.realized = np.zeros(size)
+        self.paid = np.zeros(size)
+        self.last = np.full(size, np.nan)
+
+        self.peak = capital
+        self.max_drawdown = 0.0
+        self._lock = threading.Lock()
+
+        for symbol in symbols or []:
+            self._row(symbol)
+
+        self.snapshot = self._publish()
+
+    @classmethod
+    def from_book(cls, book, capital: float, fees: Optional[Callable] = None,
+                  state: Optional[dict] = None) -> "Portfolio":
+        """
+        Seed quantities, prices and realized PnL from a PositionBook.
+
+        Args:
+            book: Position book (the source of quantities and prices)
+            capital: Starting account value
+            fees: Fee model
+            state: A saved to_dict(), restoring fees paid, the equity peak
+                and the max drawdown
+        """
+
+        state = state or {}
+        positions = book.to_dict()
+        portfolio = cls(capital, sorted(set(positions) | set(state.get("fees", {}))), fees)
+
+        for symbol, pos in positions.items():
+            i = portfolio.row[symbol]
+            portfolio.qty[i] = pos["qty"]
+            portfolio.avg_price[i] = pos["avg_price"]
+            portfolio.realized[i] = pos.get("realized", 0.0)
+
+        for symbol, paid in state.get("fees", {}).items():
+            portfolio.paid[portfolio.row[symbol]] = paid
+
+        portfolio.peak = max(capital, state.get("peak", capital))
+        portfolio.max_drawdown = state.get("max_drawdown", 0.0)
+        portfolio.snapshot = portfolio._publish()
+        return portfolio
+
+    def to_dict(self) -> dict:
+        """What from_book() needs besides the PositionBook: fees paid, equity peak, max drawdown."""
+
+        with self._lock:
+            n = len(self.symbols)
+            return {
+                "fees": {symbol: float(paid) for symbol, paid in zip(self.symbols, self.paid[:n]) if paid},
+                "peak": float(self.peak),
+                "max_drawdown": float(self.max_drawdown),
+            }
+
+    def _row(self, symbol: str) -> int:
+        i = self.row.get(symbol)
+        if i is not None:
+            return i
+
+        i = len(self.symbols)
+        if i == len(self.qty):
+            # Grow every array together, doubling the capacity
+            for name in ("qty", "avg_price", "realized", "paid"):
+                setattr(self, name, np.concatenate([getattr(self, name), np.zeros(i)]))
+            self.last = np.concatenate([self.last, np.full(i, np.nan)])
+
+        self.symbols.append(symbol)
+        self.row[symbol] = i
+        return i
+
+    def fill(self, symbol: str, side: str, qty: int, price: float) -> float:
+        """
+        Apply a fill and republish the snapshot.
+
+        Returns:
+            float: PnL realized by this fill (before fees)
+        """
+
+        with self._lock:
+            i = self._row(symbol)
+            signed = qty if side == "BUY" else -qty
+            old_qty = self.qty[i]
+            new_qty = old_qty + signed
+            realized = 0.0
+
+            if old_qty == 0 or (old_qty > 0) == (signed > 0):
+                self.avg_price[i] = (self.avg_price[i] * abs(old_qty) + price * qty) / abs(new_qty)
+            else:
+                closed = min(abs(old_qty), qty)
+                realized = (price - self.avg_price[i]) * closed * (1 if old_qty > 0 else -1)
+
+                if new_qty == 0:
+                    self.avg_price[i] = 0.0
+                elif (new_qty > 0) != (old_qty > 0):
+                    self.avg_price[i] = price
+
+            self.qty[i] = new_qty
+            self.realized[i] += realized
+            self.paid[i] += self.fees(side, qty, price)
+            self.last[i] = price
+            self.snapshot = self._publish()
+
+        return realized
+
+    def set_position(self, symbol: str, qty: int, avg_price: float) -> PortfolioSnapshot:
+        """
+        Overwrite a position without a fill: no fees, no realized PnL.
+
+        Mirrors PositionBook.set_position, for reconciliation corrections
+        to the broker's quantity and average price.
+        """
+
+        with self._lock:
+            i = self._row(symbol)
+            self.qty[i] = qty
+            self.avg_price[i] = avg_price if qty != 0 else 0.0
+            self.snapshot = self._publish()
+
+        return self.snapshot
+
+    def mark(self, prices: dict, ts: Optional[float] = None) -> PortfolioSnapshot:
+        """Mark positions to a batch of last prices ({symbol: price}); unknown symbols are skipped."""
+
+        with self._lock:
+            # Under the lock: a fill may be adding a row for a new symbol
+            rows = [self.row[s] for s in prices if s in self.row]
+            if not rows:
+                return self.snapshot
+
+            self.last[rows] = np.fromiter((prices[s] for s in prices if s in self.row), float, len(rows))
+            self.snapshot = self._publish(ts)
+
+        return self.snapshot
+
+    def mark_array(self, prices: np.ndarray, ts: Optional[float] = None) -> PortfolioSnapshot:
+        """Mark positions to prices aligned with self.symbols; NaN keeps the previous price."""
+
+        with self._lock:
+            n = len(self.symbols)
+            prices = np.asarray(prices, dtype=float)[:n]
+            self.last[:n] = np.where(np.isnan(prices), self.last[:n], prices)
+            self.snapshot = self._publish(ts)
+
+        return self.snapshot
+
+    def _publish(self, ts: Optional[float] = None) -> PortfolioSnapshot:
+        n = len(self.symbols)
+        qty, last = self.qty[:n], self.last[:n]
+        # Positions without a price yet are carried at their entry price
+        price = np.where(np.isnan(last), self.avg_price[:n], last)
+
+        unrealized = float(((price - self.avg_price[:n]) * qty).sum())
+        realized = float(self.realized[:n].sum())
+        fees = float(self.paid[:n].sum())
+        notional = qty * price
+
+        equity = self.capital + realized + unrealized - fees
+        self.peak = max(self.peak, equity)
+        drawdown = self.peak - equity
+        self.max_drawdown = max(self.max_drawdown, drawdown)
+
+        return PortfolioSnapshot(
+            ts=time.time() if ts is None else ts,
+            equity=equity,
+            realized=realized,
+            unrealized=unrealized,
+            fees=fees,
+            gross_exposure=float(np.abs(notional).sum()),
+            net_exposure=float(notional.sum()),
+            drawdown=drawdown,
+            drawdown_pct=drawdown / self.peak if self.peak > 0 else 0.0,
+            max_drawdown=self.max_drawdown,
+            open_positions=int(np.count_nonzero(qty)),
+        )
+
+    def position(self, symbol: str) -> dict:
+        """One symbol's row: qty, avg_price, realized, fees, last and unrealized."""
+
+        i = self.row.get(symbol)
+        if i is None:
+            return {"qty": 0, "avg_price": 0.0, "realized": 0.0, "fees": 0.0, "last": None, "unrealized": 0.0}
+
+        last = None if np.isnan(self.last[i]) else float(self.last[i])
+        return {
+            "qty": int(self.qty[i]),
+            "avg_price": float(self.avg_price[i]),
+            "realized": float(self.realized[i]),
+            "fees": float(self.paid[i]),
+            "last": last,
+            "unrealized": float((last - self.avg_price[i]) * self.qty[i]) if last is not None else 0.0,
+        }
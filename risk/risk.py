@@ -1,10 +1,12 @@
-from config.settings import CAPITAL, RISK_PER_TRADE
+from config.loader import get_config
 
 
 def get_quantity(price, stoploss):
 
-    risk_amt = CAPITAL * RISK_PER_TRADE
+    config = get_config()
+
+    risk_amt = config.capital * config.risk_per_trade
 
     qty = risk_amt / abs(price - stoploss)
 
-    return int(qty)
\ No newline at end of file
+    return int(qty)
@@ -0,0 +1,115 @@
+"""
+Intraday session lifecycle for MIS positions.
+
+SessionGuard blocks new entries after a cutoff and flattens every open
+position before the broker's auto square-off, exiting the largest
+exposures first with rate-limited orders sent one at a time, so the
+ranking is the order in which they reach the broker.
+
+Session times are IST. Every `now` is converted with auth.session.to_ist
+first, so the guard keeps NSE hours on a host running in UTC (naive
+values are read as host local time).
+"""
+
+from datetime import datetime, time
+from typing import Callable, Optional
+
+from loguru import logger
+
+from auth.session import IST, to_ist
+from utils.ratelimit import RateLimiter
+
+
+MARKET_OPEN = time(9, 15)
+ENTRY_CUTOFF = time(15, 0)
+SQUARE_OFF_AT = time(15, 10)      # broker auto square-off for equity MIS starts at 15:20
+ORDERS_PER_SECOND = 10            # Kite order placement limit
+
+
+class SessionGuard:
+
+    def __init__(self, entry_cutoff: time = ENTRY_CUTOFF, square_off_at: time = SQUARE_OFF_AT,
+                 market_open: time = MARKET_OPEN, orders_per_second: float = ORDERS_PER_SECOND):
+        self.entry_cutoff = entry_cutoff
+        self.square_off_at = square_off_at
+        self.market_open = market_open
+        self.limiter = RateLimiter(orders_per_second)
+        self.squared_off_on = None
+
+    def allows_entry(self, now: datetime) -> bool:
+        return self.market_open <= to_ist(now).time() < self.entry_cutoff
+
+    def allowed_qty(self, now: datetime, signal: str, qty: int, position: int) -> int:
+        """
+        Clip an order so that after the cutoff it can only reduce the position.
+
+        Returns:
+            int: The quantity that may be sent (0 blocks the order)
+        """
+
+        if self.squared_off_on == to_ist(now).date():
+            return 0
+
+        if self.allows_entry(now):
+            return qty
+
+        reduces = (signal == "SELL" and position > 0) or (signal == "BUY" and position < 0)
+        return min(qty, abs(position)) if reduces else 0
+
+    def should_square_off(self, now: datetime) -> bool:
+        now = to_ist(now)
+        return now.time() >= self.square_off_at and self.squared_off_on != now.date()
+
+    def seconds_until_square_off(self, now: datetime) -> float:
+        now = to_ist(now)
+        target = datetime.combine(now.date(), self.square_off_at, IST)
+        return (target - now).total_seconds()
+
+    def next_sleep(self, now: datetime, interval: float) -> float:
+        """Sleep for `interval`, but wake up in time for the square-off."""
+
+        remaining = self.seconds_until_square_off(now)
+        return min(interval, remaining) if remaining > 0 else interval
+
+    def square_off(self, now: datetime, positions: dict, prices: dict, place: Callable,
+                   cancel: Optional[Callable] = None, open_orders: Optional[list] = None) -> list:
+        """
+        Flatten every open position.
+
+        Args:
+            now: Current time (marks the day as squared off)
+            positions: {symbol: signed qty}
+            prices: {symbol: last price}, used to rank by exposure
+            place: Callable(side, qty, symbol) sending a market order
+            cancel: Callable(order_id) cancelling an order
+            open_orders: Order ids (e.g. protective stops) to cancel first,
+                so they cannot re-open a position after the exit
+
+        Returns:
+            list: (symbol, side, qty, result) for every exit, in the order sent
+        """
+
+        self.squared_off_on = to_ist(now).date()
+
+        if cancel is not None:
+            for order_id in open_orders or []:
+                self.limiter.acquire()
+                cancel(order_id)
+
+        exits = [
+            (symbol, "SELL" if qty > 0 else "BUY", abs(qty))
+            for symbol, qty in positions.items() if qty != 0
+        ]
+        exits.sort(key=lambda e: e[2] * prices.get(e[0], 0.0), reverse=True)
+
+        if not exits:
+            return []
+
+        logger.warning(f"Squaring off {len(exits)} positions")
+
+        sent = []
+        for symbol, side, qty in exits:
+            self.limiter.acquire()
+            sent.append((symbol, side, qty, place(side, qty, symbol)))
+
+        return sent
@@ -0,0 +1,714 @@
+"""
+Sharded multi-process live runner.
+
+The symbol universe is split across worker processes. Each worker owns
+its shard's candle buffers, fetches data and computes signals, and sends
+decisions over a multiprocessing queue to a single order process that
+sizes, risk-checks and places every order. The supervisor restarts
+crashed workers and rebalances shards when a worker keeps crashing.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+import zlib
+from typing import Callable, Optional
+
+from loguru import logger
+
+
+MAX_WORKERS = 64
+ORDERS_SNAPSHOT = "snapshots/orders_state.pkl"
+WATCH_INTERVAL = 5    # seconds between settings checks in an idle order process
+
+
+def shard(symbols: list, n: int) -> list:
+    """
+    Split symbols into n shards.
+
+    Assignment uses a stable hash of the symbol so that changing the
+    universe only moves the symbols that were added or removed.
+    """
+
+    shards = [[] for _ in range(max(1, n))]
+    for symbol in symbols:
+        shards[zlib.crc32(symbol.encode()) % len(shards)].append(symbol)
+    return shards
+
+
+def _connect():
+    """
+    Give a freshly started process its own authenticated broker client
+    and the instrument master, so every symbol resolves to its own token.
+    """
+
+    from kiteconnect import KiteConnect
+
+    from auth.session import SessionManager
+    from config.settings import ACCESS_TOKEN, API_KEY, API_SECRET
+    from data import market_data
+    from data.instruments import load_instruments
+
+    client = KiteConnect(api_key=API_KEY)
+    market_data.set_client(client)
+    SessionManager(API_KEY, API_SECRET, client=client, seed_token=ACCESS_TOKEN).ensure_valid()
+
+    # The first process of the day downloads it; the rest read the daily cache
+    try:
+        load_instruments(client)
+    except Exception as e:
+        logger.error(f"Instrument master unavailable, only the configured SYMBOL can trade: {e}")
+
+
+def compute_decisions(symbols: list, buffers: dict, quality: Optional[dict] = None,
+                      depth_book=None) -> list:
+    """
+    Refresh candles and generate a signal for every symbol in a shard.
+
+    New candles pass through a per-symbol data-quality stage before they
+    are merged, and signals are computed on the corporate-action adjusted
+    series, as in the single-symbol loop. Workers do not know positions,
+    so the order-book features go out with each decision and the order
+    process applies the depth filter to entries only.
+
+    Args:
+        symbols: The shard
+        buffers: Candle buffers by symbol, kept by the worker across cycles
+        quality: DataQuality stages by symbol, kept by the worker across cycles
+        depth_book: DepthBook over the shard, kept by the worker across cycles
+    """
+
+    from data import market_data
+    from data.adjustments import adjusted, is_ex_date
+    from data.depth import DepthBook
+    from data.market_data import get_historical, get_ltp, merge_candles, resolve_token
+    from data.quality import DataQuality
+    from strategy.strategy import generate_signal, signal_strength
+
+    decisions = []
+    quality = {} if quality is None else quality
+
+    # Depth and last prices for the whole shard in one batched quote call
+    if depth_book is None:
+        depth_book = DepthBook(symbols)
+    elif depth_book.symbols != list(symbols):
+        depth_book.set_symbols(symbols)
+    polled = depth_book.poll(market_data.kite)
+
+    for symbol in symbols:
+        candles = buffers.get(symbol, [])
+        token = resolve_token(symbol)
+
+        if token is None:
+            logger.warning(f"Skipping {symbol}: not in the instrument master")
+            continue
+
+        stage = quality.get(symbol)
+        if stage is None:
+            stage = quality[symbol] = DataQuality(
+                refetch=lambda start, end, token=token: get_historical(from_dt=start, to_dt=end, token=token),
+                is_ex_date=lambda day, symbol=symbol: is_ex_date(symbol, day),
+            )
+            stage.prime(candles)
+
+        if candles:
+            fresh = get_historical(from_dt=candles[-1]["date"], token=token)
+        else:
+            fresh = get_historical(token=token)
+
+        candles = buffers[symbol] = merge_candles(candles, stage.feed(fresh))
+
+        if not stage.healthy:
+            logger.warning(f"Holding {symbol}: recent candles failed data-quality checks")
+            continue
+
+        series = adjusted(symbol, candles)
+        signal = generate_signal(series, symbol)
+
+        if signal == "HOLD":
+            continue
+
+        price = (depth_book.last_price(symbol) if polled else None) or get_ltp(symbol)
+        if price is not None:
+            decisions.append({"symbol": symbol, "signal": signal, "price": price, "ts": time.time(),
+                              "depth": depth_book.features(symbol) if polled else None,
+                              **signal_strength(series, symbol)})
+
+    return decisions
+
+
+def worker_main(worker_id: int, symbols: list, decisions, heartbeats, interval: float,
+                compute: Callable = compute_decisions, connect: Optional[Callable] = _connect,
+                control=None):
+    """
+    Worker process: compute decisions for one shard forever.
+
+    A new shard (list of symbols) put on the control queue replaces the
+    current one at the start of the next cycle; buffers, data-quality
+    state and depth history of the symbols that stay are kept.
+    """
+
+    from data.depth import DepthBook
+
+    if connect is not None:
+        connect()
+
+    buffers = {}
+    quality = {}
+    depth_book = DepthBook(symbols)
+    logger.info(f"Worker {worker_id} started with {len(symbols)} symbols")
+
+    while True:
+        started = time.time()
+        heartbeats[worker_id] = started
+
+        while control is not None:
+            try:
+                update = control.get_nowait()
+            except queue.Empty:
+                break
+            for symbol in set(symbols) - set(update):
+                buffers.pop(symbol, None)
+                quality.pop(symbol, None)
+            symbols = list(update)
+            depth_book.set_symbols(symbols)
+            logger.info(f"Worker {worker_id} now has {len(symbols)} symbols")
+
+        try:
+            for decision in compute(symbols, buffers, quality, depth_book):
+                decision["worker"] = worker_id
+                decisions.put(decision)
+        except Exception as e:
+            logger.error(f"Worker {worker_id}: {e}")
+
+        time.sleep(max(0.0, interval - (time.time() - started)))
+
+
+def order_handler(book, portfolio, stops: dict, orders=None, guard=None) -> Callable:
+    """
+    Default decision handler: size, place and protect one order.
+
+    A symbol that is already held is never sized as a fresh entry: an
+    opposite signal closes the position and a same-side signal is ignored.
+    Fills are booked only for orders the broker accepted, and every change
+    of position replaces the symbol's SL-M stop (tracked in `stops`) so it
+    covers exactly the new quantity.
+
+    Given the order process's OrderQueue, the replacement goes through it
+    as a STOP order: it is rate limited with everything else and still
+    leaves before any waiting entry. The handler then also handles the
+    queued stops, whose payloads carry "stop": True. Given a SessionGuard,
+    quantities are clipped by it, so after the entry cutoff only exits go
+    out.
+    """
+
+    from execution.order_queue import EXIT, STOP, order_kind
+    from execution.orders import cancel_order, place_order, place_stoploss
+    from risk.risk import get_quantity
+    from utils.clock import get_clock
+
+    def protect(symbol, price):
+        if symbol in stops and orders is not None:
+            orders.limiter.acquire()   # the cancel is an order call of its own
+        cancel_order(stops.pop(symbol, None))
+
+        qty = book.qty(symbol)
+        if qty == 0:
+            return
+
+        side = "BUY" if qty > 0 else "SELL"
+        stoploss = price * 0.98 if qty > 0 else price * 1.02
+        stops[symbol] = place_stoploss(side, abs(qty), stoploss, symbol=symbol)
+
+    def handle(decision):
+        if decision.get("stop"):
+            protect(decision["symbol"], decision["price"])
+            return
+
+        price, signal, symbol = decision["price"], decision["signal"], decision["symbol"]
+        portfolio.mark({symbol: price})
+        held = book.qty(symbol)
+
+        if held == 0:
+            stoploss = price * 1.02 if signal == "SELL" else price * 0.98
+            qty = get_quantity(price, stoploss)
+        elif order_kind(signal, held) == EXIT:
+            qty = abs(held)
+        else:
+            logger.debug(f"Already {held} {symbol}, ignoring {signal}")
+            return
+
+        if guard is not None:
+            qty = guard.allowed_qty(get_clock().now(), signal, qty, held)
+
+        if qty <= 0:
+            return
+
+        if place_order(signal, qty, symbol=symbol) is None:
+            logger.error(f"{signal} {qty} {symbol} was not placed")
+            return
+
+        book.apply_fill(symbol, signal, qty, price)
+        portfolio.fill(symbol, signal, qty, price)
+
+        if orders is None:
+            protect(symbol, price)
+        else:
+            held = book.qty(symbol)
+            orders.push(symbol, "SELL" if held > 0 else "BUY", abs(held), price, kind=STOP,
+                        payload={"symbol": symbol, "price": price, "stop": True})
+
+    return handle
+
+
+def square_off_book(guard, now, book, portfolio, stops: dict, last_price: Callable) -> list:
+    """
+    Cancel protective stops and flatten every position of the order process.
+
+    The sharded counterpart of main.square_off: exits are ranked by
+    exposure at the current price and, as in order_handler, booked at that
+    price once the broker accepts them.
+
+    Returns:
+        list: (symbol, side, qty, order id) for every exit, in the order sent
+    """
+
+    from execution.orders import cancel_order, place_order
+
+    positions = book.quantities()
+    prices = {}
+
+    for symbol in positions:
+        try:
+            prices[symbol] = last_price(symbol)
+        except Exception as e:
+            logger.error(f"Could not get price for {symbol}: {e}")
+            prices[symbol] = None
+
+        if prices[symbol] is None:
+            logger.warning(f"No price for {symbol}, booking its exit at the entry price")
+            prices[symbol] = book.get(symbol)["avg_price"]
+
+    open_stops = list(stops.values())
+    stops.clear()
+
+    exits = guard.square_off(
+        now, positions, prices,
+        place=lambda side, qty, symbol: place_order(side, qty, symbol=symbol),
+        cancel=cancel_order,
+        open_orders=open_stops,
+    )
+
+    for symbol, side, qty, order_id in exits:
+        if order_id is None:
+            logger.error(f"Square-off {side} {qty} {symbol} was not placed")
+            continue
+        book.apply_fill(symbol, side, qty, prices[symbol])
+        portfolio.fill(symbol, side, qty, prices[symbol])
+
+    return exits
+
+
+def flatten_removed(book, orders, removed, last_price: Callable) -> list:
+    """
+    Queue exits for the positions held in symbols that left the universe.
+
+    Args:
+        book: PositionBook of the order process
+        orders: OrderQueue the exits are pushed onto
+        removed: Symbols no longer in the universe
+        last_price: Callable(symbol) returning the current price or None
+
+    Returns:
+        list: The symbols an exit was queued for
+    """
+
+    from execution.order_queue import EXIT
+
+    queued = []
+
+    for symbol in sorted(removed):
+        held = book.qty(symbol)
+        if held == 0:
+            continue
+
+        price = last_price(symbol)
+        if price is None:
+            logger.error(f"{symbol} left the universe holding {held} and has no price; close it by hand")
+            continue
+
+        side = "SELL" if held > 0 else "BUY"
+        logger.warning(f"{symbol} left the universe holding {held}, closing it")
+        orders.push(symbol, side, abs(held), price, kind=EXIT,
+                    payload={"symbol": symbol, "signal": side, "price": price, "ts": time.time()})
+        queued.append(symbol)
+
+    return queued
+
+
+def restore_orders(snapshot_path: Optional[str], capital: float) -> tuple:
+    """
+    Position book, stops and portfolio of the order process, from its last
+    snapshot (fresh ones without it), plus a Reconciler against the broker.
+
+    The book is reconciled once before it is returned, so a restarted
+    order process sizes its exits from what the broker actually holds.
+
+    Returns:
+        tuple: (book, stops, portfolio, reconciler)
+    """
+
+    from config.settings import MODE
+    from data.snapshot import load_snapshot
+    from execution.orders import broker, paper_broker
+    from execution.positions import PositionBook
+    from execution.reconcile import Reconciler
+    from risk.portfolio import Portfolio
+
+    state = (load_snapshot(snapshot_path, max_age=86400) if snapshot_path else None) or {}
+
+    if MODE == "PAPER" and state.get("paper"):
+        # Broker-side positions of the paper engine, which the reconciler compares against
+        paper_broker.restore(state["paper"])
+
+    book = PositionBook.from_dict(state.get("positions"))
+    stops = dict(state.get("stops", {}))
+    portfolio = Portfolio.from_book(book, capital, state=state.get("portfolio"))
+
+    reconciler = Reconciler(broker, book, auto_correct=True, on_correction=portfolio.set_position)
+    try:
+        reconciler.maybe_reconcile()
+    except Exception as e:
+        logger.error(f"Startup reconciliation failed: {e}")
+
+    if book.quantities():
+        logger.info(f"Order process resumed with positions {book.quantities()}")
+
+    return book, stops, portfolio, reconciler
+
+
+def save_orders(snapshot_path: str, book, stops: dict, portfolio):
+    """Persist what restore_orders() needs."""
+
+    from config.settings import MODE
+    from data.snapshot import save_snapshot
+    from execution.orders import paper_broker
+
+    with book.lock:
+        positions, open_stops = book.to_dict(), dict(stops)
+
+    save_snapshot({
+        "positions": positions,
+        "stops": open_stops,
+        "portfolio": portfolio.to_dict(),
+        "paper": paper_broker.to_dict() if MODE == "PAPER" else None,
+    }, snapshot_path)
+
+
+def order_main(decisions, handle: Optional[Callable] = None, connect: Optional[Callable] = _connect,
+               snapshot_path: Optional[str] = ORDERS_SNAPSHOT):
+    """
+    Order process: the only place where orders are sized and sent.
+
+    Decisions are ranked by an OrderQueue (stops, then exits, then
+    entries by strength, edge and age) and sent one at a time under the
+    broker rate limit. Decisions that arrived in the meantime are queued
+    before each send, so a new exit never waits behind entries. Entries
+    the order book argues against are dropped here, where positions are
+    known; exits always go through. A SessionGuard stops entries after
+    the cutoff and squares off every position before the broker's MIS
+    auto square-off, as in the single-symbol loop. After each batch the
+    account totals are written to the order event log as a `portfolio`
+    stats event.
+
+    With the default handler, positions, stops and the portfolio are saved
+    to `snapshot_path` after every order and restored (then reconciled
+    against the broker) when the process is restarted.
+    """
+
+    from execution.order_queue import ENTRY, OrderQueue, order_kind
+    from risk.session import SessionGuard
+    from strategy.strategy import depth_blocks
+    from utils.clock import get_clock
+    from utils.events import EventLog
+
+    if connect is not None:
+        connect()
+
+    events = EventLog("logs/order_events.jsonl")
+    guard = SessionGuard()
+    orders = OrderQueue(limiter=guard.limiter, events=events)
+    watcher = None
+    position = None
+    portfolio = None
+    square_off = None
+    persist = None
+    reconciler = None
+
+    if handle is None:
+        from config.loader import ConfigWatcher, get_config
+        from data.market_data import get_ltp
+
+        book, stops, portfolio, reconciler = restore_orders(snapshot_path, get_config().capital)
+        handle = order_handler(book, portfolio, stops, orders, guard)
+        position = book.qty
+        square_off = lambda now: square_off_book(guard, now, book, portfolio, stops, get_ltp)
+        if snapshot_path:
+            persist = lambda: save_orders(snapshot_path, book, stops, portfolio)
+        reconciler.start()
+
+        # Symbols dropped from SYMBOLS get no more signals, so close what is held in them
+        watcher = ConfigWatcher(on_change=[
+            lambda old, new: flatten_removed(book, orders, set(old.symbols) - set(new.symbols), get_ltp)
+        ])
+
+    stopped = False
+
+    while not stopped:
+        batch = []
+
+        # Block only while nothing is queued, waking up now and then so
+        # settings changes apply even without decisions
+        if not len(orders):
+            try:
+                batch.append(decisions.get(timeout=WATCH_INTERVAL))
+            except queue.Empty:
+                pass
+
+        # Everything that arrived in the meantime competes for the next slot
+        while True:
+            try:
+                batch.append(decisions.get_nowait())
+            except queue.Empty:
+                break
+
+        for decision in batch:
+            if decision is None:
+                stopped = True
+                continue
+
+            symbol, signal = decision["symbol"], decision["signal"]
+            held = position(symbol) if position is not None else 0
+            kind = order_kind(signal, held)
+
+            if kind == ENTRY and depth_blocks(signal, decision.get("depth")):
+                logger.debug(f"Order book against {signal} {symbol}, not entering")
+                continue
+
+            orders.push(symbol, signal, abs(held), decision["price"], kind=kind,
+                        strength=decision.get("strength", 1.0), edge_bps=decision.get("edge_bps", 1.0),
+                        ts=decision.get("ts"), payload=decision)
+
+        try:
+            if watcher is not None:
+                watcher.poll()   # capital and risk changes apply to the next order
+
+            now = get_clock().now()
+            if square_off is not None and guard.should_square_off(now):
+                square_off(now)
+                reconciler.notify_activity()
+                if persist is not None:
+                    persist()
+        except Exception as e:
+            logger.error(f"Order process: {e}")
+
+        sent = orders.drain(lambda order: handle(order.payload), max_orders=1)
+
+        if sent and reconciler is not None:
+            reconciler.notify_activity()
+            if persist is not None:
+                persist()
+
+        # Marked with every decision's price and updated by every fill
+        if (batch or sent) and portfolio is not None and events.enabled("stats"):
+            events.stats("portfolio", portfolio.snapshot._asdict())
+
+        if len(batch) > 1:
+            logger.info(f"Order queue: {orders.stats()}")
+
+    # Orders decided before the shutdown still go out
+    orders.drain(lambda order: handle(order.payload))
+
+    if persist is not None:
+        persist()
+    if reconciler is not None:
+        reconciler.stop()
+
+
+class Supervisor:
+    """
+    Start, watch and restart the worker and order processes.
+
+    Args:
+        symbols: Universe to trade
+        workers: Number of worker processes (defaults to the CPU count)
+        interval: Seconds between worker cycles
+        max_restarts: Crashes of one worker within restart_window before
+            its shard is spread over the remaining workers
+        compute: Shard compute function passed to workers
+        handle: Decision handler for the order process
+        connect: Per-process broker setup (None skips it)
+    """
+
+    def __init__(self, symbols: list, workers: Optional[int] = None, interval: float = 300,
+                 max_restarts: int = 3, restart_window: float = 600,
+                 compute: Callable = compute_decisions, handle: Optional[Callable] = None,
+                 connect: Optional[Callable] = _connect):
+        self.symbols = list(symbols)
+        self.n_workers = max(1, min(workers or os.cpu_count() or 1, len(self.symbols) or 1, MAX_WORKERS))
+        self.interval = interval
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.compute = compute
+        self.handle = handle
+        self.connect = connect
+
+        self.decisions = multiprocessing.Queue()
+        self.heartbeats = multiprocessing.Array("d", MAX_WORKERS)
+        self.shards = shard(self.symbols, self.n_workers)
+        self.workers = {}
+        self.controls = {}
+        self.crashes = {}
+        self.order_process = None
+
+    def _start_worker(self, worker_id: int):
+        self.heartbeats[worker_id] = 0.0
+        self.controls[worker_id] = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=worker_main,
+            args=(worker_id, self.shards[worker_id], self.decisions, self.heartbeats,
+                  self.interval, self.compute, self.connect, self.controls[worker_id]),
+            name=f"worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self.workers[worker_id] = process
+
+    def start(self):
+        self.order_process = multiprocessing.Process(
+            target=order_main, args=(self.decisions, self.handle, self.connect),
+            name="orders", daemon=True,
+        )
+        self.order_process.start()
+
+        for worker_id in range(len(self.shards)):
+            self._start_worker(worker_id)
+
+        logger.info(f"Supervisor started {len(self.shards)} workers for {len(self.symbols)} symbols")
+
+    def rebalance(self, symbols: Optional[list] = None, workers: Optional[int] = None):
+        """Re-shard the universe (optionally a new one) and restart the workers."""
+
+        if symbols is not None:
+            self.symbols = list(symbols)
+        if workers is not None:
+            self.n_workers = max(1, workers)
+
+        self.stop_workers()
+        self.shards = shard(self.symbols, self.n_workers)
+        self.crashes = {}
+
+        for worker_id in range(len(self.shards)):
+            self._start_worker(worker_id)
+
+        logger.info(f"Rebalanced {len(self.symbols)} symbols over {len(self.shards)} workers")
+
+    def set_universe(self, symbols: list):
+        """
+        Add or remove symbols without restarting workers.
+
+        Sharding is by stable hash, so only the workers whose shard changed
+        are told; every other symbol keeps its worker and its state. The
+        order process watches the same settings and closes positions in
+        removed symbols (see flatten_removed).
+        """
+
+        self.symbols = list(symbols)
+        shards = shard(self.symbols, len(self.shards))
+
+        for worker_id, symbols in enumerate(shards):
+            if symbols != self.shards[worker_id] and worker_id in self.controls:
+                self.controls[worker_id].put(symbols)
+
+        self.shards = shards
+
+    def check(self):
+        """Restart crashed workers; rebalance when one crashes too often."""
+
+        now = time.time()
+
+        for worker_id, process in list(self.workers.items()):
+            beat = self.heartbeats[worker_id]
+
+            if process.is_alive() and beat and now - beat > 3 * self.interval + 60:
+                logger.warning(f"Worker {worker_id} stopped heartbeating, killing it")
+                process.terminate()
+                process.join()
+
+            if process.is_alive():
+                continue
+
+            crashes = [t for t in self.crashes.get(worker_id, []) if now - t < self.restart_window]
+            crashes.append(now)
+            self.crashes[worker_id] = crashes
+
+            logger.warning(f"Worker {worker_id} exited with code {process.exitcode}")
+
+            if len(crashes) > self.max_restarts and self.n_workers > 1:
+                self.rebalance(workers=self.n_workers - 1)
+                return
+
+            self._start_worker(worker_id)
+
+        if self.order_process is not None and not self.order_process.is_alive():
+            logger.warning("Order process exited, restarting")
+            self.order_process = multiprocessing.Process(
+                target=order_main, args=(self.decisions, self.handle, self.connect),
+                name="orders", daemon=True,
+            )
+            self.order_process.start()
+
+    def stop_workers(self):
+        for process in self.workers.values():
+            process.terminate()
+        for process in self.workers.values():
+            process.join()
+        self.workers = {}
+
+    def stop(self):
+        self.stop_workers()
+        if self.order_process is not None:
+            self.decisions.put(None)
+            self.order_process.join(timeout=5)
+            if self.order_process.is_alive():
+                self.order_process.terminate()
+
+    def run(self, poll: float = 5, watch: bool = True):
+        """Supervise until interrupted, applying SYMBOLS changes from the settings file."""
+
+        watcher = None
+        if watch:
+            from config.loader import ConfigWatcher
+            watcher = ConfigWatcher(on_change=[lambda old, new: self.set_universe(new.symbols)])
+
+        self.start()
+        try:
+            while True:
+                time.sleep(poll)
+                if watcher is not None:
+                    watcher.poll()
+                self.check()
+        finally:
+            self.stop()
+
+
+if __name__ == "__main__":
+
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from config import settings
+
+    Supervisor(getattr(settings, "SYMBOLS", [settings.SYMBOL])).run()
@@ -0,0 +1,129 @@
+"""
+Memoization for indicator results.
+
+Indicators are keyed by a fingerprint of the candle series they were
+computed on (symbol, interval, first/last timestamp, length and the
+first/last close) plus the indicator name and parameters, so the live
+loop, backtests and any other caller evaluating the same series share
+one computation. The last close is part of the fingerprint because the
+forming candle keeps its timestamp while its price changes.
+
+Entries are evicted least-recently-used once either the entry count or
+the total array size exceeds its bound.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+
+MAX_ENTRIES = 1024
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def series_key(symbol: str, interval: str, candles: list) -> Optional[tuple]:
+    """Fingerprint of a candle series (None if it cannot be identified)."""
+
+    if not symbol or not candles or "date" not in candles[-1]:
+        return None
+
+    first, last = candles[0], candles[-1]
+    return (symbol, interval, first["date"], last["date"], len(candles), first["close"], last["close"])
+
+
+class IndicatorCache:
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, compute: Callable):
+        """
+        Return the cached result for key, computing and storing it on a miss.
+
+        Cached arrays are read-only since every caller shares them.
+        """
+
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        result = compute()
+        arrays = result if isinstance(result, tuple) else (result,)
+        for arr in arrays:
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+
+        with self._lock:
+            if key not in self.entries:
+                self.entries[key] = result
+                self.bytes += _size(result)
+                self._evict()
+
+        return result
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, result = self.entries.popitem(last=False)
+            self.bytes -= _size(result)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _size(result) -> int:
+    arrays = result if isinstance(result, tuple) else (result,)
+    return sum(getattr(arr, "nbytes", 0) for arr in arrays)
+
+
+indicator_cache = IndicatorCache()
+
+
+def cached(series: Optional[tuple], name: str, fn: Callable, values, *params,
+           cache: Optional[IndicatorCache] = None):
+    """
+    Compute fn(values, *params), memoized under the series fingerprint.
+
+    Args:
+        series: Key from series_key(); None computes without caching
+        name: Indicator name (part of the key)
+        fn: Indicator kernel from strategy.indicators
+        values: Input array(s); a tuple is passed as separate arguments
+        cache: Cache to use (defaults to the shared indicator_cache)
+
+    Returns:
+        The indicator result
+    """
+
+    args = values if isinstance(values, tuple) else (values,)
+
+    if series is None:
+        return fn(*args, *params)
+
+    cache = cache or indicator_cache
+    return cache.get(series + (name, params), lambda: fn(*args, *params))
@@ -0,0 +1,241 @@
+"""
+Technical indicator kernels on NumPy arrays.
+
+Every kernel accepts a 1-D series or a 2-D array of shape
+(symbols, time) and computes all rows in one call. Outputs have the same
+shape as the input, with NaN during each indicator's warm-up period.
+Results match the `ta` package (see tests/test_indicators.py).
+
+When numba is installed the recursive kernels are JIT-compiled; otherwise
+they run as NumPy loops over time that are vectorised across symbols.
+Inputs are expected to have no missing values after the first valid one.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _as_2d(values):
+    arr = np.asarray(values, dtype=np.float64)
+    return arr[np.newaxis, :] if arr.ndim == 1 else arr
+
+
+def _like(result, values):
+    return result[0] if np.ndim(values) == 1 else result
+
+
+def _first_valid(x):
+    """Index of the first non-NaN value in each row (row length if none)."""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+
+def _ewm_numpy(x, alpha, min_periods):
+    n_sym, n = x.shape
+    out = np.full((n_sym, n), np.nan)
+    start = _first_valid(x)
+    prev = np.full(n_sym, np.nan)
+
+    for t in range(n):
+        col = x[:, t]
+        prev = np.where(t == start, col, alpha * col + (1 - alpha) * prev)
+        out[:, t] = np.where(t - start + 1 >= min_periods, prev, np.nan)
+
+    return out
+
+
+def _wilder_numpy(tr, window):
+    n_sym, n = tr.shape
+    out = np.full((n_sym, n), np.nan)
+    if n < window:
+        return out
+
+    prev = tr[:, :window].mean(axis=1)
+    out[:, window - 1] = prev
+
+    for t in range(window, n):
+        prev = (prev * (window - 1) + tr[:, t]) / window
+        out[:, t] = prev
+
+    return out
+
+
+def _ewm_loops(x, alpha, min_periods):
+    n_sym, n = x.shape
+    out = np.full((n_sym, n), np.nan)
+
+    for i in range(n_sym):
+        count = 0
+        prev = 0.0
+        for t in range(n):
+            v = x[i, t]
+            if count == 0:
+                if np.isnan(v):
+                    continue
+                prev = v
+            else:
+                prev = alpha * v + (1 - alpha) * prev
+            count += 1
+            if count >= min_periods:
+                out[i, t] = prev
+
+    return out
+
+
+def _wilder_loops(tr, window):
+    n_sym, n = tr.shape
+    out = np.full((n_sym, n), np.nan)
+    if n < window:
+        return out
+
+    for i in range(n_sym):
+        prev = 0.0
+        for t in range(window):
+            prev += tr[i, t]
+        prev /= window
+        out[i, window - 1] = prev
+        for t in range(window, n):
+            prev = (prev * (window - 1) + tr[i, t]) / window
+            out[i, t] = prev
+
+    return out
+
+
+if njit is not None:
+    _ewm = njit(cache=True)(_ewm_loops)
+    _wilder = njit(cache=True)(_wilder_loops)
+else:
+    _ewm = _ewm_numpy
+    _wilder = _wilder_numpy
+
+
+def ema(close, window=14):
+    """Exponential moving average (span=window, seeded with the first value)."""
+    x = _as_2d(close)
+    return _like(_ewm(x, 2.0 / (window + 1), window), close)
+
+
+def sma(close, window=14):
+    """Simple moving average."""
+    x = _as_2d(close)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(x, window, axis=1).mean(axis=-1)
+    return _like(out, close)
+
+
+def rsi(close, window=14):
+    """Relative strength index with Wilder smoothing."""
+    x = _as_2d(close)
+
+    diff = np.empty_like(x)
+    diff[:, 0] = 0.0
+    diff[:, 1:] = np.diff(x, axis=1)
+
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    alpha = 1.0 / window
+    avg_up = _ewm(up, alpha, window)
+    avg_down = _ewm(down, alpha, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down))
+
+    return _like(out, close)
+
+
+def true_range(high, low, close):
+    h, l, c = _as_2d(high), _as_2d(low), _as_2d(close)
+    prev_close = np.empty_like(c)
+    prev_close[:, 0] = np.nan
+    prev_close[:, 1:] = c[:, :-1]
+
+    tr = h - l
+    with np.errstate(invalid="ignore"):
+        tr = np.fmax(tr, np.abs(h - prev_close))
+        tr = np.fmax(tr, np.abs(l - prev_close))
+    return tr
+
+
+def atr(high, low, close, window=14):
+    """Average true range with Wilder smoothing seeded by a simple mean."""
+    return _like(_wilder(true_range(high, low, close), window), close)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    Moving average convergence divergence.
+
+    Returns:
+        tuple: (macd, signal line, histogram)
+    """
+    x = _as_2d(close)
+    line = _ewm(x, 2.0 / (fast + 1), fast) - _ewm(x, 2.0 / (slow + 1), slow)
+    signal_line = _ewm(line, 2.0 / (signal + 1), signal)
+    return _like(line, close), _like(signal_line, close), _like(line - signal_line, close)
+
+
+def bollinger(close, window=20, num_std=2):
+    """
+    Bollinger bands (population standard deviation).
+
+    Returns:
+        tuple: (middle, upper, lower)
+    """
+    x = _as_2d(close)
+    mid = np.full(x.shape, np.nan)
+    std = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        windows = sliding_window_view(x, window, axis=1)
+        mid[:, window - 1:] = windows.mean(axis=-1)
+        std[:, window - 1:] = windows.std(axis=-1)
+    upper, lower = mid + num_std * std, mid - num_std * std
+    return _like(mid, close), _like(upper, close), _like(lower, close)
+
+
+def vwap(high, low, close, volume, window=14):
+    """Rolling volume-weighted average of the typical price."""
+    typical = (_as_2d(high) + _as_2d(low) + _as_2d(close)) / 3
+    vol = _as_2d(volume)
+    out = np.full(typical.shape, np.nan)
+    if typical.shape[1] >= window:
+        pv = sliding_window_view(typical * vol, window, axis=1).sum(axis=-1)
+        v = sliding_window_view(vol, window, axis=1).sum(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, window - 1:] = pv / v
+    return _like(out, close)
+
+
+def pivots(high, low, close):
+    """
+    Classic floor-trader support and resistance levels.
+
+    Each bar's levels are computed from the previous bar, so the values
+    at t are known before bar t trades.
+
+    Returns:
+        dict: "pivot", "r1", "s1", "r2", "s2" arrays
+    """
+    h, l, c = _as_2d(high), _as_2d(low), _as_2d(close)
+    shifted = []
+    for arr in (h, l, c):
+        prev = np.full(arr.shape, np.nan)
+        prev[:, 1:] = arr[:, :-1]
+        shifted.append(prev)
+    ph, pl, pc = shifted
+
+    p = (ph + pl + pc) / 3
+    levels = {
+        "pivot": p,
+        "r1": 2 * p - pl,
+        "s1": 2 * p - ph,
+        "r2": p + (ph - pl),
+        "s2": p - (ph - pl),
+    }
+    return {name: _like(arr, close) for name, arr in levels.items()}
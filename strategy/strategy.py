@@ -1,15 +1,53 @@
-import pandas as pd
-from ta.trend import EMAIndicator
-from ta.momentum import RSIIndicator
+import numpy as np
 from typing import Optional
 
+from strategy.cache import cached, series_key
+from strategy.indicators import ema, rsi
 
-def generate_signal(data: list) -> str:
+
+# Order-book filters, applied when depth features are available
+MAX_SPREAD_BPS = 25       # no trades into a spread wider than this
+IMBALANCE_LIMIT = 0.3     # no BUY against average ask-side imbalance beyond this (and vice versa)
+
+
+def depth_blocks(signal: str, depth: Optional[dict]) -> bool:
+    """
+    Whether order-book features argue against entering on a signal.
+
+    Args:
+        signal: "BUY" or "SELL"
+        depth: Order-book features from DepthBook.features() (None: no opinion)
+
+    Returns:
+        bool: True if the spread is too wide or the book leans against the signal
+    """
+
+    if not depth:
+        return False
+    if depth['spread_bps'] > MAX_SPREAD_BPS:
+        return True
+    if signal == "BUY" and depth['imbalance_avg'] < -IMBALANCE_LIMIT:
+        return True
+    if signal == "SELL" and depth['imbalance_avg'] > IMBALANCE_LIMIT:
+        return True
+    return False
+
+
+def generate_signal(data: list, symbol: Optional[str] = None, interval: str = "5minute",
+                    depth: Optional[dict] = None, position: int = 0) -> str:
     """
     Generate trading signals based on technical indicators.
     
     Args:
         data: List of OHLC data dictionaries
+        symbol: Symbol the candles belong to; when given, indicator
+            results are memoized (see strategy/cache.py)
+        interval: Candle interval, part of the memoization key
+        depth: Order-book features from DepthBook.features(); when given,
+            entries are dropped if the spread is too wide or the book leans
+            against them
+        position: Signed quantity held; a signal that reduces it is an exit
+            and is never held back by the depth filter
         
     Returns:
         str: "BUY", "SELL", or "HOLD"
@@ -19,20 +57,20 @@ def generate_signal(data: list) -> str:
         if not data or len(data) < 50:
             return "HOLD"
         
-        df = pd.DataFrame(data)
+        close = np.array([candle['close'] for candle in data], dtype=np.float64)
+        series = series_key(symbol, interval, data)
         
         # Calculate technical indicators
-        df["ema20"] = EMAIndicator(df['close'], 20).ema_indicator()
-        df["ema50"] = EMAIndicator(df['close'], 50).ema_indicator()
-        df["rsi"] = RSIIndicator(df['close']).rsi()
-        
-        df.dropna(inplace=True)
+        last = {
+            'close': close[-1],
+            'ema20': cached(series, "ema", ema, close, 20)[-1],
+            'ema50': cached(series, "ema", ema, close, 50)[-1],
+            'rsi': cached(series, "rsi", rsi, close, 14)[-1],
+        }
         
-        if df.empty:
+        if any(np.isnan(value) for value in last.values()):
             return "HOLD"
         
-        last = df.iloc[-1]
-        
         # Buy Condition: More aggressive entry for more trades
         # EMA20 > EMA50 (uptrend), RSI below 75, price above EMA20
         # OR: Price above both EMAs with RSI < 75
@@ -40,23 +78,71 @@ def generate_signal(data: list) -> str:
             (last['ema20'] > last['ema50'] and last['rsi'] < 75) or
             (last['close'] > last['ema20'] and last['close'] > last['ema50'] and last['rsi'] < 75)
         ):
-            return "BUY"
+            signal = "BUY"
         
         # Sell Condition: More aggressive exits
         # EMA20 < EMA50 (downtrend) OR RSI > 75 (approaching overbought)
-        if (
+        elif (
             (last['ema20'] < last['ema50']) or 
             (last['rsi'] > 75)
         ):
-            return "SELL"
+            signal = "SELL"
         
-        return "HOLD"
+        else:
+            return "HOLD"
+        
+        exits = position > 0 and signal == "SELL" or position < 0 and signal == "BUY"
+        if not exits and depth_blocks(signal, depth):
+            return "HOLD"
+        
+        return signal
         
     except Exception as e:
         print(f"Error generating signal: {e}")
         return "HOLD"
 
 
+def signal_strength(data: list, symbol: Optional[str] = None, interval: str = "5minute") -> dict:
+    """
+    How strongly the indicators behind generate_signal lean one way.
+
+    Reuses the memoized indicators, so calling it right after
+    generate_signal on the same candles costs a few cache lookups.
+
+    Args:
+        data: List of OHLC data dictionaries
+        symbol: Symbol the candles belong to (memoization key)
+        interval: Candle interval (memoization key)
+
+    Returns:
+        dict: strength in [0, 1] (RSI distance from 50) and edge_bps (EMA20/EMA50
+        separation in basis points of the close); zeros if indicators are unavailable
+    """
+
+    try:
+        if not data or len(data) < 50:
+            return {'strength': 0.0, 'edge_bps': 0.0}
+
+        close = np.array([candle['close'] for candle in data], dtype=np.float64)
+        series = series_key(symbol, interval, data)
+
+        ema20 = cached(series, "ema", ema, close, 20)[-1]
+        ema50 = cached(series, "ema", ema, close, 50)[-1]
+        rsi14 = cached(series, "rsi", rsi, close, 14)[-1]
+
+        if np.isnan(ema20) or np.isnan(ema50) or np.isnan(rsi14) or close[-1] <= 0:
+            return {'strength': 0.0, 'edge_bps': 0.0}
+
+        return {
+            'strength': float(min(1.0, abs(rsi14 - 50) / 50)),
+            'edge_bps': float(10000 * abs(ema20 - ema50) / close[-1]),
+        }
+
+    except Exception as e:
+        print(f"Error measuring signal strength: {e}")
+        return {'strength': 0.0, 'edge_bps': 0.0}
+
+
 def validate_signal(signal: str, current_price: float, entry_price: Optional[float] = None) -> bool:
     """
     Validate trading signal with additional checks.
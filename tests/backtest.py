@@ -13,8 +13,12 @@ from loguru import logger
 # Add project root to path (go up one level from tests folder)
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from data.adjustments import adjusted
 from data.market_data import get_historical, kite
+from data.tick_archive import TickArchive, ticks_to_candles
 from strategy.strategy import generate_signal
+from utils.events import EventLog, NullEventLog
+from utils.result_cache import STRATEGY_MODULES, ResultCache, source_hash
 from risk.risk import get_quantity
 from config.settings import SYMBOL, TOKEN, API_KEY, ACCESS_TOKEN
 
@@ -25,9 +29,15 @@ logger.add("logs/backtest.log", rotation="1 MB")
 class BacktestEngine:
     """Engine to backtest trading strategy and calculate accuracy metrics."""
     
-    def __init__(self, symbol=SYMBOL, days=30):
+    def __init__(self, symbol=SYMBOL, days=30, events=None, verbose=True, cache=None, archive=None,
+                 lookback=50):
         self.symbol = symbol
         self.days = days
+        self.lookback = lookback
+        self.archive = archive
+        self.events = events or NullEventLog()
+        self.verbose = verbose
+        self.cache = cache
         self.trades = []
         self.signals = []
         self.data = None
@@ -36,7 +46,13 @@ class BacktestEngine:
         """Fetch historical data for backtesting."""
         logger.info(f"Fetching {self.days} days of historical data for {self.symbol}...")
         try:
-            self.data = get_historical(self.days)
+            if self.archive is not None:
+                # Build 5 minute candles from the recorded ticks instead of the API
+                start = datetime.now() - timedelta(days=self.days)
+                candles = ticks_to_candles(self.archive.read(self.symbol, start=start))
+            else:
+                candles = get_historical(self.days)
+            self.data = adjusted(self.symbol, candles)
             if self.data:
                 logger.success(f"✓ Fetched {len(self.data)} candles")
                 return True
@@ -56,12 +72,13 @@ class BacktestEngine:
             return False
         
         try:
-            for i in range(50, len(self.data)):
+            for i in range(self.lookback, len(self.data)):
                 # Use previous candles to generate signal
-                lookback_data = self.data[max(0, i-50):i]
-                signal = generate_signal(lookback_data)
+                lookback_data = self.data[max(0, i-self.lookback):i]
+                signal = generate_signal(lookback_data, self.symbol)
                 
                 candle = self.data[i]
+                self.events.decision(self.symbol, signal, candle['close'], 0)
                 self.signals.append({
                     'timestamp': candle.get('date', i),
                     'close': candle['close'],
@@ -97,7 +114,9 @@ class BacktestEngine:
                     entry_price = price
                     entry_signal = "BUY"
                     entry_index = sig_data['index']
-                    logger.info(f"📈 BUY signal at ₹{price}")
+                    self.events.fill(self.symbol, "BUY", 1, price)
+                    if self.verbose:
+                        logger.info(f"📈 BUY signal at ₹{price}")
                 
                 elif signal == "SELL" and entry_price is not None and entry_signal == "BUY":
                     # Exit long position
@@ -116,7 +135,9 @@ class BacktestEngine:
                         'status': 'CLOSED'
                     })
                     
-                    logger.info(f"📉 SELL signal at ₹{exit_price} | PnL: ₹{pnl:.2f} ({pnl_pct:.2f}%)")
+                    self.events.fill(self.symbol, "SELL", 1, exit_price, pnl)
+                    if self.verbose:
+                        logger.info(f"📉 SELL signal at ₹{exit_price} | PnL: ₹{pnl:.2f} ({pnl_pct:.2f}%)")
                     entry_price = None
                     entry_signal = None
             
@@ -216,6 +237,11 @@ class BacktestEngine:
         
         logger.info("="*60 + "\n")
     
+    def cache_key(self):
+        """Result cache key: candle data, strategy and engine source, parameters."""
+        code = source_hash(*STRATEGY_MODULES, sys.modules[type(self).__module__])
+        return self.cache.key(self.data, {'engine': type(self).__name__, 'symbol': self.symbol, 'lookback': self.lookback}, code)
+    
     def run_backtest(self):
         """Run complete backtest workflow."""
         logger.info("🤖 Starting Backtest...")
@@ -223,13 +249,24 @@ class BacktestEngine:
         if not self.fetch_data():
             return False
         
-        if not self.generate_signals():
-            return False
+        key = self.cache_key() if self.cache is not None else None
+        cached = self.cache.get(key) if key else None
         
-        if not self.simulate_trades():
-            return False
+        if cached:
+            self.signals, self.trades = cached['signals'], cached['trades']
+            logger.success(f"✓ Loaded {len(self.trades)} trades from result cache")
+        else:
+            if not self.generate_signals():
+                return False
+            
+            if not self.simulate_trades():
+                return False
         
         metrics = self.calculate_accuracy()
+        if key and not cached:
+            self.cache.put(key, {'signals': self.signals, 'trades': self.trades, 'metrics': metrics})
+        for name, value in metrics.items():
+            self.events.metric(name, value)
         self.print_trade_details()
         
         logger.success("✓ Backtest completed successfully!")
@@ -241,10 +278,18 @@ def main():
     """Main entry point for backtesting."""
     try:
         # Create backtest engine
-        engine = BacktestEngine(days=30)
+        archive = TickArchive(sys.argv[sys.argv.index("--ticks") + 1]) if "--ticks" in sys.argv else None
+        engine = BacktestEngine(days=30, events=EventLog("logs/backtest_events.jsonl"),
+                                cache=None if "--no-cache" in sys.argv else ResultCache(),
+                                archive=archive)
         
         # Run backtest
-        metrics = engine.run_backtest()
+        if "--profile" in sys.argv:
+            from utils.profiling import deterministic_profile
+            with deterministic_profile("backtest"):
+                metrics = engine.run_backtest()
+        else:
+            metrics = engine.run_backtest()
         
         if metrics:
             logger.info("📊 Summary:")
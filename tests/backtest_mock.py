@@ -14,6 +14,8 @@ from loguru import logger
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from strategy.strategy import generate_signal
+from utils.events import EventLog, NullEventLog
+from utils.result_cache import STRATEGY_MODULES, ResultCache, source_hash
 from config.settings import SYMBOL, CAPITAL, RISK_PER_TRADE
 
 # Configure logger
@@ -23,9 +25,13 @@ logger.add("logs/backtest_mock.log", rotation="1 MB")
 class MockBacktestEngine:
     """Mock backtest engine using simulated price data."""
     
-    def __init__(self, symbol=SYMBOL, num_candles=200):
+    def __init__(self, symbol=SYMBOL, num_candles=200, events=None, verbose=True, cache=None, lookback=50):
         self.symbol = symbol
         self.num_candles = num_candles
+        self.lookback = lookback
+        self.events = events or NullEventLog()
+        self.verbose = verbose
+        self.cache = cache
         self.trades = []
         self.signals = []
         self.data = None
@@ -79,12 +85,13 @@ class MockBacktestEngine:
             return False
         
         try:
-            for i in range(50, len(self.data)):
+            for i in range(self.lookback, len(self.data)):
                 # Use previous candles to generate signal
-                lookback_data = self.data[max(0, i-50):i]
-                signal = generate_signal(lookback_data)
+                lookback_data = self.data[max(0, i-self.lookback):i]
+                signal = generate_signal(lookback_data, self.symbol)
                 
                 candle = self.data[i]
+                self.events.decision(self.symbol, signal, candle['close'], 0)
                 self.signals.append({
                     'timestamp': candle.get('date', i),
                     'close': candle['close'],
@@ -120,7 +127,9 @@ class MockBacktestEngine:
                     entry_price = price
                     entry_signal = "BUY"
                     entry_index = sig_data['index']
-                    logger.info(f"📈 BUY signal at ₹{price:.2f}")
+                    self.events.fill(self.symbol, "BUY", 1, price)
+                    if self.verbose:
+                        logger.info(f"📈 BUY signal at ₹{price:.2f}")
                 
                 elif signal == "SELL" and entry_price is not None and entry_signal == "BUY":
                     # Exit long position
@@ -139,7 +148,9 @@ class MockBacktestEngine:
                         'status': 'CLOSED'
                     })
                     
-                    logger.info(f"📉 SELL signal at ₹{exit_price:.2f} | PnL: ₹{pnl:.2f} ({pnl_pct:.2f}%)")
+                    self.events.fill(self.symbol, "SELL", 1, exit_price, pnl)
+                    if self.verbose:
+                        logger.info(f"📉 SELL signal at ₹{exit_price:.2f} | PnL: ₹{pnl:.2f} ({pnl_pct:.2f}%)")
                     entry_price = None
                     entry_signal = None
             
@@ -264,6 +275,11 @@ class MockBacktestEngine:
         
         logger.info("="*70 + "\n")
     
+    def cache_key(self):
+        """Result cache key: candle data, strategy and engine source, parameters."""
+        code = source_hash(*STRATEGY_MODULES, sys.modules[type(self).__module__])
+        return self.cache.key(self.data, {'engine': type(self).__name__, 'symbol': self.symbol, 'lookback': self.lookback}, code)
+    
     def run_backtest(self):
         """Run complete backtest workflow."""
         logger.info("🤖 Starting Mock Backtest...")
@@ -272,13 +288,24 @@ class MockBacktestEngine:
         if not self.generate_mock_data():
             return False
         
-        if not self.generate_signals():
-            return False
+        key = self.cache_key() if self.cache is not None else None
+        cached = self.cache.get(key) if key else None
         
-        if not self.simulate_trades():
-            return False
+        if cached:
+            self.signals, self.trades = cached['signals'], cached['trades']
+            logger.success(f"✓ Loaded {len(self.trades)} trades from result cache")
+        else:
+            if not self.generate_signals():
+                return False
+            
+            if not self.simulate_trades():
+                return False
         
         metrics = self.calculate_accuracy()
+        if key and not cached:
+            self.cache.put(key, {'signals': self.signals, 'trades': self.trades, 'metrics': metrics})
+        for name, value in metrics.items():
+            self.events.metric(name, value)
         self.print_trade_summary()
         
         logger.success("✅ Backtest completed successfully!")
@@ -294,10 +321,16 @@ def main():
         logger.info("MOCK BACKTEST - Trading Bot Accuracy Evaluation")
         logger.info("="*70 + "\n")
         
-        engine = MockBacktestEngine(num_candles=200)
+        engine = MockBacktestEngine(num_candles=200, events=EventLog("logs/backtest_mock_events.jsonl"),
+                                    cache=None if "--no-cache" in sys.argv else ResultCache())
         
         # Run backtest
-        metrics = engine.run_backtest()
+        if "--profile" in sys.argv:
+            from utils.profiling import deterministic_profile
+            with deterministic_profile("backtest_mock"):
+                metrics = engine.run_backtest()
+        else:
+            metrics = engine.run_backtest()
         
         if metrics:
             logger.info("\n📊 FINAL SUMMARY:")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Distributed backtest sweeps over the job queue.
+
+Candle datasets are pickled once per symbol into a shared directory
+(local disk, or a network mount every worker can read). A sweep submits
+one job per symbol, date window and parameter set; workers on any
+machine claim jobs, run BacktestEngine on the window and push back only
+the metrics.
+
+Each job names its dataset file, the dataset's hash and the strategy
+code hash, so resubmitting an unchanged sweep adds nothing, while new
+data or a strategy edit produces new jobs. A worker whose data or code
+differs from the job's fails it instead of returning a result for other
+inputs. Workers only open datasets inside their own --datasets directory,
+whatever the job asks for.
+
+Parameter sets come from a JSON file holding a list of objects with
+BacktestEngine arguments from SWEEP_PARAMS, e.g. [{"lookback": 50},
+{"lookback": 100}]. The server needs --token (or JOBQUEUE_TOKEN) unless
+it only listens on localhost, and remote workers send the same token.
+
+Usage:
+    backtest_sweep.py fetch    --datasets DIR [--days N]
+    backtest_sweep.py submit   --datasets DIR [--window DAYS] [--params FILE] [--queue PATH]
+    backtest_sweep.py serve    [--queue PATH] [--host HOST] [--port PORT] [--token TOKEN]
+    backtest_sweep.py work     --datasets DIR [--queue PATH | --url URL [--token TOKEN]] [--workers N]
+    backtest_sweep.py progress [--queue PATH | --url URL [--token TOKEN]]
+"""
+
+import sys
+import os
+import glob
+import json
+import pickle
+import tempfile
+import time
+from datetime import timedelta
+from functools import lru_cache, partial
+from multiprocessing import Process
+from loguru import logger
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.jobqueue import QUEUE_PATH, JobQueue, RemoteJobQueue, run_worker, serve_queue
+from utils.result_cache import STRATEGY_MODULES, data_hash, source_hash
+
+# Configure logger
+logger.add("logs/backtest_sweep.log", rotation="1 MB")
+
+
+LOOKBACK = 50
+SWEEP_PARAMS = ("lookback",)     # BacktestEngine arguments a parameter set may change
+
+
+def save_dataset(root, symbol, candles):
+    """Write a symbol's candles to the shared dataset directory. Returns the path."""
+
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"{symbol}.pkl")
+
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(candles, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+@lru_cache(maxsize=8)
+def _load(path, mtime_ns):
+    with open(path, "rb") as f:
+        candles = pickle.load(f)
+    return candles, data_hash(candles)
+
+
+def load_dataset(path):
+    """Candles and their hash; cached per worker process until the file changes."""
+
+    return _load(path, os.stat(path).st_mtime_ns)
+
+
+def dataset_path(root, name):
+    """
+    Resolve a job's dataset name inside the worker's dataset directory.
+
+    Datasets are unpickled, so a job must not be able to point a worker at
+    any other file.
+    """
+
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, name))
+
+    if os.path.dirname(path) != root or not path.endswith(".pkl"):
+        raise ValueError(f"dataset {name!r} is not a dataset in {root}")
+
+    return path
+
+
+def code_hash():
+    return source_hash(*STRATEGY_MODULES, "backtest")
+
+
+def sweep_jobs(root, window_days=None, param_sets=None):
+    """
+    Job payloads for every dataset in root, split into date windows.
+
+    Args:
+        root: Dataset directory
+        window_days: Window length in days (None: the whole dataset);
+            windows are [start, end)
+        param_sets: BacktestEngine arguments to run every window with
+            (None: the defaults only)
+    """
+
+    param_sets = [dict(p) for p in param_sets or [{}]]
+    for params in param_sets:
+        unknown = set(params) - set(SWEEP_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters {sorted(unknown)}; allowed: {SWEEP_PARAMS}")
+
+    code = code_hash()
+    jobs = []
+
+    for path in sorted(glob.glob(os.path.join(root, "*.pkl"))):
+        candles, digest = load_dataset(path)
+        if len(candles) <= LOOKBACK:
+            continue
+
+        symbol = os.path.splitext(os.path.basename(path))[0]
+        first, last = candles[0]['date'], candles[-1]['date']
+
+        if window_days is None:
+            windows = [(first, last + timedelta(seconds=1))]
+        else:
+            windows = []
+            start = first
+            while start <= last:
+                windows.append((start, start + timedelta(days=window_days)))
+                start += timedelta(days=window_days)
+
+        for start, end in windows:
+            for params in param_sets:
+                jobs.append({
+                    'symbol': symbol,
+                    'dataset': os.path.basename(path),
+                    'data': digest,
+                    'code': code,
+                    'start': str(start),
+                    'end': str(end),
+                    'params': params,
+                })
+
+    return jobs
+
+
+def run_job(payload, root):
+    """Backtest one job's window with its parameter set and return its metrics."""
+
+    from backtest import BacktestEngine
+
+    params = payload.get('params', {})
+    unknown = set(params) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters {sorted(unknown)}")
+
+    candles, digest = load_dataset(dataset_path(root, payload['dataset']))
+    if digest != payload['data']:
+        raise ValueError(f"dataset {payload['dataset']} changed since the job was submitted")
+    if code_hash() != payload['code']:
+        raise ValueError("worker strategy code differs from the submitted sweep")
+
+    # Warm the lookback with the bars before the window, as a live run would
+    start = next((i for i, c in enumerate(candles) if str(c['date']) >= payload['start']), len(candles))
+    end = next((i for i, c in enumerate(candles) if str(c['date']) >= payload['end']), len(candles))
+
+    engine = BacktestEngine(payload['symbol'], verbose=False, **params)
+    engine.data = candles[max(0, start - engine.lookback):end]
+
+    if not engine.generate_signals() or not engine.simulate_trades():
+        return {'candles': len(engine.data), 'total_trades': 0}
+
+    metrics = engine.calculate_accuracy()
+    metrics['candles'] = len(engine.data)
+    metrics.setdefault('total_trades', 0)
+    return metrics
+
+
+def work(queue, root, workers=1):
+    """Run worker processes until the queue is drained."""
+
+    execute = partial(run_job, root=root)
+
+    if workers == 1:
+        run_worker(queue, execute)
+        return
+
+    processes = [Process(target=run_worker, args=(queue, execute)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def print_progress(queue):
+    counts = queue.progress()
+    total = counts.get('total', 0)
+    done = counts.get('done', 0)
+    logger.info(f"{done}/{total} done | running {counts.get('running', 0)} | "
+                f"queued {counts.get('queued', 0)} | failed {counts.get('failed', 0)}")
+    return counts
+
+
+def _option(name, default=None):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+def main():
+    """Main entry point: see the module docstring for commands."""
+    try:
+        command = sys.argv[1] if len(sys.argv) > 1 else "progress"
+        root = _option("--datasets", "datasets")
+        url = _option("--url")
+        token = _option("--token", os.environ.get("JOBQUEUE_TOKEN"))
+        queue = RemoteJobQueue(url, token=token) if url else JobQueue(_option("--queue", QUEUE_PATH))
+
+        if command == "fetch":
+            from data.adjustments import adjusted
+            from data.market_data import get_historical
+            from config.settings import SYMBOL
+
+            path = save_dataset(root, SYMBOL, adjusted(SYMBOL, get_historical(int(_option("--days", 60)))))
+            logger.success(f"✓ Saved {path}")
+
+        elif command == "submit":
+            window = _option("--window")
+            params = _option("--params")
+            if params:
+                with open(params) as f:
+                    params = json.load(f)
+            ids = queue.submit_many(sweep_jobs(root, int(window) if window else None, params))
+            logger.success(f"✓ Submitted {len(ids)} jobs")
+            print_progress(queue)
+
+        elif command == "serve":
+            host = _option("--host", "127.0.0.1")
+            server = serve_queue(queue, host=host, port=int(_option("--port", 8765)), token=token)
+            logger.info(f"Serving job queue on {host}:{server.server_address[1]}")
+            while True:
+                time.sleep(60)
+                print_progress(queue)
+
+        elif command == "work":
+            work(queue, root, int(_option("--workers", 1)))
+            print_progress(queue)
+
+        else:
+            print_progress(queue)
+
+    except Exception as e:
+        logger.error(f"Sweep failed: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Shared test fixtures: a broker stand-in that records the orders sent to it.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution import orders
+
+
+class RecordingBroker:
+    def __init__(self):
+        self.placed = []
+        self.cancelled = []
+        self.reject = False
+
+    def place_order(self, **kwargs):
+        if self.reject:
+            raise RuntimeError("Insufficient margin")
+        self.placed.append(kwargs)
+        return str(len(self.placed))
+
+    def cancel_order(self, variety, order_id):
+        self.cancelled.append(order_id)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    recorder = RecordingBroker()
+    monkeypatch.setattr(orders, "broker", lambda: recorder)
+    monkeypatch.setattr(orders, "get_master", lambda: None)
+    return recorder
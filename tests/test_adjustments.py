@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Corporate-action adjustment tests.
+"""
+
+import sys
+import os
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.adjustments import CorporateActions, adjusted
+
+
+def daily(closes, start=datetime(2026, 1, 1, 9, 15)):
+    return [{'date': start + timedelta(days=i), 'open': c, 'high': c, 'low': c,
+             'close': c, 'volume': 100} for i, c in enumerate(closes)]
+
+
+def test_split_and_bonus_make_series_continuous():
+    # 1:2 split on day 2, then a 1:1 bonus on day 4
+    candles = daily([1000, 1000, 500, 500, 250, 250])
+    actions = CorporateActions({"XYZ": [
+        {"ex_date": "2026-01-05", "type": "bonus", "ratio": [1, 1]},
+        {"ex_date": "2026-01-03", "type": "split", "ratio": [1, 2]},
+    ]})
+
+    out = actions.adjust("XYZ", candles)
+
+    assert [c['close'] for c in out] == [250] * 6
+    assert [c['volume'] for c in out] == [400, 400, 200, 200, 100, 100]
+    # Raw data untouched; bars after the last ex-date are shared
+    assert candles[0]['close'] == 1000
+    assert out[4] is candles[4]
+
+
+def test_dividend_uses_close_before_ex_date():
+    candles = daily([100, 100, 90])
+    actions = CorporateActions()
+    actions.add("XYZ", date(2026, 1, 3), "dividend", amount=10)
+
+    out = actions.adjust("XYZ", candles)
+
+    assert [c['close'] for c in out] == pytest.approx([90, 90, 90])
+    assert out[0]['volume'] == 100
+
+
+def test_no_actions_in_range_returns_input():
+    candles = daily([100, 101])
+    actions = CorporateActions({"XYZ": [{"ex_date": "2020-01-01", "type": "split", "ratio": [1, 5]}]})
+
+    assert actions.adjust("XYZ", candles) is candles
+    assert actions.adjust("ABC", candles) is candles
+
+
+def test_file_is_reloaded_when_actions_are_added(tmp_path):
+    path = str(tmp_path / "actions.json")
+    candles = daily([200, 100])
+
+    assert adjusted("XYZ", candles, path) is candles
+
+    with open(path, "w") as f:
+        json.dump({"XYZ": [{"ex_date": "2026-01-02", "type": "split", "ratio": [1, 2]}]}, f)
+
+    assert adjusted("XYZ", candles, path)[0]['close'] == 100
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Config hot-reload tests: validation, atomic swap and live universe changes.
+"""
+
+import sys
+import os
+import queue
+
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import loader
+from config.loader import Config, ConfigError, ConfigWatcher, get_config, set_config
+from data.depth import DepthBook
+from execution.order_queue import EXIT, OrderQueue
+from execution.positions import PositionBook
+from risk.risk import get_quantity
+from runner.supervisor import Supervisor, flatten_removed, worker_main
+
+
+SETTINGS = '''
+API_KEY = "key"
+SYMBOL = "RELIANCE"
+CAPITAL = {capital}
+RISK_PER_TRADE = {risk}
+MODE = "{mode}"
+SYMBOLS = {symbols}
+'''
+
+
+@pytest.fixture
+def settings_file(tmp_path):
+    path = tmp_path / "settings.py"
+    stamp = [0]
+
+    def write(capital=50000, risk=0.01, mode="PAPER", symbols=("RELIANCE", "TCS")):
+        path.write_text(SETTINGS.format(capital=capital, risk=risk, mode=mode, symbols=list(symbols)))
+        stamp[0] += 1
+        os.utime(path, ns=(stamp[0] * 10**9, stamp[0] * 10**9))
+
+    write()
+    previous = set_config(loader.load_config(str(path)))
+    yield str(path), write
+    set_config(previous)
+
+
+def test_valid_change_is_swapped_in(settings_file):
+    path, write = settings_file
+    changes = []
+    watcher = ConfigWatcher(path, on_change=[lambda old, new: changes.append((old, new))])
+
+    assert watcher.poll() is None
+    assert get_quantity(100, 98) == 250
+
+    write(capital=100000)
+    config = watcher.poll()
+
+    assert config.capital == 100000
+    assert get_config() is config
+    assert get_quantity(100, 98) == 500
+    assert len(changes) == 1
+
+
+def test_invalid_and_frozen_changes_keep_previous_config(settings_file):
+    path, write = settings_file
+    watcher = ConfigWatcher(path)
+    before = get_config()
+
+    write(risk=0.5)
+    assert watcher.poll() is None
+    write(mode="LIVE")
+    assert watcher.poll() is None
+    write(symbols=("TCS", "TCS"))
+    assert watcher.poll() is None
+
+    assert get_config() is before
+    assert watcher.rejected == 3
+
+
+def test_reload_parses_settings_without_running_them(settings_file, tmp_path):
+    path, write = settings_file
+    marker = tmp_path / "ran"
+    watcher = ConfigWatcher(path)
+
+    with open(path, "a") as f:
+        f.write(f"open({str(marker)!r}, 'w').close()\nCAPITAL = 75000\n")
+    os.utime(path, ns=(99 * 10**9, 99 * 10**9))
+
+    assert watcher.poll().capital == 75000
+    assert not marker.exists()
+
+    with open(path, "a") as f:
+        f.write("CAPITAL = 2 ** 20\n")
+    os.utime(path, ns=(100 * 10**9, 100 * 10**9))
+
+    assert watcher.poll() is None
+    assert watcher.rejected == 1
+
+
+def test_validation_errors():
+    base = {"SYMBOL": "INFY", "CAPITAL": 1000, "RISK_PER_TRADE": 0.01, "MODE": "PAPER"}
+
+    assert Config.from_namespace(base).symbols == ("INFY",)
+    assert Config.from_namespace(dict(base, SYMBOLS=["TCS"])).symbol == "INFY"
+    for bad in ({"CAPITAL": -1}, {"MODE": "paper"}, {"SYMBOLS": ["A", "A"]}, {"CAPITAL": "lots"}):
+        with pytest.raises(ConfigError):
+            Config.from_namespace(dict(base, **bad))
+
+
+class Stop(BaseException):
+    pass
+
+
+def test_worker_keeps_buffers_of_symbols_that_stay():
+    control = queue.Queue()
+    seen = []
+
+    def compute(symbols, buffers, quality, depth_book):
+        seen.append((list(symbols), dict(buffers)))
+        if len(seen) == 1:
+            buffers.update({s: [s] for s in symbols})
+            control.put(["B", "C"])
+        else:
+            raise Stop()
+        return []
+
+    with pytest.raises(Stop):
+        worker_main(0, ["A", "B"], queue.Queue(), [0.0], 0, compute, None, control)
+
+    assert seen[1] == (["B", "C"], {"B": ["B"]})
+
+
+def test_supervisor_only_notifies_changed_shards():
+    supervisor = Supervisor(["A", "B", "C", "D"], workers=2, connect=None)
+    supervisor.controls = {0: queue.Queue(), 1: queue.Queue()}
+    before = [list(s) for s in supervisor.shards]
+
+    supervisor.set_universe(["A", "B", "C", "D", "E"])
+
+    updates = {i: q.get_nowait() for i, q in supervisor.controls.items() if not q.empty()}
+    assert len(updates) == 1
+    (worker_id, symbols), = updates.items()
+    assert symbols == before[worker_id] + ["E"]
+
+
+def test_depth_book_keeps_history_of_remaining_symbols():
+    book = DepthBook(["A", "B"], capacity=4)
+    book.update({"NSE:A": {"last_price": 10.0}, "NSE:B": {"last_price": 20.0}})
+
+    book.set_symbols(["B", "C"])
+
+    assert book.last_price("B") == 20.0
+    assert book.last_price("C") is None
+    assert book.last_price("A") is None
+
+
+def test_positions_in_removed_symbols_are_closed():
+    book = PositionBook()
+    book.apply_fill("A", "BUY", 10, 100.0)
+    book.apply_fill("B", "SELL", 5, 50.0)
+    orders = OrderQueue()
+
+    queued = flatten_removed(book, orders, {"A", "B", "C"}, {"A": 101.0}.get)
+
+    # B has no price to close at and is left for the operator
+    assert queued == ["A"]
+    order = orders.pop()
+    assert (order.symbol, order.side, order.qty, order.kind) == ("A", "SELL", 10, EXIT)
+    assert order.payload["signal"] == "SELL"
+    assert orders.pop() is None
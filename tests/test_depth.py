@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Depth feature tests: batched quotes, ring buffers and derived features.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import depth as depth_module
+from data.depth import DepthBook
+from strategy.strategy import generate_signal
+
+
+def quote(bid, ask, bid_qty, ask_qty, last=None):
+    return {
+        'last_price': last or (bid + ask) / 2, 'volume': 1000, 'oi': 0,
+        'depth': {
+            'buy': [{'price': bid, 'quantity': bid_qty, 'orders': 1}] + [{'price': bid - 1, 'quantity': bid_qty, 'orders': 1}] * 4,
+            'sell': [{'price': ask, 'quantity': ask_qty, 'orders': 1}] + [{'price': ask + 1, 'quantity': ask_qty, 'orders': 1}] * 4,
+        },
+    }
+
+
+class QuoteClient:
+    def __init__(self, quotes):
+        self.quotes = quotes
+        self.calls = []
+
+    def quote(self, keys):
+        self.calls.append(list(keys))
+        return {k: self.quotes[k] for k in keys if k in self.quotes}
+
+
+def test_universe_is_polled_in_batches(monkeypatch):
+    monkeypatch.setattr(depth_module, "QUOTE_BATCH", 2)
+    symbols = ["A", "B", "C", "D", "E"]
+    client = QuoteClient({f"NSE:{s}": quote(99.9, 100.1, 10, 10) for s in symbols})
+    book = DepthBook(symbols)
+
+    assert book.poll(client)
+    assert [len(c) for c in client.calls] == [2, 2, 1]
+    assert book.last_price("E") == pytest.approx(100.0)
+
+
+def test_features_and_ring_buffer_wraparound():
+    book = DepthBook(["A"], capacity=3)
+
+    for i in range(5):
+        book.update({"NSE:A": quote(100.0, 100.2, 300, 100, last=100.0 + i)}, ts=i)
+
+    f = book.features("A")
+    assert f['spread'] == pytest.approx(0.2)
+    assert f['imbalance'] == pytest.approx(0.5)
+    assert f['microprice'] == pytest.approx((100.0 * 100 + 100.2 * 300) / 400)
+    assert list(book.history("A", "last")) == [102.0, 103.0, 104.0]
+    assert list(book.history("A", "ts", 2)) == [3, 4]
+
+
+def test_one_sided_book_has_no_features():
+    book = DepthBook(["A"])
+    one_sided = quote(100.0, 100.2, 10, 10)
+    one_sided['depth']['sell'] = []
+    book.update({"NSE:A": one_sided})
+
+    assert book.features("A") is None
+    assert book.last_price("A") == pytest.approx(100.1)
+
+
+def test_depth_filters_signals():
+    closes = 100 + np.cumsum(np.tile([1.0, -0.7], 30))   # choppy uptrend
+    candles = [{'close': float(c)} for c in closes]
+    assert generate_signal(candles) == "BUY"
+
+    calm = {'spread_bps': 2.0, 'imbalance_avg': 0.1}
+    assert generate_signal(candles, depth=calm) == "BUY"
+    assert generate_signal(candles, depth=dict(calm, spread_bps=80.0)) == "HOLD"
+    assert generate_signal(candles, depth=dict(calm, imbalance_avg=-0.6)) == "HOLD"
+
+
+def test_depth_filter_never_holds_back_exits():
+    closes = 100 + np.cumsum(np.tile([1.0, -0.7], 30))
+    candles = [{'close': float(c)} for c in closes]
+    against = {'spread_bps': 80.0, 'imbalance_avg': -0.6}
+
+    # Covering a short is an exit; adding to a long is an entry
+    assert generate_signal(candles, depth=against, position=-10) == "BUY"
+    assert generate_signal(candles, depth=against, position=10) == "HOLD"
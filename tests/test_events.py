@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Event log tests: background writer, level filtering, clock timestamps and
+read_events filters.
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.clock import VirtualClock, set_clock
+from utils import events
+from utils.events import EventLog, read_events
+
+
+def test_writer_flushes_every_event_in_order_on_close(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path, level="DEBUG", batch_size=7)
+
+    for i in range(100):
+        log.fill("INFY", "BUY", i, 100.0 + i)
+    log.close()
+
+    fills = list(read_events(path, kind="fill"))
+    assert [e["qty"] for e in fills] == list(range(100))
+    assert fills[0] == {"type": "fill", "ts": fills[0]["ts"], "symbol": "INFY", "side": "BUY",
+                        "qty": 0, "price": 100.0, "pnl": 0.0}
+
+    # Events after close are counted, not written
+    log.order("INFY", "BUY", 1)
+    assert log.dropped == 1
+
+
+
+def test_one_exit_handler_flushes_only_the_logs_still_open(tmp_path):
+    closed = EventLog(str(tmp_path / "closed.jsonl"))
+    closed.close()
+    open_log = EventLog(str(tmp_path / "open.jsonl"))
+    open_log.metric("latency", 1.5)
+
+    assert closed not in events._open_logs
+    assert open_log in events._open_logs
+
+    events._close_open_logs()
+
+    assert open_log not in events._open_logs
+    assert [e["value"] for e in read_events(str(tmp_path / "open.jsonl"))] == [1.5]
+
+def test_levels_filter_event_types(tmp_path):
+    info = EventLog(str(tmp_path / "info.jsonl"))
+    info.decision("INFY", "BUY", 100.0, 1)
+    info.order("INFY", "BUY", 1, order_id="7")
+    info.close()
+
+    assert not info.enabled("decision") and info.enabled("order")
+    assert [e["type"] for e in read_events(info.path)] == ["order"]
+
+    off = EventLog(str(tmp_path / "off.jsonl"), level="OFF")
+    off.order("INFY", "BUY", 1)
+    off.close()
+
+    assert not off.enabled("order")
+    assert not os.path.exists(off.path)
+
+
+def test_timestamps_follow_the_active_clock(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    previous = set_clock(VirtualClock(datetime(2026, 1, 5, 9, 15), speed=None))
+
+    try:
+        log = EventLog(path)
+        log.order("INFY", "BUY", 1)
+        log.close()
+    finally:
+        set_clock(previous)
+
+    [event] = read_events(path)
+    assert event["ts"] == datetime(2026, 1, 5, 9, 15).timestamp()
+
+
+def test_read_events_filters_by_kind_time_and_field(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    previous = set_clock(VirtualClock(datetime(2026, 1, 5, 9, 15), speed=None))
+
+    try:
+        log = EventLog(path)
+        for symbol in ("INFY", "TCS", "INFY"):
+            log.fill(symbol, "SELL", 1, 100.0)
+            log.metric("equity", 1.0)
+            set_clock(VirtualClock(datetime(2026, 1, 5, 9, 20), speed=None))
+        log.close()
+    finally:
+        set_clock(previous)
+
+    start = datetime(2026, 1, 5, 9, 15).timestamp()
+
+    assert len(list(read_events(path))) == 6
+    assert len(list(read_events(path, kind="fill", symbol="INFY"))) == 2
+    assert len(list(read_events(path, kind="fill", until=start + 1))) == 1
+    assert len(list(read_events(path, since=start + 1))) == 4
+    assert list(read_events(str(tmp_path / "missing.jsonl"))) == []
+
+
+def test_stats_events_carry_named_values(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path)
+
+    assert log.enabled("stats")
+    log.stats("data_quality", {"bars": 12, "gaps": 1})
+    log.metric("equity", 50000.0)
+    log.close()
+
+    [stats] = read_events(path, kind="stats")
+    assert (stats["name"], stats["values"]) == ("data_quality", {"bars": 12, "gaps": 1})
+    assert [e["value"] for e in read_events(path, kind="metric")] == [50000.0]
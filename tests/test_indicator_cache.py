@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Indicator memoization tests.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy import strategy
+from strategy.cache import IndicatorCache, cached, indicator_cache, series_key
+from strategy.indicators import ema
+
+
+def make_candles(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    return [{'date': i, 'close': float(c)} for i, c in enumerate(closes)]
+
+
+def test_repeated_evaluation_hits_cache_with_same_signal():
+    candles = make_candles()
+    indicator_cache.clear()
+    before = indicator_cache.stats()
+
+    first = strategy.generate_signal(candles, "INFY")
+    second = strategy.generate_signal(candles, "INFY")
+
+    stats = indicator_cache.stats()
+    assert first == second == strategy.generate_signal(candles)
+    assert stats["misses"] - before["misses"] == 3
+    assert stats["hits"] - before["hits"] == 3
+
+
+def test_forming_candle_update_is_a_miss():
+    candles = make_candles()
+    updated = candles[:-1] + [dict(candles[-1], close=candles[-1]['close'] + 1)]
+
+    assert series_key("INFY", "5minute", candles) != series_key("INFY", "5minute", updated)
+    assert series_key("INFY", "5minute", candles) != series_key("TCS", "5minute", candles)
+    assert series_key(None, "5minute", candles) is None
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = IndicatorCache(max_entries=2)
+    close = np.arange(100, dtype=float)
+
+    for window in (5, 10, 20):
+        cached(("S",), "ema", ema, close, window, cache=cache)
+    cached(("S",), "ema", ema, close, 20, cache=cache)
+
+    assert cache.stats()["entries"] == 2
+    assert cache.evictions == 1
+    assert cache.hits == 1
+    assert (("S",) + ("ema", (5,))) not in cache.entries
+
+    small = IndicatorCache(max_bytes=close.nbytes)
+    cached(("S",), "ema", ema, close, 5, cache=small)
+    cached(("S",), "ema", ema, close, 10, cache=small)
+    assert small.stats()["entries"] == 1
+    assert not small.entries[("S", "ema", (10,))].flags.writeable
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Numerical parity of strategy.indicators against the `ta` package.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import EMAIndicator, MACD, SMAIndicator
+from ta.volatility import AverageTrueRange, BollingerBands
+from ta.volume import VolumeWeightedAveragePrice
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy import indicators
+
+
+def make_ohlcv(n=500, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 2500 + np.cumsum(rng.normal(0, 15, n))
+    high = close + np.abs(rng.normal(0, 5, n))
+    low = close - np.abs(rng.normal(0, 5, n))
+    volume = rng.integers(100000, 1000000, n).astype(float)
+    return pd.Series(high), pd.Series(low), pd.Series(close), pd.Series(volume)
+
+
+def assert_parity(ours, theirs, skip=0):
+    np.testing.assert_allclose(ours[skip:], np.asarray(theirs, dtype=float)[skip:], rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("window", [5, 20, 50])
+def test_ema_sma(window):
+    _, _, close, _ = make_ohlcv()
+    assert_parity(indicators.ema(close.values, window), EMAIndicator(close, window).ema_indicator())
+    assert_parity(indicators.sma(close.values, window), SMAIndicator(close, window).sma_indicator())
+
+
+def test_rsi():
+    _, _, close, _ = make_ohlcv()
+    assert_parity(indicators.rsi(close.values, 14), RSIIndicator(close, 14).rsi())
+
+
+def test_atr():
+    high, low, close, _ = make_ohlcv()
+    # ta reports zeros instead of NaN during the warm-up
+    assert_parity(indicators.atr(high.values, low.values, close.values, 14),
+                  AverageTrueRange(high, low, close, 14).average_true_range(), skip=13)
+
+
+def test_macd():
+    _, _, close, _ = make_ohlcv()
+    ta_macd = MACD(close)
+    line, signal, hist = indicators.macd(close.values)
+    assert_parity(line, ta_macd.macd())
+    assert_parity(signal, ta_macd.macd_signal())
+    assert_parity(hist, ta_macd.macd_diff())
+
+
+def test_bollinger_vwap():
+    high, low, close, volume = make_ohlcv()
+    bb = BollingerBands(close, 20, 2)
+    mid, upper, lower = indicators.bollinger(close.values, 20, 2)
+    assert_parity(mid, bb.bollinger_mavg())
+    assert_parity(upper, bb.bollinger_hband())
+    assert_parity(lower, bb.bollinger_lband())
+    assert_parity(indicators.vwap(high.values, low.values, close.values, volume.values, 14),
+                  VolumeWeightedAveragePrice(high, low, close, volume, 14).volume_weighted_average_price())
+
+
+def test_2d_rows_match_1d():
+    closes = np.stack([make_ohlcv(seed=s)[2].values for s in range(4)])
+    batch = indicators.rsi(closes, 14)
+    for row in range(4):
+        assert_parity(batch[row], indicators.rsi(closes[row], 14))
+
+
+def test_numpy_fallback_matches_compiled():
+    closes = np.stack([make_ohlcv(seed=s)[2].values for s in range(3)])
+    np.testing.assert_allclose(indicators._ewm_numpy(closes, 0.1, 10), indicators._ewm(closes, 0.1, 10))
+    np.testing.assert_allclose(indicators._wilder_numpy(closes, 14), indicators._wilder(closes, 14))
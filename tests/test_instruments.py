@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Instrument master tests: lookups, tick rounding, lot validation and the
+daily cache.
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SYMBOL, TOKEN
+from data import instruments
+from data.instruments import InstrumentMaster, load_instruments
+from data.market_data import resolve_token
+from execution import orders
+
+
+ROWS = [
+    {"instrument_token": 408065, "tradingsymbol": "INFY", "exchange": "NSE", "segment": "NSE",
+     "tick_size": 0.05, "lot_size": 1},
+    {"instrument_token": 128145924, "tradingsymbol": "INFY", "exchange": "BSE", "segment": "BSE",
+     "tick_size": 0.05, "lot_size": 1},
+    {"instrument_token": 12345, "tradingsymbol": "NIFTYFUT", "exchange": "NFO", "segment": "NFO-FUT",
+     "tick_size": 0.1, "lot_size": 50},
+]
+
+
+class InstrumentsClient:
+    def __init__(self):
+        self.calls = 0
+
+    def instruments(self):
+        self.calls += 1
+        return ROWS
+
+
+def test_lookups_by_symbol_token_and_segment():
+    master = InstrumentMaster.from_rows(ROWS)
+
+    assert len(master) == 3
+    assert master.token("INFY") == 408065
+    assert master.token("INFY", "BSE") == 128145924
+    assert master.get_by_token(12345)["tradingsymbol"] == "NIFTYFUT"
+    assert master.get("MISSING") is None
+    assert master.symbols(exchange="NSE") == ["INFY"]
+    assert master.symbols(segment="NFO-FUT") == ["NIFTYFUT"]
+    # Unknown instruments fall back to the equity defaults
+    assert (master.tick_size("MISSING"), master.lot_size("MISSING")) == (0.05, 1)
+
+
+def test_unknown_symbols_do_not_resolve_to_the_configured_token(monkeypatch):
+    monkeypatch.setattr(instruments, "_master", None)
+    assert resolve_token(SYMBOL) == TOKEN
+    assert resolve_token("INFY") is None
+
+    monkeypatch.setattr(instruments, "_master", InstrumentMaster.from_rows(ROWS))
+    assert resolve_token("INFY") == 408065
+    assert resolve_token("MISSING") is None
+
+
+def test_tick_rounding_and_lot_validation():
+    master = InstrumentMaster.from_rows(ROWS)
+
+    assert master.round_price("INFY", 1500.03) == 1500.05
+    assert master.round_price("NIFTYFUT", 22000.04, "NFO") == 22000.0
+
+    assert master.validate_quantity("NIFTYFUT", 100, "NFO") == 100
+    for qty in (25, 75):
+        with pytest.raises(ValueError):
+            master.validate_quantity("NIFTYFUT", qty, "NFO")
+    with pytest.raises(ValueError):
+        master.validate_quantity("MISSING", 1)
+
+
+def test_place_order_rejects_rather_than_resizes(monkeypatch):
+    sent = []
+    monkeypatch.setattr(instruments, "_master", InstrumentMaster.from_rows(ROWS))
+    monkeypatch.setattr(orders, "broker", lambda: type("B", (), {"place_order": lambda self, **kw: sent.append(kw) or "1"})())
+
+    assert orders.place_order("BUY", 75, symbol="NIFTYFUT") is None
+    assert sent == []
+
+
+def test_cache_is_reused_the_same_day_and_refreshed_after(tmp_path, monkeypatch):
+    path = str(tmp_path / "instruments.pkl")
+    client = InstrumentsClient()
+    monkeypatch.setattr(instruments, "_master", None)
+
+    master = load_instruments(client, path)
+    assert instruments.get_master() is master
+    assert load_instruments(client, path).token("INFY") == 408065
+    assert client.calls == 1
+
+    # Yesterday's cache is downloaded again
+    master.fetched_on = date.today() - timedelta(days=1)
+    master.save(path)
+    load_instruments(client, path)
+    assert client.calls == 2
+
+    with open(path, "wb") as f:
+        f.write(b"corrupt")
+    assert len(load_instruments(client, path)) == 3
+    assert client.calls == 3
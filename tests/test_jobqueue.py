@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Job queue tests: idempotent submits and retries, leases, worker processes
+sharing one SQLite file, and the HTTP transport.
+"""
+
+import sys
+import os
+import socket
+import threading
+import time
+import urllib.error
+from datetime import datetime, timedelta
+from functools import partial
+from multiprocessing import Barrier, Process
+
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backtest_mock import MockBacktestEngine
+from backtest_sweep import dataset_path, run_job, save_dataset, sweep_jobs
+from utils.jobqueue import JobQueue, RemoteJobQueue, run_worker, serve_queue
+
+
+WORKERS = 4
+
+
+def square(barrier, payload):
+    # The first WORKERS jobs only finish once each is held by a different
+    # worker: a worker waiting here cannot claim another job
+    if payload['x'] < WORKERS:
+        barrier.wait(30)
+    return {'value': payload['x'] ** 2, 'pid': os.getpid()}
+
+
+def test_submit_and_complete_are_idempotent(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+
+    first = queue.submit({'x': 3})
+    assert queue.submit({'x': 3}) == first
+    assert queue.progress() == {'queued': 1, 'total': 1}
+
+    jid, payload = queue.claim("a")
+    assert (jid, payload) == (first, {'x': 3})
+    assert queue.claim("b") is None
+
+    assert queue.complete(jid, "a", {'value': 9})
+    # A retried completion (e.g. after a lost reply) keeps the first result
+    assert not queue.complete(jid, "a", {'value': -1})
+    assert queue.results() == {jid: ({'x': 3}, {'value': 9})}
+
+
+def test_expired_lease_and_failures_are_retried(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), max_attempts=2)
+    jid = queue.submit({'x': 1})
+
+    # A worker that dies holding the job loses it when the lease runs out
+    assert queue.claim("dead", lease=0.05)[0] == jid
+    assert queue.claim("b") is None
+    time.sleep(0.1)
+    assert queue.claim("b")[0] == jid
+
+    # The dead worker can no longer fail it; the owner's failure is final
+    assert not queue.fail(jid, "dead", "late")
+    assert queue.fail(jid, "b", "boom")
+    assert queue.progress() == {'failed': 1, 'total': 1}
+    assert queue.claim("c") is None
+
+
+def test_worker_processes_share_one_queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    queue.submit_many([{'x': x} for x in range(60)])
+    barrier = Barrier(WORKERS)
+
+    workers = [Process(target=run_worker, args=(queue, partial(square, barrier))) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+
+    assert queue.progress() == {'done': 60, 'total': 60}
+    results = queue.results().values()
+    assert sorted(r['value'] for _, r in results) == [x ** 2 for x in range(60)]
+    assert len({r['pid'] for p, r in results if p['x'] < WORKERS}) == WORKERS
+
+
+def test_running_jobs_keep_their_lease(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    queue.submit({'x': 2})
+    claimed = threading.Event()
+
+    def slow(payload):
+        claimed.set()
+        time.sleep(0.4)
+        return payload['x']
+
+    worker = threading.Thread(target=run_worker, args=(queue, slow, "a", 0.1))
+    worker.start()
+    claimed.wait(5)
+
+    # Four lease lengths later the job is still ours
+    time.sleep(0.3)
+    assert queue.claim("b") is None
+
+    worker.join(5)
+    assert queue.progress() == {'done': 1, 'total': 1}
+
+
+def test_remote_queue_needs_its_token_and_retries_until_reachable(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+
+    with pytest.raises(ValueError):
+        serve_queue(queue, host="0.0.0.0", port=0)
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    # The server comes up only after the first calls failed
+    servers = []
+    threading.Timer(0.2, lambda: servers.append(serve_queue(queue, port=port, token="secret"))).start()
+
+    try:
+        remote = RemoteJobQueue(f"http://127.0.0.1:{port}", token="secret", retries=8, backoff=0.05)
+        assert remote.progress() == {'total': 0}
+
+        with pytest.raises(urllib.error.HTTPError) as e:
+            RemoteJobQueue(f"http://127.0.0.1:{port}", token="wrong").progress()
+        assert e.value.code == 401
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+def test_workers_only_open_datasets_in_their_directory(tmp_path):
+    root = str(tmp_path / "datasets")
+    path = save_dataset(root, "RELIANCE", [])
+
+    assert dataset_path(root, "RELIANCE.pkl") == os.path.realpath(path)
+    for name in ("../jobs.sqlite", "/etc/passwd", "sub/../../RELIANCE.pkl", "RELIANCE.txt"):
+        with pytest.raises(ValueError):
+            dataset_path(root, name)
+
+
+def test_sweep_over_http_matches_direct_backtest(tmp_path):
+    mock = MockBacktestEngine(num_candles=400, verbose=False)
+    mock.generate_mock_data()
+    start = datetime(2025, 1, 1, 9, 15)
+    candles = [dict(c, date=start + timedelta(minutes=5 * c['date'])) for c in mock.data]
+    save_dataset(str(tmp_path / "datasets"), "RELIANCE", candles)
+
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    server = serve_queue(queue, host="127.0.0.1", port=0, token="secret")
+    remote = RemoteJobQueue(f"http://127.0.0.1:{server.server_address[1]}", token="secret")
+
+    try:
+        jobs = sweep_jobs(str(tmp_path / "datasets"), param_sets=[{}, {'lookback': 80}])
+        assert remote.submit_many(jobs) == remote.submit_many(jobs)
+        assert run_worker(remote, partial(run_job, root=str(tmp_path / "datasets"))) == 2
+        assert remote.progress() == {'done': 2, 'total': 2}
+    finally:
+        server.shutdown()
+
+    [(payload, metrics)] = [pair for pair in queue.results().values() if not pair[0]['params']]
+    assert sorted(p['params'].get('lookback', 50) for p, _ in queue.results().values()) == [50, 80]
+    direct = MockBacktestEngine(num_candles=400, verbose=False)
+    direct.generate_mock_data()
+    direct.generate_signals()
+    direct.simulate_trades()
+
+    assert payload['symbol'] == "RELIANCE"
+    assert metrics['candles'] == 400
+    assert metrics['total_trades'] == len(direct.trades)
+    assert abs(metrics['total_pnl'] - sum(t['pnl'] for t in direct.trades)) < 1e-6
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo simulator tests: equivalence with MockBacktestEngine,
+reproducibility and the summary's confidence intervals.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backtest_mock import MockBacktestEngine
+from backtest_montecarlo import MonteCarloEngine, mock_history, signal_codes, simulate
+
+
+CODES = {"BUY": 1, "SELL": -1, "HOLD": 0}
+
+
+def test_vectorized_run_matches_mock_backtest_engine():
+    mock = MockBacktestEngine(num_candles=400, verbose=False)
+    mock.generate_mock_data()
+    mock.generate_signals()
+    mock.simulate_trades()
+
+    closes = np.array([[c["close"] for c in mock.data]])
+    codes = signal_codes(closes)
+    results = {name: values[0] for name, values in simulate(closes, codes).items()}
+
+    assert codes[0, 50:].tolist() == [CODES[s["signal"]] for s in mock.signals]
+    assert not codes[0, :50].any()
+
+    pnls = [t["pnl"] for t in mock.trades]
+    wins, losses = [p for p in pnls if p > 0], [p for p in pnls if p < 0]
+    assert results["total_trades"] == len(pnls)
+    assert results["total_pnl"] == pytest.approx(sum(pnls))
+    assert results["win_rate"] == pytest.approx(100 * len(wins) / len(pnls))
+    assert results["profit_factor"] == pytest.approx(sum(wins) / -sum(losses))
+
+
+def test_runs_are_reproducible_and_keep_symbols_apart():
+    history = mock_history(["A", "B"], num_candles=150)
+    assert history["A"] != history["B"]
+
+    first = MonteCarloEngine(history, n_paths=30, batch_size=10, workers=1, seed=3).run()
+    second = MonteCarloEngine(history, n_paths=30, batch_size=10, workers=1, seed=3).run()
+
+    assert first["total_pnl"].shape == (30, 2)
+    for name in first:
+        np.testing.assert_array_equal(first[name], second[name])
+
+
+def test_summary_accepts_any_confidence_level():
+    engine = MonteCarloEngine(mock_history(["A"], num_candles=150), n_paths=40, batch_size=20, workers=1)
+    engine.run()
+
+    narrow = engine.summary(0.8)["A"]["total_pnl"]
+    usual = engine.summary(0.95)["A"]["total_pnl"]
+    wide = engine.summary(0.995)["A"]["total_pnl"]
+
+    assert narrow["mean"] == usual["mean"] == wide["mean"]
+    assert wide["ci_low"] < usual["ci_low"] < narrow["ci_low"] <= narrow["mean"]
+
+    values = engine.results["total_pnl"][:, 0]
+    half = 1.959964 * values.std(ddof=1) / np.sqrt(values.size)
+    assert usual["ci_high"] - usual["mean"] == pytest.approx(half)
+
+    with pytest.raises(ValueError):
+        engine.summary(1.5)
+
+
+def test_real_history_aborts_on_symbols_missing_from_the_master(monkeypatch):
+    import backtest_montecarlo
+    from data import instruments, market_data
+
+    fetched = []
+    monkeypatch.setattr(sys, "argv", ["backtest_montecarlo.py"])
+    monkeypatch.setattr(backtest_montecarlo.settings, "SYMBOLS", ["RELIANCE", "NOSUCHSYMBOL"], raising=False)
+    monkeypatch.setattr(instruments, "load_instruments", lambda *args, **kwargs: None)
+    monkeypatch.setattr(instruments, "_master", None)
+    monkeypatch.setattr(market_data, "get_historical", lambda *args, **kwargs: fetched.append(kwargs))
+
+    with pytest.raises(SystemExit):
+        backtest_montecarlo.main()
+
+    assert fetched == []
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Order queue tests: exits first, entry ranking and staleness, rate limit
+and queue-wait stats.
+"""
+
+import sys
+import os
+import time
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution.order_queue import ENTRY, EXIT, STOP, OrderQueue, order_kind
+from utils.ratelimit import RateLimiter
+
+
+def test_order_kind_follows_position():
+    assert order_kind("SELL", 10) == EXIT
+    assert order_kind("BUY", -5) == EXIT
+    assert order_kind("BUY", 10) == ENTRY
+    assert order_kind("SELL", 0) == ENTRY
+
+
+def test_exits_and_stops_go_before_stronger_entries():
+    queue = OrderQueue(limiter=RateLimiter(1000))
+    now = time.time()
+
+    queue.push("A", "BUY", 0, 100.0, strength=1.0, edge_bps=50, ts=now)
+    queue.push("B", "BUY", 0, 100.0, strength=0.2, edge_bps=10, ts=now)
+    queue.push("C", "SELL", 10, 100.0, kind=EXIT, ts=now)
+    queue.push("D", "SELL", 50, 100.0, kind=EXIT, ts=now)
+    queue.push("E", "SELL", 1, 100.0, kind=STOP, ts=now)
+    # Same strength and edge as A but older: its priority has halved twice
+    queue.push("F", "BUY", 0, 100.0, strength=1.0, edge_bps=50, ts=now - 60)
+    # Too old to act on at all
+    queue.push("G", "BUY", 0, 100.0, strength=1.0, edge_bps=500, ts=now - 600)
+
+    sent = queue.drain(lambda order: order.symbol)
+
+    assert [result for _, result in sent] == ["E", "D", "C", "A", "F", "B"]
+    assert queue.dropped == 1
+    assert len(queue) == 0
+
+
+def test_drain_respects_rate_limit_and_records_waits():
+    queue = OrderQueue(limiter=RateLimiter(10))
+    for i in range(15):
+        queue.push(f"S{i}", "BUY", 0, 100.0)
+
+    started = time.monotonic()
+    sent = queue.drain(lambda order: order.symbol)
+
+    # 10 go out as a burst, the other 5 at 10 per second
+    assert len(sent) == 15
+    assert time.monotonic() - started >= 0.4
+
+    stats = queue.stats()
+    assert stats[ENTRY]["count"] == 15
+    assert stats[ENTRY]["max"] >= 0.4 > stats[ENTRY]["p50"]
+    assert EXIT not in stats
+
+
+def test_stop_pushed_during_drain_jumps_ahead():
+    queue = OrderQueue(limiter=RateLimiter(1000))
+    now = time.time()
+    for symbol in ("A", "B", "C"):
+        queue.push(symbol, "BUY", 0, 100.0, ts=now)
+
+    def place(order):
+        if order.symbol == "A" and order.kind == ENTRY:
+            queue.push("A", "SELL", 10, 100.0, kind=STOP)
+        return order.kind
+
+    sent = queue.drain(place)
+
+    assert [(order.symbol, kind) for order, kind in sent] == [
+        ("A", ENTRY), ("A", STOP), ("B", ENTRY), ("C", ENTRY),
+    ]
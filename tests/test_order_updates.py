@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Order update tests: incremental partial fills, replayed updates, rejection
+callbacks and postback checksums.
+"""
+
+import sys
+import os
+import hashlib
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution.order_updates import OrderUpdateStream, serve_postbacks, verify_postback
+from execution.positions import PositionBook
+
+
+SECRET = "secret"
+
+
+def update(order_id="1", status="OPEN", filled=0, price=100.0, side="BUY", **extra):
+    return dict({"order_id": order_id, "status": status, "tradingsymbol": "INFY", "transaction_type": side,
+                 "filled_quantity": filled, "average_price": price}, **extra)
+
+
+def signed(payload):
+    raw = f"{payload['order_id']}{payload['order_timestamp']}{SECRET}"
+    return dict(payload, checksum=hashlib.sha256(raw.encode()).hexdigest())
+
+
+def test_partial_fills_are_applied_as_deltas():
+    book = PositionBook()
+    fills = []
+    stream = OrderUpdateStream(book, on_fill=[lambda u, qty, price: fills.append(qty)])
+
+    stream.handle(update(filled=3))
+    stream.handle(update(filled=3))    # repeated, nothing new filled
+    stream.handle(update(filled=2))    # out of order, never moves backwards
+    stream.handle(update(status="COMPLETE", filled=10))
+
+    assert fills == [3, 7]
+    assert book.qty("INFY") == 10
+
+
+def test_replayed_complete_update_is_ignored():
+    book = PositionBook()
+    fills = []
+    stream = OrderUpdateStream(book, on_fill=[lambda u, qty, price: fills.append((qty, u["pnl"]))])
+
+    stream.handle(update(status="COMPLETE", filled=10))
+    stream.handle(update(order_id="2", status="COMPLETE", filled=10, price=105.0, side="SELL"))
+    stream.handle(update(order_id="2", status="COMPLETE", filled=10, price=105.0, side="SELL"))
+
+    assert fills == [(10, 0.0), (10, 50.0)]
+    assert book.qty("INFY") == 0
+
+
+def test_rejected_orders_call_back_once_and_book_nothing():
+    book = PositionBook()
+    rejected = []
+    stream = OrderUpdateStream(book, on_reject=[rejected.append])
+
+    stream.handle(update(status="REJECTED", status_message="Insufficient funds"))
+    stream.handle(update(status="REJECTED", status_message="Insufficient funds"))
+
+    assert [u["status_message"] for u in rejected] == ["Insufficient funds"]
+    assert book.qty("INFY") == 0
+
+
+def test_verify_postback_checks_the_checksum():
+    payload = signed(update(order_timestamp="2026-01-05 10:00:00"))
+
+    assert verify_postback(payload, SECRET)
+    assert not verify_postback(payload, "other-secret")
+    assert not verify_postback(dict(payload, order_id="2"), SECRET)
+    assert not verify_postback({k: v for k, v in payload.items() if k != "checksum"}, SECRET)
+
+
+def test_postback_server_applies_only_signed_updates():
+    book = PositionBook()
+    stream = OrderUpdateStream(book)
+    server = serve_postbacks(stream, SECRET, port=0)
+    host, port = server.server_address
+
+    def post(payload):
+        request = Request(f"http://{host}:{port}/", data=json.dumps(payload).encode(), method="POST")
+        try:
+            return urlopen(request, timeout=5).status
+        except HTTPError as e:
+            return e.code
+
+    try:
+        assert host == "127.0.0.1"
+        good = signed(update(status="COMPLETE", filled=5, order_timestamp="2026-01-05 10:00:00"))
+        assert post(dict(good, checksum="0" * 64)) == 403
+        assert book.qty("INFY") == 0
+        assert post(good) == 200
+        assert book.qty("INFY") == 5
+    finally:
+        server.shutdown()
+        server.server_close()
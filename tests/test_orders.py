@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Order tests: tick rounding, limit pricing, TWAP/VWAP slicing on the
+active clock and bracket legs driven by order updates.
+"""
+
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution.algo import ChildOrder, SliceScheduler, _allocate, execute_sliced, twap_schedule, vwap_schedule
+from execution.order_updates import OrderUpdateStream
+from execution.orders import BracketOrder, place_limit_order, round_to_tick
+from execution.positions import PositionBook
+from utils.clock import VirtualClock, set_clock
+
+
+def test_allocate_sums_exactly_and_follows_weights():
+    assert _allocate(10, [1, 1, 1]) == [4, 3, 3]
+    assert _allocate(100, [1, 3]) == [25, 75]
+    assert sum(_allocate(997, [0.3, 0.2, 0.5, 0.1])) == 997
+    # No volume at all falls back to equal parts
+    assert _allocate(9, [0, 0, 0]) == [3, 3, 3]
+
+
+def test_twap_and_vwap_schedules():
+    assert twap_schedule(10, 60, 5) == [ChildOrder(i * 12, 2) for i in range(5)]
+    # Never more slices than shares
+    assert twap_schedule(3, 60, 5) == [ChildOrder(0, 1), ChildOrder(20, 1), ChildOrder(40, 1)]
+
+    # Empty buckets are skipped, the rest follow the profile
+    assert vwap_schedule(100, 40, [1, 0, 3, 1]) == [ChildOrder(0, 20), ChildOrder(20, 60), ChildOrder(30, 20)]
+    assert vwap_schedule(7, 40, []) == [ChildOrder(0, 7)]
+
+
+def test_round_to_tick_and_limit_price_improvement(broker):
+    assert round_to_tick(100.02) == 100.0
+    assert round_to_tick(100.03) == 100.05
+    assert round_to_tick(99.974) == 99.95
+
+    place_limit_order("BUY", 5, 100.0, improvement=2, symbol="INFY")
+    place_limit_order("SELL", 5, 100.02, symbol="INFY")
+
+    assert [(o["order_type"], o["price"]) for o in broker.placed] == [("LIMIT", 99.9), ("LIMIT", 100.05)]
+
+
+def test_sliced_order_runs_in_virtual_time(broker):
+    clock = VirtualClock(datetime(2026, 1, 5, 10, 0), speed=None)
+    previous = set_clock(clock)
+    sent = []
+
+    def place(side, qty):
+        sent.append((clock.time(), side, qty))
+        return str(len(sent))
+
+    try:
+        started = time.monotonic()
+        ids = execute_sliced("BUY", 10, duration=60, slices=5, place=place)
+    finally:
+        set_clock(previous)
+
+    assert time.monotonic() - started < 1
+    assert ids == ["1", "2", "3", "4", "5"]
+    start = datetime(2026, 1, 5, 10, 0).timestamp()
+    assert [(t - start, side, q) for t, side, q in sent] == [(i * 12, "BUY", 2) for i in range(5)]
+
+
+
+def test_scheduled_slices_return_at_once_and_go_out_while_waiting():
+    clock = VirtualClock(datetime(2026, 1, 5, 10, 0), speed=None)
+    start = clock.time()
+    sent, notified = [], []
+    slicer = SliceScheduler(clock, on_send=notified.append)
+
+    def place(side, qty):
+        sent.append((clock.time() - start, side, qty))
+        return str(len(sent))
+
+    children = execute_sliced("BUY", 10, duration=60, slices=5, place=place, scheduler=slicer)
+
+    # Queued, not sent: the first child waits for the loop's next sleep
+    assert len(children) == 5 and len(slicer) == 5
+    assert sent == [] and clock.now() == datetime(2026, 1, 5, 10, 0)
+
+    slicer.sleep(30)
+    assert sent == [(0, "BUY", 2), (12, "BUY", 2), (24, "BUY", 2)]
+    assert clock.time() - start == 30
+
+    slicer.sleep(300)
+    assert [t for t, _, _ in sent] == [0, 12, 24, 36, 48]
+    assert notified == ["1", "2", "3", "4", "5"]
+    assert clock.time() - start == 330
+
+    execute_sliced("SELL", 10, duration=60, slices=5, place=place, scheduler=slicer)
+    assert slicer.cancel() == 5
+    slicer.sleep(60)
+    assert len(sent) == 5
+
+def test_bracket_exits_follow_entry_fill_and_cancel_each_other(broker):
+    stream = OrderUpdateStream(PositionBook())
+    stream.live = True
+
+    bracket = BracketOrder("BUY", 10, 95.0, 110.0, symbol="INFY").submit(stream)
+    assert len(broker.placed) == 1
+
+    def update(order_id, filled):
+        stream.handle({"order_id": order_id, "status": "COMPLETE" if filled == 10 else "OPEN",
+                       "tradingsymbol": "INFY", "transaction_type": "BUY",
+                       "filled_quantity": filled, "average_price": 100.0})
+
+    # Exits wait for the whole entry
+    update(bracket.entry_id, 4)
+    assert len(broker.placed) == 1
+    update(bracket.entry_id, 10)
+    assert [o["order_type"] for o in broker.placed] == ["MARKET", "SL-M", "LIMIT"]
+
+    stream.handle({"order_id": bracket.target_id, "status": "COMPLETE", "tradingsymbol": "INFY",
+                   "transaction_type": "SELL", "filled_quantity": 10, "average_price": 110.0})
+
+    assert bracket.closed
+    assert broker.cancelled == [bracket.stop_id]
+    assert bracket.on_update not in stream.on_fill
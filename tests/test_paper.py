@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Paper broker tests: market, limit and stop matching, latency, slippage
+and snapshot state.
+"""
+
+import sys
+import os
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution.paper import PaperBroker, bps_slippage
+
+
+def place(broker, side, qty, order_type="MARKET", **kwargs):
+    return broker.place_order(tradingsymbol="INFY", transaction_type=side, quantity=qty,
+                              order_type=order_type, **kwargs)
+
+
+def test_market_orders_fill_with_slippage_against_the_order():
+    fills = []
+    broker = PaperBroker(slippage=bps_slippage(10), on_fill=fills.append)
+    broker.on_tick("INFY", 1000.0)
+
+    place(broker, "BUY", 10)
+    place(broker, "SELL", 4)
+
+    assert [(f["transaction_type"], f["average_price"]) for f in fills] == [("BUY", 1001.0), ("SELL", 999.0)]
+    assert broker.book.get("INFY") == {"qty": 6, "avg_price": 1001.0, "realized": -8.0}
+    # Unrealized at the last tick: (1000 - 1001) * 6
+    assert broker.total_pnl() == -14.0
+
+
+def test_latency_delays_eligibility():
+    broker = PaperBroker(latency=5)
+    order_id = place(broker, "BUY", 1)
+
+    broker.on_tick("INFY", 100.0, ts=broker._orders[order_id]["order_timestamp"] + 1)
+    assert broker.order_history(order_id)[0]["status"] == "OPEN"
+
+    broker.on_tick("INFY", 100.0, ts=broker._orders[order_id]["order_timestamp"] + 5)
+    assert broker.order_history(order_id)[0]["status"] == "COMPLETE"
+
+
+def test_limit_and_stop_orders_wait_for_their_price():
+    broker = PaperBroker(slippage=lambda side, price, qty: price)
+    broker.on_tick("INFY", 100.0)
+
+    limit = place(broker, "BUY", 5, "LIMIT", price=99.0)
+    stop = place(broker, "SELL", 5, "SL-M", trigger_price=97.0)
+    stop_limit = place(broker, "SELL", 5, "SL", price=96.5, trigger_price=97.5)
+
+    broker.on_tick("INFY", 99.5)
+    assert broker.book.qty("INFY") == 0
+
+    broker.on_tick("INFY", 98.5)
+    assert broker.order_history(limit)[0]["average_price"] == 99.0
+
+    # Both stops trigger; SL-M fills at market, SL rests as a limit above the price
+    broker.on_tick("INFY", 96.0)
+    assert broker.order_history(stop)[0]["status"] == "COMPLETE"
+    assert broker.order_history(stop_limit)[0]["order_type"] == "LIMIT"
+
+    broker.on_tick("INFY", 96.5)
+    assert broker.order_history(stop_limit)[0]["status"] == "COMPLETE"
+    assert broker.book.qty("INFY") == -5
+
+    assert broker.cancel_order(order_id=limit) is None
+
+
+def test_state_round_trip_keeps_working_orders_and_ids():
+    broker = PaperBroker()
+    broker.on_tick("INFY", 100.0)
+    place(broker, "BUY", 10)
+    stop = place(broker, "SELL", 10, "SL-M", trigger_price=95.0)
+
+    restored = PaperBroker()
+    restored.restore(broker.to_dict())
+
+    assert restored.book.to_dict() == broker.book.to_dict()
+    assert [o["order_id"] for o in restored.orders()] == [stop]
+    assert place(restored, "BUY", 1) == "PAPER3"
+
+    restored.on_tick("INFY", 94.0)
+    assert restored.order_history(stop)[0]["status"] == "COMPLETE"
+    assert restored.book.qty("INFY") == 1
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Portfolio accounting tests: fills, mark-to-market, fees and drawdown.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution.positions import PositionBook
+from risk.portfolio import Portfolio, intraday_equity_fees
+
+
+def no_fees(side, qty, price):
+    return 0.0
+
+
+def test_fills_match_position_book():
+    portfolio = Portfolio(100000, fees=no_fees)
+    book = PositionBook()
+
+    fills = [("INFY", "BUY", 10, 100.0), ("INFY", "BUY", 10, 110.0), ("INFY", "SELL", 25, 120.0),
+             ("TCS", "SELL", 5, 300.0), ("INFY", "BUY", 5, 115.0), ("TCS", "BUY", 5, 290.0)]
+
+    for fill in fills:
+        assert portfolio.fill(*fill) == book.apply_fill(*fill)
+
+    for symbol in ("INFY", "TCS"):
+        position = portfolio.position(symbol)
+        assert position["qty"] == book.qty(symbol)
+        assert position["avg_price"] == book.get(symbol)["avg_price"]
+        assert position["realized"] == book.get(symbol)["realized"]
+
+    snapshot = portfolio.snapshot
+    assert snapshot.open_positions == 0
+    assert snapshot.realized == 20 * 15 + 5 * 5 + 5 * 10
+    assert snapshot.equity == 100000 + snapshot.realized
+
+
+def test_mark_to_market_exposure_and_drawdown():
+    portfolio = Portfolio(100000, ["INFY", "TCS"], fees=no_fees)
+    portfolio.fill("INFY", "BUY", 100, 100.0)
+    portfolio.fill("TCS", "SELL", 10, 300.0)
+
+    snapshot = portfolio.mark({"INFY": 110.0, "TCS": 310.0, "UNKNOWN": 1.0})
+    assert snapshot.unrealized == 100 * 10 - 10 * 10
+    assert snapshot.gross_exposure == 100 * 110 + 10 * 310
+    assert snapshot.net_exposure == 100 * 110 - 10 * 310
+    assert snapshot.drawdown == 0
+
+    # NaN keeps the last price for that symbol
+    snapshot = portfolio.mark_array(np.array([95.0, np.nan]))
+    assert snapshot.unrealized == 100 * -5 - 10 * 10
+    assert snapshot.drawdown == 900 + 600
+    assert abs(snapshot.drawdown_pct - 1500 / 100900) < 1e-12
+
+    portfolio.mark({"INFY": 105.0})
+    assert portfolio.snapshot.drawdown == 500
+    assert portfolio.snapshot.max_drawdown == 1500
+
+
+def test_fees_reduce_equity_and_rows_grow():
+    portfolio = Portfolio(100000, fees=intraday_equity_fees())
+
+    for i in range(40):
+        portfolio.fill(f"S{i}", "BUY", 10, 100.0)
+
+    assert len(portfolio.qty) >= 40
+    snapshot = portfolio.mark({f"S{i}": 100.0 for i in range(40)})
+    assert snapshot.open_positions == 40
+    assert snapshot.fees > 0
+    assert snapshot.equity == 100000 - snapshot.fees
+
+    # Sells pay STT, buys pay stamp duty
+    fees = intraday_equity_fees()
+    assert fees("SELL", 100, 1000.0) > fees("BUY", 100, 1000.0)
+
+
+def test_restart_keeps_fees_and_drawdown():
+    book = PositionBook()
+    portfolio = Portfolio(100000, fees=intraday_equity_fees())
+
+    for fill in (("INFY", "BUY", 100, 100.0), ("INFY", "SELL", 50, 90.0), ("TCS", "BUY", 10, 300.0)):
+        book.apply_fill(*fill)
+        portfolio.fill(*fill)
+    before = portfolio.mark({"INFY": 95.0, "TCS": 320.0})
+
+    restored = Portfolio.from_book(book, 100000, state=portfolio.to_dict())
+    after = restored.mark({"INFY": 95.0, "TCS": 320.0})
+
+    assert after.fees == before.fees
+    assert after.equity == before.equity
+    assert after.max_drawdown == before.max_drawdown
+    assert restored.peak == portfolio.peak
+    # Without the saved state the fees paid so far would be forgotten
+    assert Portfolio.from_book(book, 100000).mark({"INFY": 95.0, "TCS": 320.0}).fees == 0
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Position book tests: average price and realized PnL through adds,
+reductions and flips.
+"""
+
+import sys
+import os
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution.positions import PositionBook
+
+
+def test_adds_average_and_reductions_realize():
+    book = PositionBook()
+
+    assert book.apply_fill("INFY", "BUY", 10, 100.0) == 0.0
+    assert book.apply_fill("INFY", "BUY", 10, 110.0) == 0.0
+    assert book.get("INFY")["avg_price"] == 105.0
+
+    assert book.apply_fill("INFY", "SELL", 5, 115.0) == 50.0
+    assert book.get("INFY") == {"qty": 15, "avg_price": 105.0, "realized": 50.0}
+
+    assert book.apply_fill("INFY", "SELL", 15, 100.0) == -75.0
+    assert book.get("INFY") == {"qty": 0, "avg_price": 0.0, "realized": -25.0}
+    assert book.open_positions() == {}
+
+
+def test_flip_realizes_closed_part_and_opens_at_fill_price():
+    book = PositionBook()
+    book.apply_fill("TCS", "SELL", 10, 300.0)
+
+    # Buying 25 covers the short 10 and leaves 15 long at the fill price
+    assert book.apply_fill("TCS", "BUY", 25, 290.0) == 100.0
+    assert book.get("TCS") == {"qty": 15, "avg_price": 290.0, "realized": 100.0}
+
+    assert book.apply_fill("TCS", "SELL", 20, 295.0) == 75.0
+    assert book.get("TCS") == {"qty": -5, "avg_price": 295.0, "realized": 175.0}
+
+
+def test_set_position_keeps_realized_pnl():
+    book = PositionBook()
+    book.apply_fill("INFY", "BUY", 10, 100.0)
+    book.apply_fill("INFY", "SELL", 5, 110.0)
+
+    book.set_position("INFY", 8, 102.0)
+    assert book.get("INFY") == {"qty": 8, "avg_price": 102.0, "realized": 50.0}
+
+    book.set_position("INFY", 0, 102.0)
+    assert book.get("INFY")["avg_price"] == 0.0
+
+
+def test_unplaced_order_is_not_booked():
+    from execution.order_updates import OrderUpdateStream
+
+    book = PositionBook()
+    stream = OrderUpdateStream(book)
+
+    stream.assume_filled(None, "INFY", "BUY", 10, 100.0)
+    assert book.open_positions() == {}
+
+    stream.assume_filled("1", "INFY", "BUY", 10, 100.0)
+    assert book.qty("INFY") == 10
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Profiler tests: rolling flushes, final outputs and the hot-function report.
+"""
+
+import sys
+import os
+import json
+import time
+from collections import Counter
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiling import deterministic_profile, hot_functions, sampling_profile
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_periodic_flushes_overwrite_one_rolling_set(tmp_path):
+    out_dir = str(tmp_path)
+
+    with sampling_profile("live", interval=0.001, out_dir=out_dir, flush_every=0.02):
+        busy(0.3)
+        # A flush may be mid-write; its temporary file is not part of the set
+        flushed = sorted(n for n in os.listdir(out_dir) if not n.endswith(".tmp"))
+
+    assert flushed == ["live-latest.folded", "live-latest.speedscope.json", "live-latest.txt"]
+
+    # The final write replaces the rolling set with one timestamped set
+    final = sorted(os.listdir(out_dir))
+    assert len(final) == 3
+    assert not any("latest" in name for name in final)
+
+    [speedscope] = [name for name in final if name.endswith(".speedscope.json")]
+    with open(os.path.join(out_dir, speedscope)) as f:
+        profile = json.load(f)
+    assert any(frame["name"] == "busy" for frame in profile["shared"]["frames"])
+
+
+def test_deterministic_profile_writes_every_output(tmp_path):
+    with deterministic_profile("backtest", out_dir=str(tmp_path)):
+        busy(0.05)
+
+    suffixes = sorted(name.split(".", 1)[1] for name in os.listdir(tmp_path))
+    assert suffixes == ["folded", "prof", "speedscope.json", "txt"]
+
+
+def test_hot_functions_reports_self_and_inclusive_share():
+    main, work = ("main", "a.py", 1), ("work", "a.py", 5)
+    stacks = Counter({(main,): 1, (main, work): 3})
+
+    lines = hot_functions(stacks).splitlines()
+
+    assert lines[1].split()[:2] == ["75.00", "75.00"]
+    assert lines[1].endswith("work (a.py:5)")
+    assert lines[2].split()[:2] == ["25.00", "100.00"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Data-quality stage tests: dedupe, gap repair and unhealthy-data holds.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.adjustments import CorporateActions
+from data.quality import DataQuality
+
+
+START = datetime(2026, 1, 5, 9, 15)
+
+
+def bar(i, close=100.0, volume=1000):
+    return {'date': START + timedelta(minutes=5 * i), 'open': close, 'high': close + 1,
+            'low': close - 1, 'close': close, 'volume': volume}
+
+
+def test_gap_is_repaired_by_refetching_only_the_missing_window():
+    full = [bar(i, 100 + i * 0.1) for i in range(20)]
+    calls = []
+
+    def refetch(start, end):
+        calls.append((start, end))
+        return [b for b in full if start <= b['date'] <= end]
+
+    quality = DataQuality(refetch=refetch, lookback=5)
+    out = quality.feed(full[:8] + full[12:])
+
+    assert [b['date'] for b in out] == [b['date'] for b in full]
+    assert calls == [(full[8]['date'], full[11]['date'])]
+    assert quality.counters['repaired_bars'] == 4
+    assert quality.healthy
+
+
+def test_duplicates_keep_latest_and_invalid_bars_are_dropped():
+    quality = DataQuality(lookback=5)
+    revised = dict(bar(1), close=100.5)
+    broken = dict(bar(2), high=90.0)
+
+    out = quality.feed([bar(0), bar(1), revised, broken])
+
+    assert out == [bar(0), revised]
+    assert quality.counters['duplicates'] == 1
+    assert quality.counters['invalid'] == 1
+    assert not quality.healthy
+
+
+def test_unrepaired_gap_and_outlier_hold_until_lookback_clean_bars():
+    quality = DataQuality(lookback=3)   # no refetch available
+
+    quality.feed([bar(0), bar(1), bar(5)])
+    assert quality.counters['unrepaired_gaps'] == 1
+    assert not quality.healthy
+
+    quality.feed([bar(6)])
+    assert not quality.healthy
+    quality.feed([bar(7)])
+    assert quality.healthy
+
+    quality.feed([bar(8, close=150.0)])
+    assert quality.counters['outliers'] == 1
+    assert not quality.healthy
+
+
+def test_session_boundaries_are_not_gaps():
+    quality = DataQuality()
+    close = datetime(2026, 1, 5, 15, 25)
+    next_open = datetime(2026, 1, 6, 9, 15)
+
+    out = quality.feed([dict(bar(0), date=close), dict(bar(0), date=next_open)])
+
+    assert len(out) == 2
+    assert quality.counters['gaps'] == 0
+
+
+def test_ex_date_open_is_not_an_outlier():
+    actions = CorporateActions({"INFY": [{"ex_date": "2026-01-06", "type": "split", "ratio": [1, 2]}]})
+    quality = DataQuality(is_ex_date=lambda day: actions.is_ex_date("INFY", day))
+    close = datetime(2026, 1, 5, 15, 25)
+    split_open = datetime(2026, 1, 6, 9, 15)
+
+    quality.feed([dict(bar(0, 1000.0), date=close), dict(bar(0, 500.0), date=split_open)])
+
+    assert quality.counters['corporate_actions'] == 1
+    assert quality.counters['outliers'] == 0
+    assert quality.healthy
+
+    # Later in the ex-date session a jump is suspect again
+    quality.feed([dict(bar(0, 400.0), date=split_open + timedelta(minutes=5))])
+    assert quality.counters['outliers'] == 1
+    assert not quality.healthy
+
+
+def test_jump_on_an_ordinary_day_is_still_flagged():
+    actions = CorporateActions({"INFY": [{"ex_date": "2026-01-07", "type": "split", "ratio": [1, 2]}]})
+    quality = DataQuality(is_ex_date=lambda day: actions.is_ex_date("INFY", day))
+
+    quality.feed([dict(bar(0, 1000.0), date=datetime(2026, 1, 5, 15, 25)),
+                  dict(bar(0, 500.0), date=datetime(2026, 1, 6, 9, 15))])
+
+    assert quality.counters['outliers'] == 1
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Reconciler tests: mismatch detection, auto-correction, deferral while
+fills are in flight and the adaptive poll schedule on the active clock.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from execution.order_updates import OrderUpdateStream
+from execution.positions import PositionBook
+from execution.reconcile import PositionMismatch, Reconciler
+from risk.portfolio import Portfolio
+from utils.clock import VirtualClock, set_clock
+
+
+class BrokerView:
+    def __init__(self, positions=None, orders=None):
+        self.net = dict(positions or {})
+        self.open_orders = list(orders or [])
+        self.calls = {"positions": 0, "orders": 0}
+
+    def positions(self):
+        self.calls["positions"] += 1
+        return {"net": [{"tradingsymbol": s, "quantity": q, "average_price": 100.0} for s, q in self.net.items()]}
+
+    def orders(self):
+        self.calls["orders"] += 1
+        return self.open_orders
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock(datetime(2026, 1, 5, 10, 0), speed=None)
+    previous = set_clock(clock)
+    yield clock
+    set_clock(previous)
+
+
+def test_matching_books_need_no_orders_call(clock):
+    book = PositionBook()
+    book.apply_fill("INFY", "BUY", 10, 100.0)
+    broker = BrokerView({"INFY": 10, "TCS": 0})
+
+    assert Reconciler(lambda: broker, book).reconcile() == {}
+    assert broker.calls == {"positions": 1, "orders": 0}
+
+
+def test_mismatch_raises_without_auto_correct(clock):
+    book = PositionBook()
+    book.apply_fill("INFY", "BUY", 10, 100.0)
+    seen = []
+    reconciler = Reconciler(lambda: BrokerView({"INFY": 4, "TCS": -3}), book, on_mismatch=seen.append)
+
+    with pytest.raises(PositionMismatch) as error:
+        reconciler.reconcile()
+
+    assert error.value.args[0] == {"INFY": (4, 10), "TCS": (-3, 0)}
+    assert seen == reconciler.mismatches == [error.value.args[0]]
+    assert book.qty("INFY") == 10
+
+
+def test_auto_correct_waits_for_in_flight_orders(clock):
+    book = PositionBook()
+    broker = BrokerView({"INFY": 10})
+    reconciler = Reconciler(lambda: broker, book, auto_correct=True, settle=30)
+    stream = OrderUpdateStream(book)
+
+    # The broker already shows the fill, the order update is still on its way
+    reconciler.notify_activity()
+    assert reconciler.reconcile() == {"INFY": (10, 0)}
+    assert book.qty("INFY") == 0
+
+    # Past the settle window an open non-stop order still defers correction
+    clock.sleep(60)
+    broker.open_orders = [{"order_id": "1", "tradingsymbol": "INFY", "status": "OPEN"}]
+    reconciler.reconcile()
+    assert book.qty("INFY") == 0
+
+    # The update lands: the fill is counted once and nothing is left to correct
+    stream.handle({"order_id": "1", "status": "COMPLETE", "tradingsymbol": "INFY",
+                   "transaction_type": "BUY", "filled_quantity": 10, "average_price": 100.0})
+    broker.open_orders = [{"order_id": "1", "tradingsymbol": "INFY", "status": "COMPLETE"}]
+    assert reconciler.reconcile() == {}
+    assert book.qty("INFY") == 10
+
+
+def test_auto_correct_once_settled_ignores_resting_stops(clock):
+    book = PositionBook()
+    book.apply_fill("INFY", "BUY", 10, 100.0)
+    book.apply_fill("INFY", "SELL", 4, 110.0)
+    broker = BrokerView({"INFY": 4}, [{"order_id": "9", "tradingsymbol": "INFY", "status": "TRIGGER PENDING"}])
+    reconciler = Reconciler(lambda: broker, book, auto_correct=True)
+
+    assert reconciler.reconcile() == {"INFY": (4, 6)}
+    assert book.get("INFY") == {"qty": 4, "avg_price": 100.0, "realized": 40.0}
+    assert reconciler.reconcile() == {}
+
+
+def test_corrections_reach_the_portfolio_without_fees(clock):
+    book = PositionBook()
+    book.apply_fill("INFY", "BUY", 10, 90.0)
+    portfolio = Portfolio(100000)
+    portfolio.fill("INFY", "BUY", 10, 90.0)
+    fees = portfolio.snapshot.fees
+    broker = BrokerView({"INFY": 4, "TCS": -3})
+    reconciler = Reconciler(lambda: broker, book, auto_correct=True, on_correction=portfolio.set_position)
+
+    reconciler.reconcile()
+
+    for symbol in ("INFY", "TCS"):
+        assert portfolio.position(symbol)["qty"] == book.qty(symbol)
+        assert portfolio.position(symbol)["avg_price"] == book.get(symbol)["avg_price"] == 100.0
+    assert portfolio.snapshot.fees == fees
+    assert portfolio.snapshot.realized == 0
+
+
+def test_polls_back_off_on_the_active_clock(clock):
+    broker = BrokerView()
+    reconciler = Reconciler(lambda: broker, PositionBook(), min_interval=10, max_interval=40)
+    polls = []
+
+    for _ in range(12):
+        if reconciler.maybe_reconcile() is not None:
+            polls.append(clock.time())
+        clock.sleep(10)
+
+    start = datetime(2026, 1, 5, 10, 0)
+    assert [datetime.fromtimestamp(t) - start for t in polls] == [
+        timedelta(seconds=s) for s in (0, 10, 30, 70, 110)]
+
+    reconciler.notify_activity()
+    assert reconciler.next_poll == clock.time() + 10
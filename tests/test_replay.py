@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+End-to-end replay tests for the live loop.
+
+Records a synthetic trading day through main.run on a virtual clock, then
+replays the recording and checks that the loop reproduces the same orders
+and positions without touching the network.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from auth.session import IST, SessionExpired
+from data import market_data
+from data.replay import RecordingKite, ReplaySession, replay_session
+from execution import orders
+from utils.clock import VirtualClock, get_clock, set_clock
+
+
+SESSION_START = datetime(2026, 1, 5, 9, 15, tzinfo=IST)
+
+
+class SyntheticKite:
+    """Broker stand-in that serves a seeded random walk of 5 minute candles."""
+
+    def __init__(self, seed=7, days=30):
+        rng = np.random.default_rng(seed)
+        start = SESSION_START - timedelta(days=days)
+        steps = int((days + 1) * 24 * 12)
+        closes = 2500 + np.cumsum(rng.normal(0, 4, steps))
+
+        self.candles = [
+            {
+                'date': start + timedelta(minutes=5 * i),
+                'open': float(c),
+                'high': float(c) + 2,
+                'low': float(c) - 2,
+                'close': float(c),
+                'volume': 1000,
+            }
+            for i, c in enumerate(closes)
+        ]
+        self.order_id = 0
+
+    def historical_data(self, token, from_dt, to_dt, interval):
+        return [c for c in self.candles if from_dt <= c['date'] <= to_dt]
+
+    def ltp(self, key):
+        now = get_clock().now()
+        last = [c for c in self.candles if c['date'] <= now][-1]
+        return {key: {'last_price': last['close']}}
+
+    def quote(self, keys):
+        price = self.ltp(keys[0])[keys[0]]['last_price']
+        depth = {
+            'buy': [{'price': price - 0.05, 'quantity': 100, 'orders': 1}] * 5,
+            'sell': [{'price': price + 0.05, 'quantity': 100, 'orders': 1}] * 5,
+        }
+        return {key: {'last_price': price, 'volume': 1000, 'oi': 0, 'depth': depth} for key in keys}
+
+    def place_order(self, **kwargs):
+        self.order_id += 1
+        return str(self.order_id)
+
+    def cancel_order(self, variety, order_id):
+        return order_id
+
+
+def record_session(path, cycles=20):
+    previous_clock = set_clock(VirtualClock(SESSION_START, speed=None))
+    recorder = RecordingKite(SyntheticKite(), path)
+    previous_client = market_data.set_client(recorder)
+
+    try:
+        return main.run(max_cycles=cycles, snapshot_path=None, session=ReplaySession(), background=False,
+                        events_path=None)
+    finally:
+        recorder.close()
+        market_data.set_client(previous_client)
+        set_clock(previous_clock)
+
+
+def test_replay_reproduces_recorded_session(tmp_path, monkeypatch):
+    monkeypatch.setattr(orders, "MODE", "LIVE")
+    monkeypatch.setattr(main, "MODE", "LIVE")
+    path = str(tmp_path / "session.jsonl")
+
+    recorded_book = record_session(path)
+    client, clock, book = replay_session(path, speed=None)
+
+    assert book.to_dict() == recorded_book.to_dict()
+    assert client.remaining("historical_data") == 0
+    assert client.remaining("place_order") == 0
+    assert len(clock.cycle_latencies) == 20
+
+
+def test_replay_is_deterministic(tmp_path, monkeypatch):
+    monkeypatch.setattr(orders, "MODE", "LIVE")
+    monkeypatch.setattr(main, "MODE", "LIVE")
+    path = str(tmp_path / "session.jsonl")
+    record_session(path)
+
+    first = replay_session(path, speed=None)
+    second = replay_session(path, speed=None)
+
+    assert first[0].orders == second[0].orders
+    assert first[2].to_dict() == second[2].to_dict()
+
+
+def test_replay_runs_faster_than_real_time(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    record_session(path, cycles=5)
+
+    _, clock, _ = replay_session(path, speed=1000)
+
+    # 5 cycles of 5 minutes each replayed in well under a few seconds
+    assert clock.now() - SESSION_START == timedelta(minutes=25)
+    assert sum(clock.sleeps) / 1000 < 2
+
+
+class ExpiredSession:
+    def __init__(self):
+        self.checks = 0
+
+    def ensure_valid(self, client=None):
+        self.checks += 1
+        raise SessionExpired("Access token expired and no refresh callback is configured")
+
+    def invalidate(self):
+        pass
+
+
+def test_expired_headless_session_stops_the_loop(monkeypatch):
+    previous_clock = set_clock(VirtualClock(SESSION_START, speed=None))
+    previous_client = market_data.set_client(SyntheticKite())
+    session = ExpiredSession()
+
+    try:
+        main.run(max_cycles=5, snapshot_path=None, session=session, background=False, events_path=None)
+    finally:
+        market_data.set_client(previous_client)
+        clock = set_clock(previous_clock)
+
+    assert session.checks == 1
+    assert clock.sleeps == []
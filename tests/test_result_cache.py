@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Backtest result cache tests.
+"""
+
+import sys
+import os
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backtest_mock import MockBacktestEngine
+from utils.result_cache import ResultCache
+
+
+def test_unchanged_backtest_is_loaded_from_cache(tmp_path):
+    cache = ResultCache(str(tmp_path))
+
+    first = MockBacktestEngine(num_candles=200, verbose=False, cache=cache)
+    metrics = first.run_backtest()
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    second = MockBacktestEngine(num_candles=200, verbose=False, cache=cache)
+    assert second.run_backtest() == metrics
+    assert second.trades == first.trades
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Different data (and a different symbol) are new keys
+    MockBacktestEngine(num_candles=150, verbose=False, cache=cache).run_backtest()
+    MockBacktestEngine("INFY", num_candles=200, verbose=False, cache=cache).run_backtest()
+    assert cache.misses == 3
+
+
+def test_code_change_invalidates_key(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    candles = [{'date': i, 'close': 100.0 + i} for i in range(10)]
+
+    assert cache.key(candles, {'p': 1}, "code-a") == cache.key(candles, {'p': 1}, "code-a")
+    assert cache.key(candles, {'p': 1}, "code-a") != cache.key(candles, {'p': 1}, "code-b")
+    assert cache.key(candles, {'p': 1}, "code-a") != cache.key(candles, {'p': 2}, "code-a")
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=35_000)
+    blob = b"x" * 10_000
+
+    for key in ("a1", "b2", "c3"):
+        cache.put(key, blob)
+        os.utime(cache._file(key), (0, {"a1": 1, "b2": 2, "c3": 3}[key]))
+    cache.get("a1")   # refreshes a1, so b2 is now the oldest
+    cache.put("d4", blob)
+
+    assert cache.get("b2") is None
+    assert cache.get("a1") == blob and cache.get("d4") == blob
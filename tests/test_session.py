@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Session manager tests against a local auth stand-in.
+
+No network or Kite credentials are needed: LocalAuthStandIn plays the
+part of the Kite client's session endpoints.
+"""
+
+import sys
+import os
+import multiprocessing
+import stat
+from datetime import datetime, timezone
+
+import pytest
+from kiteconnect.exceptions import TokenException
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth.session import IST, SessionError, SessionExpired, SessionManager, next_expiry
+from utils.clock import VirtualClock, get_clock, set_clock
+
+
+class LocalAuthStandIn:
+    """Stands in for KiteConnect's generate_session/set_access_token."""
+
+    def __init__(self, rejected=()):
+        self.sessions = 0
+        self.access_token = None
+        self.rejected = set(rejected)
+        self.profiles = 0
+
+    def generate_session(self, request_token, api_secret=None):
+        self.sessions += 1
+        return {"access_token": f"access-{request_token}-{self.sessions}", "user_id": "AB1234"}
+
+    def set_access_token(self, access_token):
+        self.access_token = access_token
+
+    def profile(self):
+        self.profiles += 1
+        if self.access_token in self.rejected:
+            raise TokenException("Incorrect `api_key` or `access_token`.")
+        return {"user_id": "AB1234"}
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock(datetime(2026, 1, 5, 8, 0, tzinfo=IST), speed=None)
+    previous = set_clock(clock)
+    yield clock
+    set_clock(previous)
+
+
+def test_next_expiry_is_next_six_am_ist():
+    assert next_expiry(datetime(2026, 1, 5, 8, 0, tzinfo=IST)) == datetime(2026, 1, 6, 6, 0, tzinfo=IST)
+    assert next_expiry(datetime(2026, 1, 5, 5, 0, tzinfo=IST)) == datetime(2026, 1, 5, 6, 0, tzinfo=IST)
+
+    # 23:00 UTC is already 04:30 IST the next day, so expiry is 90 minutes away
+    late_utc = datetime(2026, 1, 5, 23, 0, tzinfo=timezone.utc)
+    assert next_expiry(late_utc) == datetime(2026, 1, 6, 6, 0, tzinfo=IST)
+
+
+def test_expiry_holds_on_a_utc_clock(tmp_path):
+    previous = set_clock(VirtualClock(datetime(2026, 1, 5, 2, 30, tzinfo=timezone.utc), speed=None))
+
+    try:
+        session = SessionManager("key", "secret", refresh=lambda: "req", client=LocalAuthStandIn(),
+                                 path=str(tmp_path / "session.json"))
+        session.refresh()
+        assert session.expires_at() == datetime(2026, 1, 6, 6, 0, tzinfo=IST)
+
+        # 00:15 UTC is 05:45 IST, inside the refresh margin
+        get_clock().current = datetime(2026, 1, 6, 0, 15, tzinfo=timezone.utc)
+        assert not session.is_valid()
+    finally:
+        set_clock(previous)
+
+
+def test_seed_token_is_verified_once_then_used_until_expiry(tmp_path, clock):
+    client = LocalAuthStandIn()
+    session = SessionManager("key", "secret", client=client,
+                             path=str(tmp_path / "session.json"), seed_token="seed")
+
+    assert session.ensure_valid() == "seed"
+    assert session.ensure_valid() == "seed"
+    assert client.access_token == "seed"
+    assert (client.sessions, client.profiles) == (0, 1)
+    assert not os.path.exists(tmp_path / "session.json")
+
+
+def test_rejected_seed_token_is_refreshed(tmp_path, clock):
+    client = LocalAuthStandIn(rejected={"seed"})
+    session = SessionManager("key", "secret", refresh=lambda: "req", client=client,
+                             path=str(tmp_path / "session.json"), seed_token="seed")
+
+    assert session.ensure_valid() == "access-req-1"
+    assert client.access_token == "access-req-1"
+
+
+def test_rejected_seed_token_without_callback_is_expired(tmp_path, clock):
+    session = SessionManager("key", "secret", client=LocalAuthStandIn(rejected={"seed"}),
+                             path=str(tmp_path / "session.json"), seed_token="seed")
+
+    with pytest.raises(SessionExpired):
+        session.ensure_valid()
+
+
+def test_refreshes_before_expiry_and_stores_privately(tmp_path, clock):
+    client = LocalAuthStandIn()
+    path = str(tmp_path / "session.json")
+    session = SessionManager("key", "secret", refresh=lambda: "req", client=client,
+                             path=path, seed_token="seed")
+
+    clock.current = datetime(2026, 1, 6, 5, 45, tzinfo=IST)   # inside the 30 minute margin
+
+    assert session.ensure_valid() == "access-req-1"
+    assert client.access_token == "access-req-1"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_other_managers_pick_up_refreshed_token(tmp_path, clock):
+    path = str(tmp_path / "session.json")
+    first_client, second_client = LocalAuthStandIn(), LocalAuthStandIn()
+
+    first = SessionManager("key", "secret", refresh=lambda: "req", client=first_client, path=path)
+    second = SessionManager("key", "secret", refresh=lambda: "other", client=second_client, path=path)
+
+    first.refresh()
+
+    assert second.ensure_valid() == "access-req-1"
+    assert second_client.sessions == 0
+
+
+def test_invalidated_token_without_callback_raises(tmp_path, clock):
+    session = SessionManager("key", "secret", client=LocalAuthStandIn(),
+                             path=str(tmp_path / "session.json"), seed_token="seed")
+    session.invalidate()
+
+    with pytest.raises(SessionError):
+        session.ensure_valid()
+
+
+def _count_refresh(counter_path):
+    with open(counter_path, "a") as f:
+        f.write("x")
+    return {"access_token": "shared"}
+
+
+def _worker(path, counter_path):
+    from functools import partial
+
+    session = SessionManager("key", "secret", refresh=partial(_count_refresh, counter_path),
+                             client=LocalAuthStandIn(), path=path)
+    session.ensure_valid()
+
+
+def test_one_refresh_shared_by_worker_processes(tmp_path):
+    path = str(tmp_path / "session.json")
+    counter = str(tmp_path / "refreshes")
+
+    workers = [multiprocessing.Process(target=_worker, args=(path, counter)) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert open(counter).read() == "x"
+    assert SessionManager("key", "secret", path=path).access_token == "shared"
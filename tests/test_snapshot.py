@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Snapshot tests: atomic save/load round trips and rejected snapshots.
+"""
+
+import sys
+import os
+import pickle
+from datetime import datetime
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.snapshot import load_snapshot, save_snapshot
+from execution.positions import PositionBook
+
+
+def state():
+    book = PositionBook()
+    book.apply_fill("INFY", "BUY", 10, 1500.0)
+    book.apply_fill("INFY", "SELL", 4, 1510.0)
+    return {
+        "symbol": "INFY",
+        "candles": [{"date": datetime(2026, 1, 5, 9, 15), "close": 1500.0}],
+        "positions": book.to_dict(),
+        "stops": {"INFY": "42"},
+        "scheduler": {"cycle": 3, "last_cycle_at": 1.0},
+    }
+
+
+def test_round_trip_restores_state_and_book(tmp_path):
+    path = str(tmp_path / "state.pkl")
+
+    assert save_snapshot(state(), path)
+    restored = load_snapshot(path)
+
+    assert restored == state()
+    book = PositionBook.from_dict(restored["positions"])
+    assert book.get("INFY") == {"qty": 6, "avg_price": 1500.0, "realized": 40.0}
+    # No temporary files are left behind
+    assert os.listdir(tmp_path) == ["state.pkl"]
+
+
+def test_stale_missing_corrupt_and_old_version_snapshots_are_ignored(tmp_path):
+    path = str(tmp_path / "state.pkl")
+    assert load_snapshot(path) is None
+
+    save_snapshot(state(), path)
+    assert load_snapshot(path, max_age=-1) is None
+
+    with open(path, "wb") as f:
+        pickle.dump({"version": 0, "saved_at": 0, "state": {}}, f)
+    assert load_snapshot(path) is None
+
+    with open(path, "wb") as f:
+        f.write(b"not a pickle")
+    assert load_snapshot(path) is None
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Intraday session guard tests: entry cutoff and end-of-day square-off.
+"""
+
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from auth.session import IST
+from execution.order_updates import OrderUpdateStream
+from execution.positions import PositionBook
+from risk.session import SessionGuard
+
+
+DAY = datetime(2026, 1, 5, tzinfo=IST)
+
+
+def at(hour, minute):
+    return DAY.replace(hour=hour, minute=minute)
+
+
+def test_entries_blocked_after_cutoff_but_exits_allowed():
+    guard = SessionGuard()
+
+    assert guard.allowed_qty(at(10, 0), "BUY", 50, 0) == 50
+    assert guard.allowed_qty(at(15, 5), "BUY", 50, 0) == 0
+    assert guard.allowed_qty(at(15, 5), "BUY", 50, 20) == 0
+    # An exit may not flip the position
+    assert guard.allowed_qty(at(15, 5), "SELL", 50, 20) == 20
+    assert guard.allowed_qty(at(15, 5), "BUY", 50, -30) == 30
+
+
+def test_square_off_flattens_largest_exposure_first_once_per_day():
+    guard = SessionGuard(orders_per_second=1000)
+    sent, cancelled = [], []
+
+    def place(side, qty, symbol):
+        sent.append((symbol, side, qty))
+        return f"ORD-{symbol}"
+
+    now = at(15, 10)
+    assert guard.should_square_off(now)
+
+    exits = guard.square_off(
+        now,
+        {"INFY": 10, "TCS": -40, "SBIN": 0},
+        {"INFY": 1500.0, "TCS": 3500.0, "SBIN": 600.0},
+        place=place, cancel=cancelled.append, open_orders=["SL-1"],
+    )
+
+    assert cancelled == ["SL-1"]
+    assert sent == [("TCS", "BUY", 40), ("INFY", "SELL", 10)]
+    assert [e[3] for e in exits] == ["ORD-TCS", "ORD-INFY"]
+
+    assert not guard.should_square_off(at(15, 15))
+    assert guard.allowed_qty(at(15, 15), "SELL", 10, 10) == 0
+    assert guard.should_square_off(DAY.replace(day=6, hour=15, minute=10))
+
+
+def test_session_times_are_ist_on_a_utc_host():
+    guard = SessionGuard()
+    utc = lambda hour, minute: datetime(2026, 1, 5, hour, minute, tzinfo=timezone.utc)
+
+    # 04:30 UTC is 10:00 IST, 09:35 UTC is 15:05 IST, 09:40 UTC is 15:10 IST
+    assert guard.allowed_qty(utc(4, 30), "BUY", 50, 0) == 50
+    assert guard.allowed_qty(utc(9, 35), "BUY", 50, 0) == 0
+    assert not guard.should_square_off(utc(9, 35))
+    assert guard.next_sleep(utc(9, 38), 300) == 120
+    assert guard.should_square_off(utc(9, 40))
+
+
+def test_next_sleep_wakes_for_square_off():
+    guard = SessionGuard()
+
+    assert guard.next_sleep(at(10, 0), 300) == 300
+    assert guard.next_sleep(at(15, 8), 300) == 120
+    assert guard.next_sleep(at(15, 12), 300) == 300
+
+
+def test_forced_exits_are_booked_at_the_current_price(monkeypatch):
+    sent, cancelled = [], []
+    monkeypatch.setattr(main, "place_order", lambda side, qty, symbol: sent.append((symbol, side, qty)) or str(len(sent)))
+    monkeypatch.setattr(main, "cancel_order", cancelled.append)
+
+    book = PositionBook()
+    book.apply_fill("INFY", "BUY", 10, 100.0)
+    book.apply_fill("TCS", "SELL", 5, 200.0)
+    stops = {"INFY": "SL-1"}
+
+    main.square_off(SessionGuard(orders_per_second=1000), at(15, 10), book, stops, OrderUpdateStream(book),
+                    last_price={"INFY": 110.0}.get)
+
+    # INFY ranks by its current exposure; TCS has no price and falls back to its entry
+    assert sent == [("INFY", "SELL", 10), ("TCS", "BUY", 5)]
+    assert cancelled == ["SL-1"] and stops == {}
+    assert book.open_positions() == {}
+    assert book.get("INFY")["realized"] == 100.0
+    assert book.get("TCS")["realized"] == 0.0
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Supervisor tests: the default order handler, worker restarts and
+rebalancing a crashing worker's shard.
+"""
+
+import sys
+import os
+import queue
+from datetime import datetime
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth.session import IST
+from data import instruments, market_data
+from data.instruments import InstrumentMaster
+from execution import orders
+from execution.order_queue import STOP, OrderQueue
+from execution.positions import PositionBook
+from risk.portfolio import Portfolio
+from risk.session import SessionGuard
+from runner.supervisor import (
+    Supervisor, compute_decisions, order_handler, order_main, restore_orders, save_orders, square_off_book,
+)
+from utils.clock import VirtualClock, set_clock
+from utils.ratelimit import RateLimiter
+
+
+def decision(signal, price=100.0, symbol="INFY"):
+    return {"symbol": symbol, "signal": signal, "price": price}
+
+
+def test_handler_replaces_the_stop_and_closes_held_positions(broker):
+    book, stops = PositionBook(), {}
+    handle = order_handler(book, Portfolio(50000, ["INFY"]), stops)
+
+    handle(decision("BUY"))
+    assert book.qty("INFY") == 250
+    assert [(o["order_type"], o["transaction_type"], o["quantity"]) for o in broker.placed] == [
+        ("MARKET", "BUY", 250), ("SL-M", "SELL", 250)]
+    assert stops == {"INFY": "2"}
+
+    # Already long: a second BUY is not sized as a fresh entry
+    handle(decision("BUY", 101.0))
+    assert len(broker.placed) == 2
+
+    # SELL closes exactly the held quantity and cancels the stop without a new one
+    handle(decision("SELL", 102.0))
+    assert book.qty("INFY") == 0
+    assert broker.placed[-1]["quantity"] == 250
+    assert broker.cancelled == ["2"]
+    assert stops == {}
+
+
+def test_handler_books_nothing_when_the_order_is_rejected(broker):
+    book, stops = PositionBook(), {}
+    portfolio = Portfolio(50000, ["INFY"])
+    handle = order_handler(book, portfolio, stops)
+
+    broker.reject = True
+    handle(decision("BUY"))
+
+    assert book.qty("INFY") == 0
+    assert portfolio.position("INFY")["qty"] == 0
+    assert stops == {}
+
+
+def test_handler_queues_stops_ahead_of_entries(broker):
+    book, stops = PositionBook(), {}
+    queued = OrderQueue(limiter=RateLimiter(1000))
+    handle = order_handler(book, Portfolio(50000, ["INFY", "TCS"]), stops, queued)
+    queued.push("TCS", "BUY", 0, 500.0, strength=10.0, payload=decision("BUY", 500.0, "TCS"))
+
+    handle(decision("BUY"))
+    assert [o["order_type"] for o in broker.placed] == ["MARKET"]
+
+    # The INFY stop leaves before the stronger TCS entry that was waiting
+    queued.drain(lambda order: handle(order.payload), max_orders=1)
+    assert [(o["order_type"], o["tradingsymbol"]) for o in broker.placed] == [
+        ("MARKET", "INFY"), ("SL-M", "INFY")]
+    assert stops == {"INFY": "2"}
+
+    # Closing the position queues the cancel the same way
+    handle(decision("SELL", 102.0))
+    order = queued.pop()
+    assert (order.kind, order.symbol) == (STOP, "INFY")
+    handle(order.payload)
+    assert broker.cancelled == ["2"] and stops == {}
+
+
+def test_guard_blocks_late_entries_and_squares_off_the_book(broker):
+    previous = set_clock(VirtualClock(datetime(2026, 1, 5, 15, 5, tzinfo=IST), speed=None))
+    try:
+        book, stops = PositionBook(), {"INFY": "SL-1"}
+        portfolio = Portfolio(50000, ["INFY", "TCS"])
+        guard = SessionGuard(orders_per_second=1000)
+        book.apply_fill("INFY", "BUY", 10, 100.0)
+        portfolio.fill("INFY", "BUY", 10, 100.0)
+        handle = order_handler(book, portfolio, stops, guard=guard)
+
+        # After the cutoff a fresh entry is refused, an exit is not
+        handle(decision("BUY", 500.0, "TCS"))
+        assert broker.placed == [] and book.qty("TCS") == 0
+
+        now = datetime(2026, 1, 5, 15, 10, tzinfo=IST)
+        assert guard.should_square_off(now)
+        exits = square_off_book(guard, now, book, portfolio, stops, {"INFY": 105.0}.get)
+
+        assert [e[:3] for e in exits] == [("INFY", "SELL", 10)]
+        assert broker.cancelled == ["SL-1"] and stops == {}
+        assert book.quantities() == {} and portfolio.position("INFY")["qty"] == 0
+        assert book.get("INFY")["realized"] == 50.0
+    finally:
+        set_clock(previous)
+
+
+class HeldPositions:
+    def __init__(self, positions):
+        self.net = positions
+
+    def positions(self):
+        return {"net": [{"tradingsymbol": s, "quantity": q, "average_price": 101.0} for s, q in self.net.items()]}
+
+    def orders(self):
+        return []
+
+
+def test_restarted_order_process_resumes_and_reconciles_its_positions(monkeypatch, tmp_path):
+    path = str(tmp_path / "orders_state.pkl")
+    book, stops, portfolio = PositionBook(), {"INFY": "7"}, Portfolio(50000, ["INFY"])
+    book.apply_fill("INFY", "BUY", 10, 100.0)
+    portfolio.fill("INFY", "BUY", 10, 100.0)
+    save_orders(path, book, stops, portfolio)
+
+    monkeypatch.setattr(orders, "broker", lambda: HeldPositions({"INFY": 10}))
+    book, stops, portfolio, _ = restore_orders(path, 50000)
+
+    assert book.qty("INFY") == 10
+    assert stops == {"INFY": "7"}
+    assert portfolio.position("INFY")["qty"] == 10
+    assert portfolio.position("INFY")["fees"] > 0
+
+    # Without a snapshot the broker's positions are adopted before trading
+    monkeypatch.setattr(orders, "broker", lambda: HeldPositions({"TCS": 5}))
+    book, stops, portfolio, _ = restore_orders(str(tmp_path / "missing.pkl"), 50000)
+
+    assert book.quantities() == {"TCS": 5}
+    assert portfolio.position("TCS")["qty"] == 5
+
+
+def test_order_process_ranks_new_decisions_between_orders(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    decisions = queue.Queue()
+    handled = []
+
+    def handle(decision):
+        handled.append(decision["symbol"])
+        if decision["symbol"] == "A":
+            # Arrives while B and C wait, and outranks them
+            decisions.put({"symbol": "D", "signal": "BUY", "price": 10.0, "strength": 100.0})
+        if len(handled) == 4:
+            decisions.put(None)
+
+    for symbol, strength in (("A", 10.0), ("B", 2.0), ("C", 1.0)):
+        decisions.put({"symbol": symbol, "signal": "BUY", "price": 10.0, "strength": strength})
+
+    order_main(decisions, handle=handle, connect=None)
+
+    assert handled == ["A", "D", "B", "C"]
+
+
+class TokenRecordingKite:
+    def __init__(self):
+        self.tokens = []
+
+    def historical_data(self, token, from_dt, to_dt, interval):
+        self.tokens.append(token)
+        return []
+
+    def quote(self, keys):
+        return {}
+
+    def ltp(self, key):
+        return {}
+
+
+def test_workers_skip_symbols_without_their_own_token(monkeypatch):
+    kite = TokenRecordingKite()
+    monkeypatch.setattr(market_data, "kite", kite)
+    monkeypatch.setattr(instruments, "_master", InstrumentMaster.from_rows([
+        {"instrument_token": 408065, "tradingsymbol": "INFY", "exchange": "NSE", "segment": "NSE",
+         "tick_size": 0.05, "lot_size": 1},
+    ]))
+
+    assert compute_decisions(["INFY", "UNLISTED"], {}) == []
+    assert kite.tokens == [408065]
+
+
+def report_then_crash(symbols, buffers, quality, depth_book):
+    """Report the shard once, then crash the worker process on its next cycle."""
+
+    if buffers.get("reported"):
+        raise SystemExit(1)
+    buffers["reported"] = True
+    return [{"symbols": list(symbols)}]
+
+
+def reports(supervisor, n):
+    return sorted((d["worker"], d["symbols"]) for d in (supervisor.decisions.get(timeout=10) for _ in range(n)))
+
+
+def test_crashed_workers_restart_with_their_shard_then_get_rebalanced():
+    supervisor = Supervisor(["A", "B", "C", "D"], workers=2, interval=0.05, max_restarts=1,
+                            compute=report_then_crash, connect=None)
+    shards = [list(s) for s in supervisor.shards]
+
+    try:
+        for worker_id in range(2):
+            supervisor._start_worker(worker_id)
+        first = reports(supervisor, 2)
+
+        for process in supervisor.workers.values():
+            process.join(10)
+        supervisor.check()
+
+        # Each worker crashed once: restarted on the same shard
+        assert supervisor.n_workers == 2
+        assert reports(supervisor, 2) == first == [(0, shards[0]), (1, shards[1])]
+
+        for process in supervisor.workers.values():
+            process.join(10)
+        supervisor.check()
+
+        # A second crash inside the window spreads the universe over fewer workers
+        assert supervisor.n_workers == 1
+        assert reports(supervisor, 1) == [(0, ["A", "B", "C", "D"])]
+    finally:
+        supervisor.stop_workers()
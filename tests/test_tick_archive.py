@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tick archive tests: encoding round trips, block index and range scans.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data.tick_archive import (
+    TickArchive, TickArchiveWriter, day_path, decode_column, encode_column, read_index,
+    ticks_to_candles,
+)
+
+
+OPEN = datetime(2026, 1, 5, 9, 15)
+
+
+def write_ticks(root, days=2, per_day=1000, block_ticks=256):
+    writer = TickArchiveWriter(root, block_ticks=block_ticks)
+    rng = np.random.default_rng(3)
+    expected = {"INFY": [], "TCS": []}
+
+    for day in range(days):
+        start = OPEN + timedelta(days=day)
+        for i in range(per_day):
+            ts = start + timedelta(seconds=i)
+            for symbol, base in (("INFY", 1500.0), ("TCS", 3500.0)):
+                price = round(base + rng.integers(-20, 21) * 0.05, 2)
+                writer.append(symbol, ts, price, qty=int(rng.integers(1, 100)), volume=i)
+                expected[symbol].append((ts, price))
+
+    writer.close()
+    return expected
+
+
+def test_column_round_trip_with_negative_and_large_deltas():
+    values = np.array([0, 5, -3, 2**40, -2**40, 7, 7, 7], dtype=np.int64)
+    raw = encode_column(values)
+
+    assert (decode_column(raw, len(values)) == values).all()
+    # Small deltas take one byte each
+    assert len(encode_column(np.arange(1000) + 150000)) < 1010
+
+
+def test_range_scan_reads_only_overlapping_ticks(tmp_path):
+    expected = write_ticks(str(tmp_path))
+    archive = TickArchive(str(tmp_path))
+
+    assert len(archive.days()) == 2
+    assert archive.symbols(archive.days()[0]) == ["INFY", "TCS"]
+
+    start, end = OPEN + timedelta(seconds=100), OPEN + timedelta(seconds=399)
+    ticks = archive.read("INFY", start, end)
+    want = [p for ts, p in expected["INFY"] if start <= ts <= end]
+
+    assert len(ticks["ts"]) == 300
+    assert np.allclose(ticks["price"], want)
+
+
+def test_missing_index_falls_back_to_block_headers(tmp_path):
+    write_ticks(str(tmp_path), days=1)
+    path = day_path(str(tmp_path), OPEN.date())
+    index = read_index(path)
+
+    # A writer that died mid-day: no footer, last block missing
+    with open(path, "r+b") as f:
+        f.truncate(index[-1]["offset"])
+
+    assert read_index(path) == index[:-1]
+
+
+def test_replay_merges_symbols_in_time_order(tmp_path):
+    write_ticks(str(tmp_path), days=1, per_day=50)
+    rows = list(TickArchive(str(tmp_path)).replay(["INFY", "TCS"]))
+
+    assert len(rows) == 100
+    assert [r[1] for r in rows] == sorted(r[1] for r in rows)
+    assert rows[0][0] == "INFY" and rows[1][0] == "TCS"
+
+
+def test_backtest_engine_consumes_ticks(tmp_path, monkeypatch):
+    from backtest import BacktestEngine
+
+    write_ticks(str(tmp_path), days=1, per_day=900)
+    archive = TickArchive(str(tmp_path))
+    candles = ticks_to_candles(archive.read("INFY"))
+
+    assert len(candles) == 3
+    assert candles[0]['date'] == OPEN
+
+    class Now(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return OPEN + timedelta(days=1)
+
+    monkeypatch.setattr(sys.modules["backtest"], "datetime", Now)
+    engine = BacktestEngine("INFY", days=5, verbose=False, archive=archive)
+
+    assert engine.fetch_data()
+    assert engine.data == candles
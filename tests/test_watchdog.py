@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Watchdog tests: circuit breakers, call timeouts and stuck-loop restarts.
+"""
+
+import sys
+import os
+import time
+
+import pytest
+
+# Add project root to path (go up one level from tests folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kiteconnect.exceptions import InputException, NetworkException
+
+from utils.watchdog import (
+    CallTimeout, CircuitBreaker, CircuitOpen, GuardedClient, Heartbeat, Watchdog, read_heartbeat,
+)
+
+
+class FlakyClient:
+    def __init__(self):
+        self.calls = 0
+        self.fail = True
+
+    def ltp(self, key):
+        self.calls += 1
+        if self.fail:
+            raise NetworkException("gateway timeout")
+        return {key: {"last_price": 100.0}}
+
+    def order_history(self, order_id):
+        raise InputException("bad order id")
+
+    def place_order(self, **kwargs):
+        self.calls += 1
+        time.sleep(0.1)
+        raise NetworkException("gateway timeout")
+
+    def quote(self, keys):
+        time.sleep(1)
+
+    def set_access_token(self, token):
+        self.token = token
+
+
+def test_breaker_opens_then_half_open_probe_closes_it():
+    client = FlakyClient()
+    guarded = GuardedClient(client, failure_threshold=3, reset_timeout=0.05)
+
+    for _ in range(3):
+        with pytest.raises(NetworkException):
+            guarded.ltp("NSE:INFY")
+    with pytest.raises(CircuitOpen):
+        guarded.ltp("NSE:INFY")
+    assert client.calls == 3
+
+    # Failed probe re-opens with a longer cool-down
+    time.sleep(0.06)
+    with pytest.raises(NetworkException):
+        guarded.ltp("NSE:INFY")
+    assert guarded.breakers["ltp"].reset_timeout == pytest.approx(0.1)
+
+    time.sleep(0.11)
+    client.fail = False
+    assert guarded.ltp("NSE:INFY")["NSE:INFY"]["last_price"] == 100.0
+    assert guarded.breakers["ltp"].state == CircuitBreaker.CLOSED
+
+
+def test_caller_errors_do_not_trip_and_other_calls_pass_through():
+    client = FlakyClient()
+    guarded = GuardedClient(client, failure_threshold=1)
+
+    for _ in range(3):
+        with pytest.raises(InputException):
+            guarded.order_history("x")
+
+    assert guarded.breakers["order_history"].state == CircuitBreaker.CLOSED
+    guarded.set_access_token("abc")
+    assert client.token == "abc"
+
+
+def test_hung_call_times_out():
+    guarded = GuardedClient(FlakyClient(), timeout=0.05)
+
+    started = time.monotonic()
+    with pytest.raises(CallTimeout):
+        guarded.quote(["NSE:INFY"])
+    assert time.monotonic() - started < 0.5
+    assert guarded.breakers["quote"].failures == 1
+
+
+def test_order_calls_are_never_abandoned_or_refused():
+    client = FlakyClient()
+    guarded = GuardedClient(client, timeout=0.01, failure_threshold=1)
+
+    # Slower than the timeout, failing every time: each call still runs to
+    # completion on the caller's thread, and the next one is still sent
+    for _ in range(3):
+        with pytest.raises(NetworkException):
+            guarded.place_order(quantity=1)
+
+    assert client.calls == 3
+    assert "place_order" not in guarded.breakers
+
+
+def hangs_after_one_beat(path):
+    Heartbeat(path).beat(0.1)
+    time.sleep(60)
+
+
+def test_watchdog_restarts_stuck_loop(tmp_path):
+    path = str(tmp_path / "heartbeat.json")
+    watchdog = Watchdog(lambda: hangs_after_one_beat(path), path, startup_grace=5, max_restarts=1)
+    watchdog.start()
+    first = watchdog.process.pid
+
+    deadline = time.time() + 5
+    while watchdog.restarts == 0 and time.time() < deadline:
+        watchdog.check()
+        time.sleep(0.05)
+
+    assert watchdog.restarts == 1
+    assert watchdog.process.pid != first
+    watchdog.process.terminate()
+    assert read_heartbeat(path) is None or read_heartbeat(path)["pid"] != first
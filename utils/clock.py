@@ -0,0 +1,74 @@
+"""
+Clocks used by the live loop.
+
+Everything that reads the time or waits between cycles goes through the
+active clock, so the loop can run against wall time in production and
+against a virtual clock when replaying recorded sessions.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class SystemClock:
+    """Wall-clock time."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Simulated time that advances only when the loop sleeps.
+
+    Args:
+        start: Virtual start time
+        speed: Acceleration factor; sleeping N seconds waits N / speed real
+            seconds. None skips real waiting entirely.
+    """
+
+    def __init__(self, start: datetime, speed: Optional[float] = 1000):
+        self.current = start
+        self.speed = speed
+        self.sleeps = []
+        self.cycle_latencies = []
+        self._mark = time.perf_counter()
+
+    def now(self) -> datetime:
+        return self.current
+
+    def time(self) -> float:
+        return self.current.timestamp()
+
+    def sleep(self, seconds: float):
+        # Real time spent since the previous sleep is the cost of one cycle
+        self.cycle_latencies.append(time.perf_counter() - self._mark)
+        self.sleeps.append(seconds)
+
+        if self.speed:
+            time.sleep(seconds / self.speed)
+
+        self.current += timedelta(seconds=seconds)
+        self._mark = time.perf_counter()
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    """Return the active clock."""
+    return _clock
+
+
+def set_clock(clock):
+    """Install a clock and return the previous one."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
@@ -0,0 +1,220 @@
+"""
+Structured event log for trades and decisions.
+
+Events are small typed records that the hot path only has to build and
+enqueue; a background thread serialises them to newline-JSON in batches.
+The log level decides which event types are recorded at all, so disabled
+events cost a single integer comparison. Timestamps come from the active
+clock, so events written during a replay carry the replayed time.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import weakref
+from typing import Iterator, NamedTuple, Optional
+
+from utils.clock import get_clock
+
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "OFF": 100}
+
+
+class DecisionEvent(NamedTuple):
+    ts: float
+    symbol: str
+    signal: str
+    price: float
+    qty: int
+
+
+class OrderEvent(NamedTuple):
+    ts: float
+    symbol: str
+    side: str
+    qty: int
+    order_type: str
+    price: Optional[float]
+    order_id: Optional[str]
+
+
+class FillEvent(NamedTuple):
+    ts: float
+    symbol: str
+    side: str
+    qty: int
+    price: float
+    pnl: float
+
+
+class MetricEvent(NamedTuple):
+    ts: float
+    name: str
+    value: float
+
+
+class StatsEvent(NamedTuple):
+    ts: float
+    name: str
+    values: dict    # named numbers, e.g. counters or a portfolio snapshot
+
+
+EVENT_TYPES = {
+    "decision": (DecisionEvent, LEVELS["DEBUG"]),
+    "order": (OrderEvent, LEVELS["INFO"]),
+    "fill": (FillEvent, LEVELS["INFO"]),
+    "metric": (MetricEvent, LEVELS["INFO"]),
+    "stats": (StatsEvent, LEVELS["INFO"]),
+}
+
+_TYPE_NAMES = {cls: name for name, (cls, _) in EVENT_TYPES.items()}
+
+# Logs with a running writer, flushed by the one exit handler below
+_open_logs = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_logs():
+    for log in list(_open_logs):
+        log.close()
+
+
+class EventLog:
+    """
+    Asynchronous newline-JSON event writer.
+
+    Args:
+        path: Output file (appended to)
+        level: "DEBUG" records every event, "INFO" skips per-bar decisions,
+            "OFF" records nothing
+        batch_size: Maximum events written per flush
+    """
+
+    def __init__(self, path: str, level: str = "INFO", batch_size: int = 1000):
+        self.path = path
+        self.level = LEVELS[level]
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = None
+
+        if self.level < LEVELS["OFF"]:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._thread = threading.Thread(target=self._writer, name="event-log", daemon=True)
+            self._thread.start()
+            _open_logs.add(self)
+
+    def enabled(self, kind: str) -> bool:
+        return EVENT_TYPES[kind][1] >= self.level
+
+    def _emit(self, event):
+        if self._closed:
+            self.dropped += 1
+            return
+        self._queue.put(event)
+
+    def decision(self, symbol, signal, price, qty):
+        if LEVELS["DEBUG"] >= self.level:
+            self._emit(DecisionEvent(get_clock().time(), symbol, signal, price, qty))
+
+    def order(self, symbol, side, qty, order_type="MARKET", price=None, order_id=None):
+        if LEVELS["INFO"] >= self.level:
+            self._emit(OrderEvent(get_clock().time(), symbol, side, qty, order_type, price, order_id))
+
+    def fill(self, symbol, side, qty, price, pnl=0.0):
+        if LEVELS["INFO"] >= self.level:
+            self._emit(FillEvent(get_clock().time(), symbol, side, qty, price, pnl))
+
+    def metric(self, name, value):
+        if LEVELS["INFO"] >= self.level:
+            self._emit(MetricEvent(get_clock().time(), name, value))
+
+    def stats(self, name, values):
+        if LEVELS["INFO"] >= self.level:
+            self._emit(StatsEvent(get_clock().time(), name, dict(values)))
+
+    def _writer(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                event = self._queue.get()
+                if event is None:
+                    break
+
+                batch = [event]
+                stop = False
+
+                while len(batch) < self.batch_size:
+                    try:
+                        event = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if event is None:
+                        stop = True
+                        break
+                    batch.append(event)
+
+                f.write("".join(
+                    json.dumps({"type": _TYPE_NAMES[type(e)], **e._asdict()}, default=str) + "\n"
+                    for e in batch
+                ))
+                f.flush()
+
+                if stop:
+                    break
+
+    def close(self):
+        """Flush pending events and stop the writer thread."""
+        if self._closed or self._thread is None:
+            self._closed = True
+            return
+
+        self._closed = True
+        _open_logs.discard(self)
+        self._queue.put(None)
+        self._thread.join()
+
+
+class NullEventLog(EventLog):
+    """Event log that records nothing."""
+
+    def __init__(self):
+        super().__init__(os.devnull, level="OFF")
+
+
+def read_events(path: str, kind: Optional[str] = None, since: Optional[float] = None,
+                until: Optional[float] = None, **filters) -> Iterator[dict]:
+    """
+    Iterate over events written by EventLog.
+
+    Args:
+        path: Event file
+        kind: Only yield this event type ("decision", "order", "fill", "metric", "stats")
+        since: Only yield events at or after this Unix timestamp
+        until: Only yield events before this Unix timestamp
+        **filters: Field equality filters, e.g. symbol="RELIANCE"
+
+    Yields:
+        dict: One event per line, including its "type"
+    """
+
+    if not os.path.exists(path):
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if kind is not None and f'"type": "{kind}"' not in line:
+                continue
+
+            event = json.loads(line)
+
+            if since is not None and event["ts"] < since:
+                continue
+            if until is not None and event["ts"] >= until:
+                continue
+            if any(event.get(k) != v for k, v in filters.items()):
+                continue
+
+            yield event
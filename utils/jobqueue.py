@@ -0,0 +1,383 @@
+"""
+Job queue for distributing backtests over worker processes and machines.
+
+JobQueue keeps jobs in a SQLite file (WAL mode, so many local processes
+can share it). Jobs are identified by a hash of their payload, so
+submitting the same work twice is a no-op. A worker claims a job with a
+lease; if it dies, the lease expires and another worker picks the job up.
+Completing a job twice keeps the first result, so retries are
+idempotent.
+
+For workers on other machines, serve_queue() exposes the same operations
+over HTTP and RemoteJobQueue is a drop-in client for them. The server
+listens on localhost unless given a token, which every request must then
+carry; the client retries with backoff when the server is unreachable.
+run_worker() accepts either queue and renews its lease from a background
+thread while a job runs.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from loguru import logger
+
+
+QUEUE_PATH = "cache/jobs.sqlite"
+LEASE = 600
+MAX_ATTEMPTS = 3
+RETRIES = 6          # attempts per remote call before giving up
+BACKOFF = 1.0        # seconds before the first retry, doubled after each
+LOCALHOST = ("127.0.0.1", "localhost", "::1")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+"""
+
+
+def job_id(payload: dict) -> str:
+    """Content hash of a payload."""
+
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class JobQueue:
+    """
+    Args:
+        path: SQLite file shared by every local process
+        max_attempts: Claims per job before it is marked failed
+    """
+
+    def __init__(self, path: str = QUEUE_PATH, max_attempts: int = MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db().executescript(SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        # One connection per thread (and per process after a fork)
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def __getstate__(self):
+        # Connections stay in the process that opened them
+        return {"path": self.path, "max_attempts": self.max_attempts}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def submit(self, payload: dict) -> str:
+        """Queue a job unless the same payload is already known. Returns its id."""
+
+        jid = job_id(payload)
+        now = time.time()
+        self._db().execute(
+            "INSERT OR IGNORE INTO jobs (id, payload, created, updated) VALUES (?, ?, ?, ?)",
+            (jid, json.dumps(payload, default=str), now, now),
+        )
+        return jid
+
+    def submit_many(self, payloads: list) -> list:
+        db = self._db()
+        now = time.time()
+        rows = [(job_id(p), json.dumps(p, default=str), now, now) for p in payloads]
+        db.execute("BEGIN")
+        db.executemany("INSERT OR IGNORE INTO jobs (id, payload, created, updated) VALUES (?, ?, ?, ?)", rows)
+        db.execute("COMMIT")
+        return [r[0] for r in rows]
+
+    def claim(self, worker: str, lease: float = LEASE) -> Optional[tuple]:
+        """
+        Take the next queued job, or one whose lease expired.
+
+        Returns:
+            tuple: (job id, payload), or None when nothing is available
+        """
+
+        db = self._db()
+        now = time.time()
+
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that used up their attempts are failed for good
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired', updated = ? "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = db.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY created, id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (worker, now + lease, now, row[0]),
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+        return (row[0], json.loads(row[1])) if row else None
+
+    def extend(self, jid: str, worker: str, lease: float = LEASE) -> bool:
+        """Renew a lease for a long job. Returns False if the job is no longer ours."""
+
+        cur = self._db().execute(
+            "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + lease, time.time(), jid, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, jid: str, worker: str, result) -> bool:
+        """Store a result. The first completion wins; later ones are ignored."""
+
+        cur = self._db().execute(
+            "UPDATE jobs SET status = 'done', worker = ?, result = ?, error = NULL, updated = ? "
+            "WHERE id = ? AND status != 'done'",
+            (worker, json.dumps(result, default=str), time.time(), jid),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, jid: str, worker: str, error: str) -> bool:
+        """Record a failed attempt; the job is retried until max_attempts."""
+
+        cur = self._db().execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = ?, lease_until = NULL, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (self.max_attempts, error, time.time(), jid, worker),
+        )
+        return cur.rowcount == 1
+
+    def progress(self) -> dict:
+        """Job counts by status, plus the total."""
+
+        counts = dict(self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def results(self) -> dict:
+        """Results of finished jobs as {job id: (payload, result)}."""
+
+        rows = self._db().execute("SELECT id, payload, result FROM jobs WHERE status = 'done'").fetchall()
+        return {jid: (json.loads(payload), json.loads(result)) for jid, payload, result in rows}
+
+
+# Network transport
+
+OPERATIONS = ("submit", "submit_many", "claim", "extend", "complete", "fail", "progress", "results")
+
+
+def serve_queue(queue: JobQueue, host: str = "127.0.0.1", port: int = 8765,
+                token: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    Expose a JobQueue over HTTP: POST /<operation> with a JSON list of
+    arguments, answered with the JSON return value.
+
+    Args:
+        queue: The queue to serve
+        host: Interface to bind; anything but localhost needs a token
+        port: Port to listen on (0 picks a free one)
+        token: Shared secret every request must send as a Bearer token
+
+    Returns:
+        ThreadingHTTPServer: Running in a daemon thread; call shutdown() to stop
+    """
+
+    if token is None and host not in LOCALHOST:
+        raise ValueError(f"Serving the job queue on {host} needs a token")
+
+    expected = f"Bearer {token}".encode() if token is not None else None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if expected is not None and not hmac.compare_digest(
+                    self.headers.get("Authorization", "").encode(), expected):
+                self.send_response(401)
+                self.end_headers()
+                return
+
+            operation = self.path.strip("/")
+            if operation not in OPERATIONS:
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            try:
+                args = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or "[]")
+                body = json.dumps(getattr(queue, operation)(*args), default=str).encode()
+            except Exception as e:
+                logger.error(f"Job queue {operation} failed: {e}")
+                self.send_response(500)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="jobqueue", daemon=True).start()
+    return server
+
+
+class RemoteJobQueue:
+    """
+    Client for serve_queue() with the same methods as JobQueue.
+
+    Args:
+        url: Server address, e.g. http://host:8765
+        timeout: Seconds per request
+        token: The server's token
+        retries: Attempts per call while the server is unreachable or
+            answers with a server error
+        backoff: Seconds before the first retry, doubled after each
+    """
+
+    def __init__(self, url: str, timeout: float = 30, token: Optional[str] = None,
+                 retries: int = RETRIES, backoff: float = BACKOFF):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+        self.retries = retries
+        self.backoff = backoff
+
+    def _call(self, operation, *args):
+        headers = {"Content-Type": "application/json"}
+        if self.token is not None:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        data = json.dumps(args, default=str).encode()
+        delay = self.backoff
+
+        for attempt in range(1, self.retries + 1):
+            request = urllib.request.Request(f"{self.url}/{operation}", data=data, headers=headers, method="POST")
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                if e.code < 500 or attempt == self.retries:
+                    raise
+                error = e
+            except (urllib.error.URLError, OSError) as e:
+                if attempt == self.retries:
+                    raise
+                error = e
+
+            # Every operation is safe to repeat: submits and completions are
+            # idempotent, and a claim whose reply was lost expires with its lease
+            logger.warning(f"Job queue {operation} failed ({error}), retrying in {delay:.0f}s")
+            time.sleep(delay)
+            delay *= 2
+
+    def __getattr__(self, name):
+        if name in OPERATIONS:
+            return lambda *args: self._call(name, *args)
+        raise AttributeError(name)
+
+    def claim(self, worker: str, lease: float = LEASE) -> Optional[tuple]:
+        claimed = self._call("claim", worker, lease)
+        return tuple(claimed) if claimed else None
+
+    def results(self) -> dict:
+        return {jid: tuple(pair) for jid, pair in self._call("results").items()}
+
+
+# Workers
+
+def run_worker(queue, execute: Callable, worker: Optional[str] = None, lease: float = LEASE,
+               idle_exit: bool = True, idle_sleep: float = 1.0) -> int:
+    """
+    Claim and execute jobs until the queue is empty (or forever).
+
+    Args:
+        queue: JobQueue or RemoteJobQueue
+        execute: Callable(payload) returning a JSON-serialisable result
+        worker: Worker name (defaults to host:pid)
+        lease: Lease length in seconds; renewed every lease / 3 while a
+            job runs, so only a dead worker loses its job
+        idle_exit: Return once no job can be claimed
+
+    Returns:
+        int: Jobs completed by this worker
+    """
+
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+
+    while True:
+        claimed = queue.claim(worker, lease)
+
+        if claimed is None:
+            if idle_exit:
+                return done
+            time.sleep(idle_sleep)
+            continue
+
+        jid, payload = claimed
+        finished = threading.Event()
+        renewer = threading.Thread(target=_renew, args=(queue, jid, worker, lease, finished),
+                                   name=f"lease-{jid[:8]}", daemon=True)
+        renewer.start()
+
+        try:
+            result = execute(payload)
+        except Exception as e:
+            logger.error(f"Job {jid} failed on {worker}: {e}")
+            queue.fail(jid, worker, f"{type(e).__name__}: {e}")
+            continue
+        finally:
+            finished.set()
+            renewer.join()
+
+        queue.complete(jid, worker, result)
+        done += 1
+
+
+def _renew(queue, jid: str, worker: str, lease: float, finished: threading.Event):
+    """Extend a job's lease every lease / 3 seconds until it finishes."""
+
+    while not finished.wait(lease / 3):
+        try:
+            if not queue.extend(jid, worker, lease):
+                logger.warning(f"Lost the lease on job {jid}; another worker may run it too")
+                return
+        except Exception as e:
+            logger.error(f"Renewing the lease on job {jid} failed: {e}")
@@ -0,0 +1,282 @@
+"""
+Profiling for live and backtest runs.
+
+Two modes write the same outputs per run into PROFILE_DIR:
+
+- sampling: a background thread samples the target thread's stack at a
+  fixed interval. Overhead is low enough for the live loop.
+- deterministic: cProfile records every call. Meant for backtests.
+
+Each run produces a folded-stack file (flamegraph.pl / speedscope input),
+a speedscope JSON profile and a top-N hot-function text report.
+
+Periodic flushes of a long-running sampler hold the cumulative stacks so
+far, so they all overwrite one rolling `<name>-latest.*` set instead of
+adding a new set every interval; the final write on stop replaces it with
+a timestamped set.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+
+
+PROFILE_DIR = "profiles"
+
+
+def _frame_label(code) -> tuple:
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+OUTPUT_SUFFIXES = (".folded", ".speedscope.json", ".txt")
+
+
+@contextmanager
+def _replace(path: str):
+    """Write a file through a temporary sibling so readers never see a partial one."""
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        yield f
+    os.replace(tmp_path, path)
+
+
+def _write_outputs(stacks: Counter, name: str, out_dir: str, unit: str, report: str,
+                   rolling: bool = False) -> str:
+    """
+    Write folded stacks, a speedscope profile and the text report.
+
+    Args:
+        rolling: Overwrite the `<name>-latest` set instead of starting a
+            new timestamped one
+
+    Returns:
+        str: The path prefix
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = "latest" if rolling else f"{datetime.now():%Y%m%d-%H%M%S}"
+    prefix = os.path.join(out_dir, f"{name}-{suffix}")
+
+    with _replace(prefix + ".folded") as f:
+        for stack, weight in stacks.items():
+            line = ";".join(f"{fn} ({os.path.basename(file)}:{line})" for fn, file, line in stack)
+            f.write(f"{line} {weight:.6f}\n" if unit == "seconds" else f"{line} {int(weight)}\n")
+
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, weight in stacks.items():
+        ids = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                fn, file, line = frame
+                frames.append({"name": fn, "file": file, "line": line})
+            ids.append(index[frame])
+        samples.append(ids)
+        weights.append(weight)
+
+    speedscope = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": unit,
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "trading-bot",
+    }
+
+    with _replace(prefix + ".speedscope.json") as f:
+        json.dump(speedscope, f)
+
+    with _replace(prefix + ".txt") as f:
+        f.write(report)
+
+    if rolling:
+        logger.debug(f"Profile flushed to {prefix}.*")
+    else:
+        logger.info(f"Profile written to {prefix}.*")
+    return prefix
+
+
+def hot_functions(stacks: Counter, top: int = 20) -> str:
+    """Top-N report of self and inclusive weight per function from folded stacks."""
+
+    total = sum(stacks.values()) or 1
+    own, inclusive = Counter(), Counter()
+
+    for stack, weight in stacks.items():
+        if stack:
+            own[stack[-1]] += weight
+        for frame in set(stack):
+            inclusive[frame] += weight
+
+    lines = [f"{'self %':>8} {'total %':>8}  function"]
+    for frame, weight in own.most_common(top):
+        fn, file, line = frame
+        lines.append(
+            f"{100 * weight / total:8.2f} {100 * inclusive[frame] / total:8.2f}  "
+            f"{fn} ({file}:{line})"
+        )
+    return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """
+    Periodically sample one thread's Python stack.
+
+    Args:
+        interval: Seconds between samples
+        thread_id: Thread to sample (defaults to the calling thread)
+        flush_every: Also write outputs every this many seconds, so a
+            long-running loop can be inspected without stopping it; each
+            flush overwrites the same rolling set
+    """
+
+    def __init__(self, name: str = "live", interval: float = 0.005,
+                 thread_id: Optional[int] = None, out_dir: str = PROFILE_DIR,
+                 flush_every: Optional[float] = None, top: int = 20):
+        self.name = name
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.out_dir = out_dir
+        self.flush_every = flush_every
+        self.top = top
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop.wait(self.interval):
+            self._sample()
+            if self.flush_every and time.monotonic() - last_flush >= self.flush_every:
+                self.write(rolling=True)
+                last_flush = time.monotonic()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write(self, rolling: bool = False) -> str:
+        """Write the samples so far; the final (non-rolling) write drops the rolling set."""
+
+        stacks = Counter(self.stacks)
+        report = f"{sum(stacks.values())} samples every {self.interval * 1000:.1f} ms\n\n"
+        prefix = _write_outputs(stacks, self.name, self.out_dir, "none",
+                                report + hot_functions(stacks, self.top), rolling=rolling)
+
+        if not rolling:
+            for suffix in OUTPUT_SUFFIXES:
+                try:
+                    os.remove(os.path.join(self.out_dir, f"{self.name}-latest{suffix}"))
+                except FileNotFoundError:
+                    pass
+
+        return prefix
+
+
+def _pstats_stacks(stats: pstats.Stats, max_depth: int = 64, min_share: float = 0.001) -> Counter:
+    """
+    Turn cProfile's caller graph into weighted stacks for a flamegraph.
+
+    cProfile keeps per-edge cumulative times, so each function's time is
+    split among its callers in proportion to those edges. Branches below
+    min_share of the total time are pruned to keep the output bounded.
+    """
+
+    raw = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks = Counter()
+    floor = stats.total_tt * min_share
+
+    def walk(func, stack, budget):
+        _, _, tt, ct, _ = raw[func]
+        if ct <= 0 or budget <= floor:
+            return
+        ratio = min(1.0, budget / ct)
+        label = (func[2], func[0], func[1])
+        stack = stack + (label,)
+
+        stacks[stack] += tt * ratio
+        if len(stack) >= max_depth:
+            return
+        for callee, edge_ct in callees.get(func, []):
+            if (callee[2], callee[0], callee[1]) not in stack:
+                walk(callee, stack, edge_ct * ratio)
+
+    for func, (_, _, _, ct, callers) in raw.items():
+        if not callers:
+            walk(func, (), ct)
+
+    return stacks
+
+
+@contextmanager
+def deterministic_profile(name: str = "backtest", out_dir: str = PROFILE_DIR, top: int = 20):
+    """Profile the enclosed block with cProfile and write the outputs on exit."""
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+
+        os.makedirs(out_dir, exist_ok=True)
+        stats = pstats.Stats(profiler)
+
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(top)
+
+        prefix = _write_outputs(_pstats_stacks(stats), name, out_dir, "seconds", buffer.getvalue())
+        stats.dump_stats(prefix + ".prof")
+
+
+@contextmanager
+def sampling_profile(name: str = "live", interval: float = 0.005,
+                     out_dir: str = PROFILE_DIR, flush_every: Optional[float] = None):
+    """Sample the calling thread while the block runs and write the outputs on exit."""
+
+    profiler = SamplingProfiler(name, interval, out_dir=out_dir, flush_every=flush_every).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.write()
@@ -0,0 +1,163 @@
+"""
+Content-addressed cache for backtest results.
+
+A result is stored under a SHA-256 of everything that determines it: the
+candle data, the source of the strategy code and the engine parameters.
+Unchanged runs, sweep points and CI jobs therefore load their signals,
+trades and metrics from disk instead of recomputing them, and any edit
+to the data or the strategy produces a new key.
+
+Entries are pickles in CACHE_DIR; once the directory grows past
+max_bytes the least recently used entries are deleted.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+from loguru import logger
+
+
+CACHE_DIR = "cache/backtests"
+MAX_BYTES = 512 * 1024 * 1024
+
+# Modules whose source determines a backtest result
+STRATEGY_MODULES = ("strategy.strategy", "strategy.indicators")
+
+
+def source_hash(*modules) -> str:
+    """Hash the source files of the given modules (objects or dotted names)."""
+
+    digest = hashlib.sha256()
+
+    for module in modules:
+        if isinstance(module, str):
+            module = __import__(module, fromlist=["_"])
+        with open(inspect.getsourcefile(module), "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def data_hash(candles: list) -> str:
+    """Hash a candle series (order and every field count)."""
+
+    raw = json.dumps(candles, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Args:
+        path: Cache directory
+        max_bytes: Size bound for the directory
+    """
+
+    def __init__(self, path: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None   # running directory size, rescanned only when evicting
+
+    def key(self, candles: list, params: dict, code: Optional[str] = None) -> str:
+        """Cache key for a backtest over candles with the given parameters."""
+
+        parts = {
+            "data": data_hash(candles),
+            "code": code or source_hash(*STRATEGY_MODULES),
+            "params": params,
+        }
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + ".pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Load a stored result (None on a miss or an unreadable entry)."""
+
+        file = self._file(key)
+
+        try:
+            with open(file, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key[:12]}: {e}")
+            self.misses += 1
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+            return None
+
+        os.utime(file)   # mtime doubles as the LRU timestamp
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> bool:
+        """Atomically store a result, then enforce the size bound."""
+
+        file = self._file(key)
+        directory = os.path.dirname(file)
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, file)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.error(f"Failed to store backtest result: {e}")
+            return False
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += os.path.getsize(file)
+
+        if self._size > self.max_bytes:
+            self.evict()
+
+        return True
+
+    def _entries(self) -> list:
+        entries = []
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if name.endswith(".pkl"):
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        return entries
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under max_bytes. Returns the count deleted."""
+
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        for _, size, file in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        self._size = total
+        return removed
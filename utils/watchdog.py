@@ -0,0 +1,295 @@
+"""
+Supervision for the live loop.
+
+- GuardedClient wraps the broker client so every read-only API call
+  runs with a timeout and behind a circuit breaker for its endpoint.
+  After repeated failures an endpoint is skipped for a cool-down; then a
+  single half-open probe decides whether it is closed again. Calls that
+  place, modify or cancel orders pass straight through: an abandoned
+  call may still reach the broker and leave an order the loop does not
+  know about, and a breaker must never stop an exit from going out.
+- Heartbeat writes a small JSON file (and optionally serves it over
+  HTTP) with the time by which the loop promises to beat again.
+- Watchdog runs the loop in a child process and restarts it when the
+  heartbeat deadline passes or the process dies.
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Optional
+
+from loguru import logger
+
+
+HEARTBEAT_PATH = "logs/heartbeat.json"
+CALL_TIMEOUT = 10
+GUARDED_METHODS = (
+    "historical_data", "ltp", "quote", "orders", "order_history", "positions",
+    "instruments", "margins",
+)
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CallTimeout(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Args:
+        name: Endpoint name (for logs)
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Seconds before the first half-open probe; doubles
+            after every failed probe up to max_reset_timeout
+        ignore: Exception types that are the caller's fault (bad input,
+            expired token) and do not count as endpoint failures
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30,
+                 max_reset_timeout: float = 600, ignore: tuple = ()):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.ignore = ignore
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                logger.info(f"Circuit {self.name}: half-open, probing")
+                return
+            # Open, or a probe is already in flight
+            self.rejected += 1
+            raise CircuitOpen(f"{self.name} circuit is {self.state}")
+
+    def _success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit {self.name}: closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+
+    def _failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            elif self.failures < self.failure_threshold:
+                return
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            logger.warning(f"Circuit {self.name}: open for {self.reset_timeout:.0f}s "
+                           f"after {self.failures} failures")
+
+    def call(self, fn: Callable, *args, **kwargs):
+        self._allow()
+        try:
+            result = fn(*args, **kwargs)
+        except self.ignore:
+            self._success()
+            raise
+        except Exception:
+            self._failure()
+            raise
+        self._success()
+        return result
+
+
+def _caller_errors() -> tuple:
+    try:
+        from kiteconnect.exceptions import InputException, OrderException, PermissionException, TokenException
+        return (InputException, OrderException, PermissionException, TokenException)
+    except ImportError:
+        return ()
+
+
+class GuardedClient:
+    """
+    Proxy around a Kite client adding per-call timeouts and per-endpoint
+    circuit breakers to the GUARDED_METHODS. Other attributes, including
+    the order-changing calls, go straight to the client, whose own HTTP
+    timeout still applies.
+
+    Args:
+        client: Broker client
+        timeout: Seconds before a call is abandoned with CallTimeout
+        breaker_kwargs: Passed to every CircuitBreaker
+    """
+
+    def __init__(self, client, timeout: float = CALL_TIMEOUT, **breaker_kwargs):
+        breaker_kwargs.setdefault("ignore", _caller_errors())
+        self.client = client
+        self.timeout = timeout
+        self.breakers = {name: CircuitBreaker(name, **breaker_kwargs) for name in GUARDED_METHODS}
+
+    def _timed(self, name, args, kwargs):
+        # Each call gets a daemon thread, so a call that never returns is
+        # abandoned without blocking the loop or interpreter exit
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = getattr(self.client, name)(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=target, name=f"broker-{name}", daemon=True)
+        thread.start()
+        thread.join(self.timeout)
+
+        if thread.is_alive():
+            raise CallTimeout(f"{name} did not return within {self.timeout}s")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def __getattr__(self, name):
+        if name in GUARDED_METHODS:
+            breaker = self.breakers[name]
+            return lambda *args, **kwargs: breaker.call(self._timed, name, args, kwargs)
+        return getattr(self.client, name)
+
+
+class Heartbeat:
+    """
+    Args:
+        path: Heartbeat file
+    """
+
+    def __init__(self, path: str = HEARTBEAT_PATH):
+        self.path = path
+        self.last = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def beat(self, within: float, **status):
+        """Record a beat, promising the next one within `within` seconds."""
+
+        now = time.time()
+        self.last = {"ts": now, "deadline": now + within, "pid": os.getpid(), **status}
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.last, f, default=str)
+        os.replace(tmp_path, self.path)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8081) -> HTTPServer:
+        """Serve the last beat on GET; 200 while on time, 503 once overdue."""
+
+        heartbeat = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                beat = read_heartbeat(heartbeat.path)
+                healthy = beat is not None and time.time() <= beat["deadline"]
+                body = json.dumps(beat or {}).encode()
+                self.send_response(200 if healthy else 503)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="heartbeat", daemon=True).start()
+        return server
+
+
+def read_heartbeat(path: str = HEARTBEAT_PATH) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class Watchdog:
+    """
+    Run a loop in a child process and restart it when it stops beating.
+
+    Args:
+        target: Function running the loop (must beat the heartbeat file)
+        path: Heartbeat file the target writes
+        startup_grace: Seconds allowed before the first beat
+        poll: Seconds between checks
+        max_restarts: Give up after this many restarts (None: never)
+    """
+
+    def __init__(self, target: Callable, path: str = HEARTBEAT_PATH, startup_grace: float = 120,
+                 poll: float = 5, max_restarts: Optional[int] = None):
+        self.target = target
+        self.path = path
+        self.startup_grace = startup_grace
+        self.poll = poll
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.process = None
+        self.started_at = 0.0
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.process = multiprocessing.Process(target=self.target, name="trading-loop", daemon=True)
+        self.process.start()
+        self.started_at = time.time()
+
+    def stuck(self) -> bool:
+        beat = read_heartbeat(self.path)
+        if beat is None or beat.get("pid") != self.process.pid:
+            return time.time() - self.started_at > self.startup_grace
+        return time.time() > beat["deadline"]
+
+    def check(self) -> bool:
+        """Restart the loop if it died or is stuck. Returns whether it is running."""
+
+        if self.process.is_alive() and not self.stuck():
+            return True
+
+        if self.process.is_alive():
+            logger.error("Trading loop missed its heartbeat, restarting it")
+            self.process.terminate()
+            self.process.join(10)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        elif self.process.exitcode == 0:
+            return False
+        else:
+            logger.error(f"Trading loop exited with code {self.process.exitcode}, restarting it")
+
+        if self.max_restarts is not None and self.restarts >= self.max_restarts:
+            logger.error("Restart limit reached, giving up")
+            return False
+
+        self.restarts += 1
+        self.start()
+        return True
+
+    def run(self):
+        self.start()
+        try:
+            while self.check():
+                time.sleep(self.poll)
+        finally:
+            if self.process.is_alive():
+                self.process.terminate()